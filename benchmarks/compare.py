@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Compare two result files of boxes --benchmark
+
+Prints the change of geometry, serialization and total time and of the
+peak memory for every configuration found in both files. Exits with 1 if
+any total time or peak memory grew by more than the threshold.
+
+Usage: python benchmarks/compare.py OLD.json NEW.json [--threshold 0.1]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+
+COLUMNS = ("geometry", "serialization", "total", "peak_memory")
+
+
+def load(filename):
+    with open(filename) as f:
+        data = json.load(f)
+    return {(r["name"], r["format"]): r for r in data["results"] if "error" not in r}
+
+
+def ratio(old, new, key):
+    if not old.get(key) or new.get(key) is None:
+        return None
+    return new[key] / old[key]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative growth reported as regression (default: 0.1)")
+    parser.add_argument("--min_time", type=float, default=0.005,
+                        help="ignore timing changes of runs faster than this many seconds (default: 0.005)")
+    args = parser.parse_args()
+
+    old, new = load(args.old), load(args.new)
+    regressions = []
+    print(f"{'name':30} {'format':6} " + " ".join(f"{c:>13}" for c in COLUMNS))
+    for key in sorted(old.keys() & new.keys()):
+        ratios = [ratio(old[key], new[key], c) for c in COLUMNS]
+        print(f"{key[0]:30} {key[1]:6} " + " ".join(
+            f"{r:12.2f}x" if r is not None else f"{'-':>13}" for r in ratios))
+        if (ratios[2] is not None and ratios[2] > 1 + args.threshold and
+            max(old[key]["total"], new[key]["total"]) >= args.min_time):
+            regressions.append((key, "total"))
+        if ratios[3] is not None and ratios[3] > 1 + args.threshold:
+            regressions.append((key, "peak_memory"))
+
+    for (name, format), column in regressions:
+        print(f"Regression: {name} ({format}) {column}", file=sys.stderr)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Benchmark joining strokes into pathes in Part.stroke
+
+Renders once with the endpoint index of Part and once with the linear
+search it replaced and compares the times. The output of both runs has to be
+identical.
+
+Closed pathes like holes never need a search. The difference shows with
+many open strokes in one part, e.g. finger holes or engraved hatching.
+
+Usage: python benchmarks/stroke_join.py
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+try:
+    import boxes
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..'))
+    import boxes
+
+import boxes.generators
+from boxes.drawing import Context, Part, SVGSurface, points_equal
+
+CASES = [
+    ("HolePattern", ["--x=400", "--y=400", "--fillHoles_fill_pattern=hex",
+                     "--fillHoles_hole_max_radius=2.5",
+                     "--fillHoles_space_between_holes=2"]),
+    ("FillTest", ["--x=600", "--y=400", "--fillHoles_fill_pattern=hex"]),
+    ("CanStorage", []),
+]
+
+
+def linear_find_end(self, x, y, params):
+    """Search all pathes from the end like Part.stroke used to"""
+    for n in range(len(self.pathes) - 1, -1, -1):
+        p = self.pathes[n]
+        if points_equal(x, y, *p.end_point()) and p.params == params:
+            return n
+    return None
+
+
+def open_strokes(n=3000):
+    """Draw n unconnected line segments into one part"""
+    surface = SVGSurface()
+    ctx = Context(surface)
+    start = time.process_time()
+    for i in range(n):
+        ctx.move_to(i % 60, i // 60)
+        ctx.line_to(i % 60 + 0.5, i // 60 + 0.5)
+        ctx.stroke()
+    t = time.process_time() - start
+    return t, [list(path) for part in surface.parts for path in part.pathes]
+
+
+def run(generator, args):
+    box = generator()
+    box.parseArgs(args + ["--reference=0"])
+    box.metadata["reproducible"] = True
+    start = time.process_time()
+    box.open()
+    box.render()
+    t = time.process_time() - start
+    return t, box.close().getvalue()
+
+
+def main() -> None:
+    generators = {b.__name__: b for b in boxes.generators.getAllBoxGenerators().values()}
+    indexed_find_end = Part._find_end
+    cases = [(name, lambda name=name, args=args: run(generators[name], args))
+             for name, args in CASES]
+    cases.append(("open strokes", open_strokes))
+    for name, render in cases:
+        Part._find_end = indexed_find_end
+        t_index, result_index = render()
+        Part._find_end = linear_find_end
+        t_linear, result_linear = render()
+        Part._find_end = indexed_find_end
+        assert result_index == result_linear, f"{name}: output differs"
+        print(f"{name:15} linear {t_linear*1000:8.1f}ms  index {t_index*1000:8.1f}ms"
+              f"  speedup {t_linear/t_index:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,7 @@ import copy
 import datetime
 import gettext
 import inspect
+import itertools
 import math
 import random
 import re
@@ -28,14 +29,17 @@ from argparse import ArgumentParser
 from contextlib import contextmanager
 from functools import wraps
 from shlex import quote
-from typing import Any
+from typing import Any, cast
 from xml.sax.saxutils import quoteattr
 
+import numpy as np
 import qrcode
+import shapely
 from shapely.geometry import *
 from shapely.ops import split
 
-from boxes import edges, formats, gears, parts, pulley
+from boxes import drawing, edges, formats, gears, parts, pulley
+from boxes.profiler import Profiler, profiling_enabled
 from boxes.Color import *
 from boxes.qrcode_factory import BoxesQrCodeFactory
 from boxes.vectors import kerf
@@ -283,6 +287,64 @@ class BoolArg:
 boolarg = BoolArg()
 
 
+### Cached argument schema
+
+class _ArgParserStub:
+    """Stands in for the ArgumentParser while a generator runs __init__
+    after its arguments have already been cached. Ignores all changes."""
+
+    def __init__(self, groups: int) -> None:
+        self._actions: list[argparse.Action] = []
+        self._action_groups = [self] * groups
+
+    def add_argument(self, *args, **kw) -> None:
+        pass
+
+    def add_argument_group(self, *args, **kw) -> _ArgParserStub:
+        return self
+
+    def set_defaults(self, **kw) -> None:
+        pass
+
+
+def cloneArgParser(parser: ArgumentParser) -> ArgumentParser:
+    """
+    Copy an ArgumentParser so it can be changed without affecting the original
+
+    Like ArgumentParser(parents=[parser]) but copies the actions and keeps
+    the groups in order with their titles.
+    """
+    clone = parser.__class__(
+        prog=parser.prog, usage=parser.usage, description=parser.description,
+        epilog=parser.epilog, formatter_class=parser.formatter_class,
+        add_help=False)
+    clone.set_defaults(**parser._defaults)
+    for group in parser._action_groups:
+        if group is parser._positionals:
+            target = clone._positionals
+        elif group is parser._optionals:
+            target = clone._optionals
+            target.title = group.title
+        else:
+            target = clone.add_argument_group(group.title, group.description)
+        for action in group._group_actions:
+            target._add_action(copy.copy(action))
+    return clone
+
+
+class _BoxesType(type):
+    """Metaclass of Boxes
+
+    Caches the arguments of a new instance (see Boxes._cacheArgParser())
+    once its __init__ is done.
+    """
+
+    def __call__(cls, *args, **kw):
+        box = super().__call__(*args, **kw)
+        box._cacheArgParser()
+        return box
+
+
 class HexHolesSettings(edges.Settings):
     """Settings for hexagonal hole patterns
 
@@ -335,7 +397,7 @@ Values:
 ### Main class
 ##############################################################################
 
-class Boxes:
+class Boxes(metaclass=_BoxesType):
     """Main class -- Generator should subclass this """
 
     webinterface = True
@@ -344,15 +406,12 @@ class Boxes:
 
     description: str = ""  # Markdown syntax is supported
 
+    # ArgumentParsers built by __init__ by (class, UI, ArgumentParser class)
+    _argParserCache: dict[tuple[type, str, type], ArgumentParser] = {}
+
     def __init__(self) -> None:
         self.formats = formats.Formats()
-        self.ctx = None
-        description: str = ""
-        if self.__doc__:
-            description = inspect.cleandoc(self.__doc__)
-        if self.description:
-            description += "\n\n" + self.description
-        self.argparser = ArgumentParser(description=description)
+        self.ctx: drawing.Context | None = None
         self.edgesettings: dict[Any, Any] = {}
         self.non_default_args: dict[Any, Any] = {}
         self.translations = gettext.NullTranslations()
@@ -376,6 +435,26 @@ class Boxes:
         # Dummy attribute for static analytic tools. Will be overwritten by `argparser` at runtime.
         self.thickness: float = 0.0
 
+        self.profiler = None
+        if profiling_enabled():
+            self.profiler = Profiler()
+            self.profiler.instrument(self)
+
+        self.argparser: argparse.ArgumentParser
+        cached = self._argParserCache.get(self._argParserKey())
+        if cached is not None:
+            # __init__ only needs to run for its other side effects
+            self.argparser = cast(argparse.ArgumentParser, _ArgParserStub(len(cached._action_groups)))
+            self._argParserStubbed = True
+            return
+        self._argParserStubbed = False
+
+        description: str = ""
+        if self.__doc__:
+            description = inspect.cleandoc(self.__doc__)
+        if self.description:
+            description += "\n\n" + self.description
+        self.argparser = ArgumentParser(description=description)
         self.argparser._action_groups[1].title = self.__class__.__name__ + " Settings"
         defaultgroup = self.argparser.add_argument_group(
                         "Default Settings")
@@ -419,6 +498,45 @@ class Boxes:
         defaultgroup.add_argument(
             "--debug", action="store", type=boolarg, default=False,
             help="print surrounding boxes for some structures [\U0001F6C8](https://florianfesti.github.io/boxes/html/usermanual.html#debug)")
+        defaultgroup.add_argument(
+            "--optimize_order", action="store", type=boolarg, default=False,
+            help="reorder the cuts to minimize the travel of the laser head [\U0001F6C8](https://florianfesti.github.io/boxes/html/usermanual.html#optimize-order)")
+        defaultgroup.add_argument(
+            "--svg_symbols", action="store", type=boolarg, default=False,
+            help="write repeated shapes only once in SVG files (not supported by all programs) [\U0001F6C8](https://florianfesti.github.io/boxes/html/usermanual.html#svg-symbols)")
+        defaultgroup.add_argument(
+            "--svg_precision", action="store", type=int, default=3, choices=list(range(9)),
+            help="digits after the decimal point of coordinates in SVG files [\U0001F6C8](https://florianfesti.github.io/boxes/html/usermanual.html#svg-precision)")
+        defaultgroup.add_argument(
+            "--svg_compact", action="store", type=boolarg, default=False,
+            help="write SVG path data with relative commands and as short as possible [\U0001F6C8](https://florianfesti.github.io/boxes/html/usermanual.html#svg-compact)")
+
+    def resetArgParser(self, **kw) -> None:
+        """Replace the arguments set up by Boxes.__init__() with an empty ArgumentParser
+
+        Keeps the stand-in if the arguments of the class are already cached.
+        """
+        if not self._argParserStubbed:
+            self.argparser = ArgumentParser(**kw)
+
+    def _argParserKey(self) -> tuple[type, str, type]:
+        # Generators add different arguments depending on the UI
+        return (self.__class__, self.UI, ArgumentParser)
+
+    def _cacheArgParser(self) -> None:
+        """Store the arguments built by __init__ for the following instances
+        and give this one a copy of its own"""
+        key = self._argParserKey()
+        if not self._argParserStubbed:
+            self._argParserCache[key] = self.argparser
+        self.argparser = cloneArgParser(self._argParserCache[key])
+        self._argParserStubbed = False
+
+    def getProfile(self) -> dict[str, dict[str, Any]] | None:
+        """Times and call counts per phase if profiling is enabled (see boxes.profiler)"""
+        if self.profiler is None:
+            return None
+        return self.profiler.as_dict()
 
     @contextmanager
     def saved_context(self):
@@ -459,6 +577,10 @@ class Boxes:
 
         self.bedBoltSettings = (3, 5.5, 2, 20, 15)  # d, d_nut, h_nut, l, l1
         self.surface, self.ctx = self.formats.getSurface(self.format)
+        if self.format in ("svg", "svg_Ponoko"):
+            self.surface.use_symbols = getattr(self, "svg_symbols", False)
+            self.surface.precision = getattr(self, "svg_precision", 3)
+            self.surface.compact_paths = getattr(self, "svg_compact", False)
 
         if self.format == 'svg_Ponoko':
             self.ctx.set_line_width(0.01)
@@ -601,7 +723,8 @@ class Boxes:
 
     def addSettingsArgs(self, settings, prefix=None, **defaults):
         prefix = prefix or settings.__name__[:-len("Settings")]
-        settings.parserArguments(self.argparser, prefix, **defaults)
+        if not self._argParserStubbed:
+            settings.parserArguments(self.argparser, prefix, **defaults)
         self.edgesettings[prefix] =  {}
 
 
@@ -820,16 +943,37 @@ class Boxes:
         if self.ctx is None:
             return
 
+        self._closeSurface()
+        data = self.surface.finish(self.inner_corners)
+
+        data = self.formats.convert(data, self.format)
+        return data
+
+    def closeStream(self):
+        """Finish rendering and return the output as iterator of byte chunks
+
+        SVG and DXF output is serialized incrementally while it is consumed.
+        Other formats are returned as a single chunk.
+        Call after .render()"""
+        if self.ctx is None:
+            return iter(())
+        if not hasattr(self.surface, "stream") or self.format not in ("svg", "svg_Ponoko", "dxf"):
+            return iter((self.close().getvalue(),))
+
+        self._closeSurface()
+        return self.surface.stream(self.inner_corners)
+
+    def _closeSurface(self) -> None:
+        assert self.ctx is not None
         self.ctx.stroke()
         self.ctx = None
 
         self.surface.set_metadata(self.metadata)
 
         self.surface.flush()
-        data = self.surface.finish(self.inner_corners)
-
-        data = self.formats.convert(data, self.format)
-        return data
+        if getattr(self, "optimize_order", False):
+            # (before, after) in mm
+            self.travel_lengths = self.surface.optimize_order()
 
     ############################################################
     ### Turtle graphics commands
@@ -1424,6 +1568,46 @@ class Boxes:
             self.corner(-90, r)
             self.edge(d - 2 * r)
 
+    _hole_shapes = {
+        "round": "hole",
+        "polygon": "regularPolygonHole",
+        "rectangle": "rectangularHole",
+        "d": "dHole",
+        "flat": "flatHole",
+    }
+
+    def holesAt(self, points, shape="round", color=Color.INNER_CUT, **kw):
+        """
+        Draw many identical holes
+
+        The hole is recorded once and its drawing calls are repeated at all positions.
+        This needs the hole to move to its position before drawing anything. Holes
+        that don't are drawn one by one.
+
+        :param points: list of (x, y) positions
+        :param shape: "round" (see hole), "polygon" (see regularPolygonHole), "rectangle" (see rectangularHole), "d" (see dHole) or "flat" (see flatHole)
+        :param color:  (Default value = Color.INNER_CUT)
+        :param kw: parameters of the hole besides the position
+        """
+        points = list(points)
+        if not points:
+            return
+        draw = getattr(self, self._hole_shapes[shape])
+        ctx = self.ctx
+        ctx.stroke()
+        recorder = drawing.ContextRecorder(ctx)
+        self.ctx = recorder
+        try:
+            draw(0, 0, color=color, **kw)
+        finally:
+            self.ctx = ctx
+        if not recorder.movable:
+            for x, y in points:
+                draw(x, y, color=color, **kw)
+            return
+        for x, y in points:
+            ctx.stamp(recorder.calls, x, y)
+
     @restore
     @holeCol
     def dHole(self, x, y, r=None, d=None, w=None, rel_w=0.75, angle=0):
@@ -1675,7 +1859,7 @@ class Boxes:
             return
 
         self.set_source_color(color)
-        q.make_image(ctx=self.ctx)
+        q.make_image(ctx=self.ctx).process()
 
         self.move(tw, th, move)
 
@@ -1773,46 +1957,42 @@ class Boxes:
             max_radius_y = (max_y - min_y - 2 * bspace - (ny - 1) * hspace) / ny / 2
 
         if pattern == "random":
-            grid = {}
+            # candidates are checked against the border in batches, the
+            # holes are kept in a grid with cells of the size of the largest
+            # hole plus spacing, so only the neighbouring cells matter
+            rng = np.random.default_rng(random.getrandbits(64))
+            exterior = borderPoly.exterior
+            shapely.prepare(borderPoly)
+            cell = 2 * max_radius + hspace
+            grid: dict[tuple[int, int], list[tuple[float, float, float]]] = {}
             misses = 0 # in a row
             while i < max_random and misses < 20:
-                i += 1
-                misses += 1
-                # random new point
-                x = random.randrange(math.floor(min_x + bspace), math.ceil(max_x - bspace)) # randomness takes longer to compute
-                y = random.randrange(math.floor(min_y + bspace), math.ceil(max_y - bspace)) # but generates a new pattern for each run
-                pt = Point(x, y).buffer(min_radius + bspace)
-                # check if point is within border
-                if borderPoly.contains(pt):
-                    pt1 = Point(x, y)
-                    grid_x = int(x//(2*max_radius+hspace))
-                    grid_y = int(y//(2*max_radius+hspace))
-                    # compute distance between hole and border
-                    bdist = borderPoly.exterior.distance(pt1) - bspace
-                    # compute minimum distance to all other holes
-                    hdist = max_radius
-                    try: # learned from https://medium.com/techtofreedom/5-ways-to-break-out-of-nested-loops-in-python-4c505d34ace7
-                        for gx in (-1, 0, 1):
-                            for gy in (-1, 0, 1):
-                                for pt2 in grid.get((grid_x+gx, grid_y+gy), []):
-                                    pt3 = Point(pt2.x, pt2.y)
-                                    hdist = min(hdist, pt1.distance(pt3) - pt2.z - hspace)
-                                    if hdist < min_radius:
-                                        hdist = 0
-                                        raise StopIteration
-                    except StopIteration:
-                        pass
-                    # find maximum radius depending on distances
-                    r = min(bdist, hdist)
-                    # if too small, dismiss cycle
+                batch = min(max_random - i, 64)
+                # random new points
+                xs = rng.integers(math.floor(min_x + bspace), math.ceil(max_x - bspace), batch).astype(float)
+                ys = rng.integers(math.floor(min_y + bspace), math.ceil(max_y - bspace), batch).astype(float)
+                # distance between holes and border, negative if outside
+                bdist = np.where(shapely.contains_xy(borderPoly, xs, ys),
+                                 shapely.distance(exterior, shapely.points(xs, ys)) - bspace, -1.0)
+                for x, y, r in zip(xs.tolist(), ys.tolist(), bdist.tolist()):
+                    if misses >= 20:
+                        break
+                    i += 1
+                    misses += 1
+                    # if too small, dismiss
                     if r < min_radius:
                         continue
                     # if too large, limit to max size
-                    if r > max_radius:
-                        r = max_radius
-                    # store in grid with radius as z value
-                    grid.setdefault((grid_x, grid_y), []).append(
-                        Point(x, y, r))
+                    r = min(r, max_radius)
+                    # limit by the distance to all other holes
+                    grid_x, grid_y = int(x // cell), int(y // cell)
+                    for gx in (grid_x - 1, grid_x, grid_x + 1):
+                        for gy in (grid_y - 1, grid_y, grid_y + 1):
+                            for x2, y2, r2 in grid.get((gx, gy), ()):
+                                r = min(r, math.hypot(x - x2, y - y2) - r2 - hspace)
+                    if r < min_radius:
+                        continue
+                    grid.setdefault((grid_x, grid_y), []).append((x, y, r))
                     misses = 0
                     # and finally paint the hole
                     self.regularPolygonHole(x, y, r=r, n=n, a=a)
@@ -1827,103 +2007,54 @@ class Boxes:
                 return
 
             # make cutPolys a little wider to avoid
-            # overlapping with lines to be cut
+            # overlapping with holes to be placed
             outerCutPoly = borderPoly.buffer(-1 * (bspace - 0.000001),
                                              join_style=2)
-            outerTestPoly = borderPoly.buffer(-1 * (bspace - 0.01),
-                                              join_style=2)
             # shrink original polygon to get place for full size polygons
             innerCutPoly = borderPoly.buffer(-1 * (bspace + max_radius - 0.0001), join_style=2)
-            innerTestPoly = borderPoly.buffer(-1 * (bspace + max_radius - 0.001), join_style=2)
-
-            # get left and right boundaries of cut polygon
-            x_cpl, y_cpl, x_cpr, y_cpr = outerCutPoly.bounds
 
             if self.debug:
                 self.showBorderPoly(list(outerCutPoly.exterior.coords))
                 self.showBorderPoly(list(innerCutPoly.exterior.coords))
 
-            # set startpoint
+            # centres of all rows
+            rows_y, rows_x = [], []
             y = min_y + bspace + max_radius_y
-
             while y < (max_y - bspace - max_radius_y):
                 if pattern == "square" or row % 2 == 0:
-                    xs = min_x + bspace + max_radius_x
+                    rows_x.append(min_x + bspace + max_radius_x)
                 else:
-                    xs = min_x + max_radius_x * 2 + hspace / 2 + bspace
-
-                # create line segments cut by the polygons
-                line_complete = LineString([(x_cpl, y), (max_x + 1, y)])
-                # cut accurate
-                outer_line_split = split(line_complete, outerCutPoly)
-                line_complete = LineString([(x_cpl, y), (max_x + 1, y)])
-                inner_line_split = split(line_complete, innerCutPoly)
-                inner_line_index = 0
-
-                if self.debug and False:
-                    for line in inner_line_split.geoms:
-                        self.hole(line.bounds[0], line.bounds[1], 1.1)
-                        self.hole(line.bounds[2], line.bounds[3], .9)
-
-                # process each line
-                for line_this in outer_line_split.geoms:
-
-                    if self.debug and False:  # enable to debug missing lines
-                        x_start, y_start, x_end, y_end = line_this.bounds
-                        with self.saved_context():
-                            self.moveTo(x_start, y_start ,0)
-                            self.hole(0, 0, 0.5)
-                            self.edge(x_end - x_start)
-                        with self.saved_context():
-                            self.moveTo(x_start, y_start ,0)
-                            self.text(str(outerTestPoly.contains(line_this)), 0, 0, fontsize=2, color=Color.ANNOTATIONS)
-                        with self.saved_context():
-                            self.moveTo(x_end, y_end ,0)
-                            self.hole(0, 0, 0.5)
-
-                    if not outerTestPoly.contains(line_this):
-                        continue
-                    x_start, y_start , x_end, y_end = line_this.bounds
-                    #initialize walking x coordinate
-                    xw = (math.ceil((x_start - xs) / (2 * max_radius_x + hspace)) * (2 * max_radius_x + hspace)) + xs
-
-                    # look up matching inner line
-                    while (inner_line_index < len(inner_line_split.geoms) and
-                           (inner_line_split.geoms[inner_line_index].bounds[2] <  xw
-                            or not innerTestPoly.contains(inner_line_split.geoms[inner_line_index]))):
-                        inner_line_index += 1
-
-                    # and process line
-                    while not xw > x_end:
-                        # are we in inner polygon already?
-                        if (len(inner_line_split.geoms) > inner_line_index and
-                            xw > inner_line_split.geoms[inner_line_index].bounds[0]):
-                            # place inner, full size polygons
-                            while xw < inner_line_split.geoms[inner_line_index].bounds[2]:
-                                self.regularPolygonHole(xw, y, r=max_radius, n=n, a=a)
-                                xw += (2 * max_radius_x + hspace)
-                            # forward to next inner line
-                            while (inner_line_index < len(inner_line_split.geoms) and
-                                   (inner_line_split.geoms[inner_line_index].bounds[0] <  xw
-                                    or not innerTestPoly.contains(inner_line_split.geoms[inner_line_index]))):
-                                inner_line_index += 1
-                            if xw > x_end:
-                                break
-
-                        # Check distance to border to size the polygon
-                        pt = Point(xw, y)
-                        r = min(borderPoly.exterior.distance(pt) - bspace,
-                                max_radius)
-                        # if too small, dismiss
-                        if r >= min_radius:
-                            self.regularPolygonHole(xw, y, r=r, n=n, a=a)
-                        xw += (2 * max_radius_x + hspace)
-
+                    rows_x.append(min_x + max_radius_x * 2 + hspace / 2 + bspace)
+                rows_y.append(y)
                 row += 1
                 if pattern == "square":
                     y += 2 * max_radius_y + hspace - 0.0001
                 else:
                     y += (math.sqrt(3) / 2 * (2 * max_radius_y + hspace)) - 0.0001
+            if not rows_y:
+                return
+
+            # all grid points, then dismiss the ones outside of the border
+            step_x = 2 * max_radius_x + hspace
+            columns = np.arange(math.floor((max_x - min(rows_x)) / step_x) + 1)
+            xs = (np.array(rows_x)[:, None] + columns * step_x).ravel()
+            ys = np.repeat(rows_y, len(columns))
+            shapely.prepare(outerCutPoly)
+            shapely.prepare(innerCutPoly)
+            inside = shapely.intersects_xy(outerCutPoly, xs, ys)
+            xs, ys = xs[inside], ys[inside]
+            # use full size within the inner polygon, check distance to
+            # border to size the polygon otherwise
+            rs = np.full(len(xs), float(max_radius))
+            outer = ~shapely.contains_xy(innerCutPoly, xs, ys)
+            rs[outer] = np.minimum(
+                shapely.distance(borderPoly.exterior, shapely.points(xs[outer], ys[outer])) - bspace,
+                max_radius)
+            # if too small, dismiss
+            keep = (rs >= min_radius) | ~outer
+            holes = zip(xs[keep].tolist(), ys[keep].tolist(), rs[keep].tolist())
+            for r, run in itertools.groupby(holes, key=lambda h: h[2]):
+                self.holesAt([(x, y) for x, y, _ in run], shape="polygon", r=r, n=n, a=a)
 
         elif pattern == "hbar":
             # 'optimum' hole size to be used
@@ -2070,6 +2201,7 @@ class Boxes:
         lx = (x - (2 * r + (cx - 2) * w)) / 2.0
         ly = (y - (2 * r + ((cy // 2) * 2) * dist - 2 * dist)) / 2.0
 
+        points = []
         for i in range(cy // 2):
             for j in range((cx - (i % 2)) // 2):
                 px = 2 * j * w + r + lx
@@ -2078,7 +2210,8 @@ class Boxes:
                     px += w
                 if skip and skip(x, y, r, b, px, py):
                     continue
-                self.hole(px, py, r=r)
+                points.append((px, py))
+        self.holesAt(points, r=r)
 
     def __skipcircle(self, x, y, r, b, posx, posy):
         cx, cy = x / 2.0, y / 2.0
@@ -2151,12 +2284,12 @@ class Boxes:
         dist = w * math.cos(math.pi / 6.0)
 
         self.moveTo(h / 2.0 - (cy // 2) * 2 * w, h / 2.0)
-        for j in range(cy):
-            self.hole(2 * j * w, 0, r)
-        for i in range(1, cy / 2 + 1):
+        points = [(2 * j * w, 0) for j in range(cy)]
+        for i in range(1, cy // 2 + 1):
             for j in range(cy - i):
-                self.hole(j * 2 * w + i * w, i * 2 * dist, r)
-                self.hole(j * 2 * w + i * w, -i * 2 * dist, r)
+                points.append((j * 2 * w + i * w, i * 2 * dist))
+                points.append((j * 2 * w + i * w, -i * 2 * dist))
+        self.holesAt(points, r=r)
 
     def flex2D(self, x, y, width=1):
         """
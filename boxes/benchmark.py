@@ -0,0 +1,174 @@
+"""Benchmark rendering of the generators
+
+Runs the configurations from examples.yml (every generator with its
+defaults plus the additional entries) and measures the time spent in
+parseArgs, open, render and close for each output format. open and render
+build the geometry, close serializes it. Peak memory is measured in a
+separate run as tracing slows down the code considerably.
+
+Results are written as JSON so runs of different commits can be compared
+with benchmarks/compare.py.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+import boxes
+import boxes.generators
+
+# only available in a checkout of the source, installed versions need --config
+CONFIG_PATH = Path(__file__).parent.parent / 'examples.yml'
+PHASES = ("parseArgs", "open", "render", "close")
+
+
+def benchmark_cases(config_path=CONFIG_PATH) -> list[tuple[str, type[boxes.Boxes], list[str]]]:
+    """(name, generator, args) for all configurations of the config file"""
+    with open(config_path) as f:
+        config_data = yaml.safe_load(f)
+    all_generators = boxes.generators.getAllBoxGenerators()
+    generators_by_name = {b.__name__: b for b in all_generators.values()}
+
+    cases: list[tuple[str, type[boxes.Boxes], list[str]]] = []
+    for ii, box_settings in enumerate(config_data.get("Boxes", [])):
+        if box_settings.get("generate") is False:
+            continue
+        box_type = box_settings.get("box_type")
+        if box_type == "__ALL__":
+            avoid = (set(box_settings.get("skipGenerators", [])) |
+                     set(box_settings.get("brokenGenerators", [])))
+            for generator in all_generators.values():
+                if generator.__name__ not in avoid:
+                    cases.append((generator.__name__, generator, []))
+        else:
+            box_cls = generators_by_name.get(box_type)
+            if box_cls is None:
+                raise ValueError("invalid generator '%s'" % box_type)
+            args = [f"--{k}={v}" for k, v in box_settings.get("args", {}).items()]
+            cases.append((f"{box_settings.get('name', box_type)}_{ii}", box_cls, args))
+    return cases
+
+
+def run_case(generator, args, trace_memory=False) -> dict[str, Any]:
+    """Render once and return the time of each phase in seconds"""
+    box = generator()
+    result: dict[str, Any] = {}
+    gc.collect()
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        # some generators print warnings
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            box.parseArgs(args)
+            box.metadata["reproducible"] = True
+            result["parseArgs"] = time.perf_counter() - start
+            for phase in PHASES[1:]:
+                start = time.perf_counter()
+                data = getattr(box, phase)()
+                result[phase] = time.perf_counter() - start
+        result["output_size"] = len(data.getvalue())
+        if trace_memory:
+            result["peak_memory"] = tracemalloc.get_traced_memory()[1]
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return result
+
+
+def benchmark(generator, args, format="svg", repeat=3, trace_memory=True) -> dict[str, Any]:
+    """Best times of repeat runs of one configuration in one format"""
+    args = args + [f"--format={format}"]
+    best: dict[str, Any] = {}
+    for _ in range(repeat):
+        result = run_case(generator, args)
+        for phase in PHASES:
+            best[phase] = min(best.get(phase, result[phase]), result[phase])
+        best["output_size"] = result["output_size"]
+    best["geometry"] = best["open"] + best["render"]
+    best["serialization"] = best["close"]
+    best["total"] = sum(best[phase] for phase in PHASES)
+    if trace_memory:
+        best["peak_memory"] = run_case(generator, args, trace_memory=True)["peak_memory"]
+    return best
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=Path(__file__).parent,
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="boxes --benchmark",
+        description="Time rendering the examples.yml configurations of all generators")
+    parser.add_argument("generators", nargs="*", metavar="GENERATOR",
+                        help="only run configurations of these generators")
+    parser.add_argument("--config", default=None,
+                        help="YAML file with the configurations like examples.yml "
+                        "(required unless run from a checkout of the source)")
+    parser.add_argument("--formats", default="svg",
+                        help="comma separated list of output formats (default: svg)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="number of timed runs, the fastest counts (default: 3)")
+    parser.add_argument("--memory", type=boxes.boolarg, default=True,
+                        help="measure peak memory in an additional run (default: 1)")
+    parser.add_argument("--output", default="benchmark.json",
+                        help='JSON file to write the results to, "-" for stdout (default: benchmark.json)')
+    args = parser.parse_args(argv)
+    if args.config is None:
+        if not CONFIG_PATH.exists():
+            parser.error("--config is required, examples.yml is only part of the source")
+        args.config = str(CONFIG_PATH)
+
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    selected = {name.lower() for name in args.generators}
+    results = []
+    for name, generator, box_args in benchmark_cases(args.config):
+        if selected and generator.__name__.lower() not in selected:
+            continue
+        for format in formats:
+            entry: dict[str, Any] = {
+                "name": name, "generator": generator.__name__,
+                "args": box_args, "format": format}
+            try:
+                entry.update(benchmark(generator, box_args, format,
+                                       args.repeat, args.memory))
+                sys.stderr.write(
+                    f"{name:30} {format:6} geometry {entry['geometry']*1000:9.1f}ms"
+                    f"  serialization {entry['serialization']*1000:9.1f}ms\n")
+            except Exception as e:
+                entry["error"] = f"{e.__class__.__name__}: {e}"
+                sys.stderr.write(f"{name:30} {format:6} {entry['error']}\n")
+            results.append(entry)
+
+    data = {
+        "meta": {
+            "commit": git_commit(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with os.fdopen(sys.stdout.fileno(), "w", closefd=False) if args.output == "-" else open(args.output, "w") as f:
+        json.dump(data, f, indent=1)
+        f.write("\n")
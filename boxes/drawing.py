@@ -3,11 +3,15 @@ from __future__ import annotations
 import codecs
 import io
 import math
+from array import array
 from typing import Any
 from xml.etree import ElementTree as ET
 
+import numpy as np
 from affine import Affine
 
+from boxes import pathorder
+from boxes.Color import Color
 from boxes.extents import Extents
 
 EPS = 1e-4
@@ -16,17 +20,129 @@ PADDING = 10
 RANDOMIZE_COLORS = False  # enable to ease check for continuity of paths
 
 
-def reorder_attributes(root) -> None:
-    """
-    Source: https://docs.python.org/3/library/xml.etree.elementtree.html#xml.etree.ElementTree.Element.remove
+def _escape_cdata(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _escape_attrib(text: str) -> str:
+    return (_escape_cdata(text).replace("\"", "&quot;").replace("\r", "&#13;")
+            .replace("\n", "&#10;").replace("\t", "&#09;"))
+
+
+def _xml_start_tag(tag: str, attrib: dict[str, str]) -> str:
+    """Unterminated start tag with the attributes sorted by name"""
+    items = "".join(f' {k}="{_escape_attrib(v)}"' for k, v in sorted(attrib.items()))
+    return f"<{tag}{items}"
+
+
+def _xml_element(tag: str, attrib: dict[str, str], text: str | None = None) -> str:
+    """Element serialized the same way ElementTree does"""
+    if text:
+        return f"{_xml_start_tag(tag, attrib)}>{_escape_cdata(text)}</{tag}>"
+    return _xml_start_tag(tag, attrib) + " />"
+
+
+def _encode(text: str) -> bytes:
+    return text.encode("utf-8", "xmlcharrefreplace")
+
+
+def _compact_path_data(pathes, precision: int) -> list[str]:
+    """Path data with relative commands and as few characters as possible
+
+    All pathes are converted at once to keep the overhead per path low.
+    Coordinates are rounded to the precision first so the rounding errors
+    don't add up along the pathes. Numbers are split into their integral
+    and fractional digits and formatted as integers so that no trailing
+    zeros, leading zeros or separators that are not needed get written.
     """
-    for el in root.iter():
-        attrib = el.attrib
-        if len(attrib) > 1:
-            # adjust attribute order, e.g. by sorting
-            attribs = sorted(attrib.items())
-            attrib.clear()
-            attrib.update(attribs)
+    if not pathes:
+        return []
+    ops = np.frombuffer(b"".join(path.ops for path in pathes), dtype=np.uint8)
+    coords = np.concatenate([np.frombuffer(path.coords, dtype=np.float64)
+                             for path in pathes if path.coords] or [np.zeros(0)])
+    path_of = np.repeat(np.arange(len(pathes)), [len(path.ops) for path in pathes])
+    sizes = np.where(ops == OP_CURVE, 6, 2)
+    offsets = np.cumsum(sizes) - sizes
+    keep = ops != OP_TEXT
+    ops, sizes, offsets, path_of = ops[keep], sizes[keep], offsets[keep], path_of[keep]
+    n = len(ops)
+    scale = 10 ** precision
+    q = np.rint(coords * scale).astype(np.int64)
+    end = np.column_stack([q[offsets + sizes - 2], q[offsets + sizes - 1]])
+    raw_end = np.column_stack([coords[offsets + sizes - 2], coords[offsets + sizes - 1]])
+    first = np.ones(n, dtype=bool)
+    first[1:] = path_of[1:] != path_of[:-1]
+    last = np.roll(first, -1)
+    is_move = ops == OP_MOVE
+    curve = ops == OP_CURVE
+
+    # start point of the sub path of each segment
+    new_subpath = is_move | first
+    subpath = np.cumsum(new_subpath) - 1
+    starts = end[np.flatnonzero(new_subpath)][subpath]
+    # sub pathes ending at their start get closed
+    raw_starts = raw_end[np.flatnonzero(new_subpath)][subpath]
+    at_start = (np.abs(raw_starts - raw_end) < EPS).all(axis=1)
+    # moves closing the sub path before them
+    before = np.roll(end, 1, axis=0)
+    start_before = np.roll(starts, 1, axis=0)
+    close = is_move & ~first & np.roll(at_start, 1)
+    # current point of the path data before each segment
+    current = np.where(close[:, None], start_before, before)
+    current[first] = 0
+    # deltas to the current point, curves have three points
+    points = np.zeros((n, 6), dtype=np.int64)
+    points[curve] = q[offsets[curve][:, None] + np.arange(6)] - np.tile(current[curve], 3)
+    points[~curve, :2] = end[~curve] - current[~curve]
+
+    # 0: c, 1: m, 2: zm, 3: l, 4: h, 5: v, 6, 7: trailing m, zm
+    commands = np.array(["c", "m", "zm", "l", "h", "v", "", "z"], dtype=object)
+    kind = np.full(n, 3)
+    kind[curve] = 0
+    kind[~curve & (points[:, 1] == 0)] = 4
+    kind[~curve & (points[:, 0] == 0)] = 5
+    kind[is_move] = 1 + close[is_move]
+    points[kind == 5, 0] = points[kind == 5, 1]
+    kind[is_move & last] += 5  # they draw nothing
+    counts = np.array([6, 2, 2, 2, 1, 1, 0, 0])[kind]
+    values = points[np.arange(6) < counts[:, None]]
+    firsts = np.cumsum(counts) - counts
+
+    v = values
+    negative = v < 0
+    integral, fraction = np.divmod(np.abs(v), scale)
+    digits = np.full(len(v), precision)
+    for _ in range(precision):
+        strip = (fraction != 0) & (fraction % 10 == 0)
+        fraction[strip] //= 10
+        digits[strip] -= 1
+    digits[fraction == 0] = 0
+    has_dot = digits > 0
+    has_integral = ~has_dot | (integral != 0)
+    # a separator is needed unless the number follows a command, starts
+    # with - or starts with a . following a number that already has one
+    separate = np.ones(len(v), dtype=bool)
+    separate[firsts[counts > 0]] = False
+    separate &= ~negative & (has_integral | ~np.roll(has_dot, 1))
+    formats = np.array([space + sign + ("%d" if integral else "") + (f".%0{d}d" if d else "")
+                        for space in ("", " ") for sign in ("", "-")
+                        for integral in (False, True) for d in range(precision + 1)],
+                       dtype=object)
+    number_formats = formats[((separate * 2 + negative) * 2 + has_integral) * (precision + 1) + digits]
+
+    # pathes end with a new line, closed ones with a z before
+    closed = last & ~is_move & at_start
+    ends = np.full(len(pathes), "\n", dtype=object)
+    ends[path_of[closed]] = "z\n"
+    numbers_per_path = np.cumsum(np.bincount(path_of, weights=counts, minlength=len(pathes))).astype(np.intp)
+
+    # commands go before their first number, the ends after the last
+    tokens = np.concatenate([commands[kind], number_formats, ends])
+    position = np.concatenate([2 * firsts, 2 * np.arange(len(v)) + 1, 2 * numbers_per_path])
+    ties = np.concatenate([2 * path_of, np.zeros(len(v), dtype=np.intp), 2 * np.arange(len(pathes)) + 1])
+    template = "".join(tokens[np.lexsort((ties, position))].tolist())
+    numbers = np.column_stack([integral, fraction])[np.column_stack([has_integral, has_dot])]
+    return (template % tuple(numbers.tolist())).split("\n")[:-1]
 
 
 def points_equal(x1, y1, x2, y2):
@@ -43,6 +159,12 @@ class Surface:
 
     scale = 1.0
     invert_y = False
+    profiler = None  # boxes.profiler.Profiler if profiling is enabled
+
+    # cut order of the colors, see optimize_order()
+    color_order = [
+        Color.ETCHING, Color.ETCHING_DEEP, Color.MAGENTA, Color.YELLOW,
+        Color.WHITE, Color.INNER_CUT, Color.OUTER_CUT]
 
     def __init__(self) -> None:
         self.parts: list[Any] = []
@@ -58,6 +180,62 @@ class Surface:
     def finish(self):
         pass
 
+    def faster_edges(self, path, inner_corners):
+        path.faster_edges(inner_corners)
+
+    def optimize_order(self):
+        """Reorder and reverse the pathes to reduce the travel between them
+
+        Parts are cut one after another, the nearest first. Within a part
+        the colors are cut in the order of color_order (others last),
+        nested pathes before the ones enclosing them (see boxes.pathorder).
+        Pathes with texts keep their direction. Call after flush().
+        Returns the travel length in mm before and after.
+        """
+        parts = [part for part in self.parts if part.pathes]
+        if not parts:
+            return 0.0, 0.0
+        e = self.extents()
+        pos = (e.xmin, e.ymax if self.invert_y else e.ymin)  # top left on the page
+        colors = [[float(c) for c in rgb] for rgb in self.color_order]
+        strokes = []
+        for part in parts:
+            strokes.append([])
+            for path in part.pathes:
+                start, end = path.start_point(), path.end_point()
+                points = np.frombuffer(path.coords, dtype=np.float64).reshape(-1, 2)
+                rgb = [float(c) for c in path.params["rgb"]]
+                strokes[-1].append((
+                    start, end, (*points.min(axis=0), *points.max(axis=0)),
+                    points_equal(*start, *end),
+                    colors.index(rgb) if rgb in colors else len(colors),
+                    not path.texts))
+        all_strokes = [s for part in strokes for s in part]
+        n = len(all_strokes)
+        before = pathorder.travel_length(
+            [s[0] for s in all_strokes], [s[1] for s in all_strokes],
+            np.arange(n), np.zeros(n, dtype=bool), pos)
+
+        order = pathorder.order_parts(strokes, pos)
+        pathes = [part.pathes for part in parts]
+        new_parts: list[Part] = []
+        for p, i, flipped in order:
+            part = parts[p]
+            if not new_parts or new_parts[-1] is not part:
+                new_parts.append(part)
+                part.pathes = []
+                part._ends = None
+            path = pathes[p][i]
+            if flipped:
+                path.reverse()
+            part.pathes.append(path)
+        self.parts = new_parts + [part for part in self.parts if not part.pathes]
+
+        after = pathorder.travel_length(
+            [strokes[p][i][0] for p, i, _ in order], [strokes[p][i][1] for p, i, _ in order],
+            np.arange(n), np.array([f for _, _, f in order], dtype=bool), pos)
+        return before, after
+
     def _adjust_coordinates(self):
         extents = self.extents()
         extents.xmin -= PADDING
@@ -84,7 +262,11 @@ class Surface:
 
     def transform(self, f, m, invert_y=False):
         for p in self.parts:
-            p.transform(f, m, invert_y)
+            assert(not p.path)
+        transform_pathes(self._all_pathes(), f, m, invert_y)
+
+    def _all_pathes(self):
+        return [path for part in self.parts for path in part.pathes]
 
     def new_part(self, name="part"):
         if self.parts and len(self.parts[-1].pathes) == 0:
@@ -107,128 +289,393 @@ class Surface:
         self._p.move_to(*xy)
 
     def extents(self):
-        if not self.parts:
-            return Extents()
-        return sum([p.extents() for p in self.parts])
+        return pathes_extents(self._all_pathes())
 
 
 class Part:
     def __init__(self, name) -> None:
         self.pathes: list[Any] = []
-        self.path: list[Any] = []
+        self.path = Path()
+        # indices into self.pathes by the EPS sized grid cell of their end
+        # point, built on the first search
+        self._ends: dict[tuple[int, int], list[int]] | None = None
 
     def extents(self):
-        if not self.pathes:
-            return Extents()
-        return sum([p.extents() for p in self.pathes])
+        return pathes_extents(self.pathes)
 
     def transform(self, f, m, invert_y=False):
         assert(not self.path)
-        for p in self.pathes:
-            p.transform(f, m, invert_y)
+        transform_pathes(self.pathes, f, m, invert_y)
 
     def append(self, *path):
-        self.path.append(list(path))
+        self.path.append(*path)
 
     def stroke(self, **params):
-        if len(self.path) == 0:
+        path = self.path
+        if len(path) == 0:
             return
         # search for path ending at new start coordinates to append this path to
-        xy0 = self.path[0][1:3]
-        if (not points_equal(*xy0, *self.path[-1][1:3]) and
-            not self.path[0][0] == "T"):
-            for p in reversed(self.pathes):
-                xy1 = p.path[-1][1:3]
-                if points_equal(*xy0, *xy1) and p.params == params:
-                    p.path.extend(self.path[1:])
-                    self.path = []
-                    return p
-        p = Path(self.path, params)
-        self.pathes.append(p)
-        self.path = []
-        return p
+        xy0 = path.start_point()
+        if (not points_equal(*xy0, *path.end_point()) and
+            not path.ops[0] == OP_TEXT):
+            n = self._find_end(*xy0, params)
+            if n is not None:
+                p = self.pathes[n]
+                self._remove_end(n, p)
+                p.extend(path)
+                self._add_end(n, p)
+                self.path = Path()
+                return p
+        path.params = params
+        self.pathes.append(path)
+        self._add_end(len(self.pathes) - 1, path)
+        self.path = Path()
+        return path
+
+    @staticmethod
+    def _cell(x, y):
+        if math.isfinite(x) and math.isfinite(y):
+            return math.floor(x / EPS), math.floor(y / EPS)
+        return None
+
+    def _add_end(self, n, path) -> None:
+        if self._ends is None:
+            return
+        cell = self._cell(*path.end_point())
+        if cell is not None:
+            self._ends.setdefault(cell, []).append(n)
+
+    def _remove_end(self, n, path) -> None:
+        if self._ends is None:
+            return
+        cell = self._cell(*path.end_point())
+        if cell is not None:
+            self._ends[cell].remove(n)
+
+    def _find_end(self, x, y, params):
+        """Index of the last path ending at (x, y) with the same params
+
+        Points closer than EPS are in the same or a neighboring cell.
+        """
+        if self._ends is None:
+            self._ends = {}
+            for n, p in enumerate(self.pathes):
+                self._add_end(n, p)
+        cell = self._cell(x, y)
+        if cell is None:
+            return None
+        cx, cy = cell
+        found = None
+        for i in (cx - 1, cx, cx + 1):
+            for j in (cy - 1, cy, cy + 1):
+                for n in self._ends.get((i, j), ()):
+                    if found is not None and n < found:
+                        continue
+                    p = self.pathes[n]
+                    if points_equal(x, y, *p.end_point()) and p.params == params:
+                        found = n
+        return found
 
     def move_to(self, *xy):
-        if len(self.path) == 0:
-            self.path.append(["M", *xy])
-        elif self.path[-1][0] == "M":
-            self.path[-1] = ["M", *xy]
+        path = self.path
+        if len(path) == 0:
+            path.append("M", *xy)
+        elif path.ops[-1] == OP_MOVE:
+            path.coords[-2], path.coords[-1] = xy
         else:
-            xy0 = self.path[-1][1:3]
+            xy0 = path.end_point()
             if not points_equal(*xy0, *xy):
-                self.path.append(["M", *xy])
+                path.append("M", *xy)
+
+
+OP_MOVE = ord("M")
+OP_LINE = ord("L")
+OP_CURVE = ord("C")
+OP_TEXT = ord("T")
 
 
 class Path:
-    def __init__(self, path, params) -> None:
-        self.path = path
+    """Compact storage of a path
+
+    Segments are stored as one opcode byte each in ``ops`` and their
+    coordinates in the flat float array ``coords``. Lines, moves and texts
+    use one point, curves three points with the two control points first so
+    the end point of every segment is the last point stored for it. The
+    matrix, text and parameters of texts are kept in ``texts``.
+
+    Iterating over a path yields the segments in the list form used by the
+    surfaces: ``["M", x, y]``, ``["L", x, y]``,
+    ``["C", x, y, x1, y1, x2, y2]`` and ``["T", x, y, m, text, params]``.
+    """
+
+    __slots__ = ("ops", "coords", "texts", "params")
+
+    def __init__(self, path=(), params=None) -> None:
+        self.ops = bytearray()
+        self.coords = array("d")
+        self.texts: list[list[Any]] = []
         self.params = params
+        for c in path:
+            self.append(*c)
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def __iter__(self):
+        coords = self.coords
+        texts = iter(self.texts)
+        i = 0
+        for op in self.ops:
+            if op == OP_CURVE:
+                yield ["C", coords[i+4], coords[i+5],
+                       coords[i], coords[i+1], coords[i+2], coords[i+3]]
+                i += 6
+            elif op == OP_TEXT:
+                yield ["T", coords[i], coords[i+1], *next(texts)]
+                i += 2
+            else:
+                yield [chr(op), coords[i], coords[i+1]]
+                i += 2
 
     def __repr__(self) -> str:
-        l = len(self.path)
-        # x1,y1 = self.path[0][1:3]
+        l = len(self.ops)
         if l>0:
-            x2, y2 = self.path[-1][1:3]
+            x2, y2 = self.end_point()
             return f"Path[{l}] to ({x2:.2f},{y2:.2f})"
         return f"empty Path"
 
+    def append(self, C, x, y, *args):
+        if C == "C":
+            x1, y1, x2, y2 = args
+            self.coords.extend((x1, y1, x2, y2, x, y))
+        else:
+            self.coords.extend((x, y))
+            if C == "T":
+                self.texts.append(list(args))
+        self.ops.append(ord(C))
+
+    def reverse(self):
+        """Reverse the direction of the path in place
+
+        Moves are kept at the start of the sub paths they begin. Pathes
+        containing texts can not be reversed.
+        """
+        if self.texts:
+            raise ValueError("Can't reverse path with texts")
+        segments = list(self)
+        subpaths: list[list[Any]] = []
+        for c in segments:
+            if c[0] == "M" or not subpaths:
+                subpaths.append([c])
+            else:
+                subpaths[-1].append(c)
+        result = Path()
+        for sub in reversed(subpaths):
+            result.append("M", *sub[-1][1:3])
+            for k in range(len(sub) - 1, 0, -1):
+                c = sub[k]
+                x0, y0 = sub[k - 1][1:3]
+                if c[0] == "C":
+                    result.append("C", x0, y0, c[5], c[6], c[3], c[4])
+                else:
+                    result.append("L", x0, y0)
+        self.ops, self.coords = result.ops, result.coords
+
+    def extend(self, other):
+        """Append all but the first segment of other"""
+        ops = other.ops
+        self.ops += ops[1:]
+        self.coords.extend(other.coords[6 if ops[0] == OP_CURVE else 2:])
+        self.texts.extend(other.texts[1 if ops[0] == OP_TEXT else 0:])
+
+    def start_point(self):
+        if self.ops[0] == OP_CURVE:
+            return self.coords[4], self.coords[5]
+        return self.coords[0], self.coords[1]
+
+    def end_point(self):
+        return self.coords[-2], self.coords[-1]
+
     def extents(self):
-        e = Extents()
-        for p in self.path:
-            e.add(*p[1:3])
-            if p[0] == 'T':
-                m, text, params = p[3:]
-                h = params['fs']
-                l = len(text) * h * 0.7
-                align = params.get('align', 'left')
-                start, end = {
-                    'left' : (0, 1),
-                    'middle' : (-0.5, 0.5),
-                    'end' : (-1, 0),
-                    }[align]
-                for x in (start*l, end*l):
-                    for y in (0, h):
-                        x_, y_ = m * (x, y)
-                        e.add(x_, y_)
-        return e
+        return pathes_extents([self])
+
+    def text_extents(self, e):
+        """Add the (estimated) extents of the texts to e"""
+        for m, text, params in self.texts:
+            h = params['fs']
+            l = len(text) * h * 0.7
+            align = params.get('align', 'left')
+            start, end = {
+                'left' : (0, 1),
+                'middle' : (-0.5, 0.5),
+                'end' : (-1, 0),
+                }[align]
+            for x in (start*l, end*l):
+                for y in (0, h):
+                    x_, y_ = m * (x, y)
+                    e.add(x_, y_)
 
     def transform(self, f, m, invert_y=False):
-        self.params["lw"] *= f
-        for c in self.path:
-            C = c[0]
-            c[1], c[2] = m * (c[1], c[2])
-            if C == 'C':
-                c[3], c[4] = m * (c[3], c[4])
-                c[5], c[6] = m * (c[5], c[6])
-            if C == "T":
-                c[3] = m * c[3]
-                if invert_y:
-                    c[3] *= Affine.scale(1, -1)
+        transform_pathes([self], f, m, invert_y)
 
     def faster_edges(self, inner_corners):
         if inner_corners == "backarc":
             return
 
-        for (i, p) in enumerate(self.path):
-            if p[0] == "C" and i > 1 and i < len(self.path) - 1:
-                if self.path[i - 1][0] == "L" and self.path[i + 1][0] == "L":
-                    p11 = self.path[i - 2][1:3]
-                    p12 = self.path[i - 1][1:3]
+        path = list(self)
+        changed = False
+        for (i, p) in enumerate(path):
+            if p[0] == "C" and i > 1 and i < len(path) - 1:
+                if path[i - 1][0] == "L" and path[i + 1][0] == "L":
+                    p11 = path[i - 2][1:3]
+                    p12 = path[i - 1][1:3]
                     p21 = p[1:3]
-                    p22 = self.path[i + 1][1:3]
+                    p22 = path[i + 1][1:3]
                     if (((p12[0]-p21[0])**2 + (p12[1]-p21[1])**2) >
                         self.params["lw"]**2):
                         continue
                     lines_intersect, x, y = line_intersection((p11, p12), (p21, p22))
                     if lines_intersect:
-                        self.path[i - 1] = ("L", x, y)
+                        changed = True
+                        path[i - 1] = ("L", x, y)
                         if inner_corners == "loop":
-                            self.path[i] = ("C", x, y, *p12, *p21)
+                            path[i] = ("C", x, y, *p12, *p21)
                         else:
-                            self.path[i] =  ("L", x, y)
+                            path[i] =  ("L", x, y)
         # filter duplicates
-        if len(self.path) > 1: # no need to find duplicates if only one element in path
-            self.path = [p for n, p in enumerate(self.path) if p != self.path[n-1]]
+        if len(path) > 1: # no need to find duplicates if only one element in path
+            filtered = [p for n, p in enumerate(path) if p != path[n-1]]
+            changed = changed or len(filtered) != len(path)
+            path = filtered
+        if not changed:
+            return
+        self.ops = bytearray()
+        self.coords = array("d")
+        self.texts = []
+        for c in path:
+            self.append(*c)
+
+
+def _batches(pathes, size=1 << 16):
+    """Split pathes into groups of about size coordinates
+
+    Keeps the temporary buffers of the batch operations small.
+    """
+    batch = []
+    n = 0
+    for p in pathes:
+        batch.append(p)
+        n += len(p.coords)
+        if n >= size:
+            yield batch
+            batch = []
+            n = 0
+    if batch:
+        yield batch
+
+
+def _concat_pathes(pathes):
+    """Opcodes and points of all pathes in one contiguous buffer each"""
+    ops = b"".join([p.ops for p in pathes])
+    coords = array("d")
+    for p in pathes:
+        coords.extend(p.coords)
+    points = np.frombuffer(coords, dtype=np.float64).reshape(-1, 2)
+    return np.frombuffer(ops, dtype=np.uint8), points
+
+
+def pathes_extents(pathes):
+    """Extents of the end points and texts of all pathes
+
+    Control points of curves are ignored.
+    """
+    e = Extents()
+    for batch in _batches(pathes):
+        ops, points = _concat_pathes(batch)
+        if not len(points):
+            continue
+        if (ops == OP_CURVE).any():
+            points = points[np.cumsum(np.where(ops == OP_CURVE, 3, 1)) - 1]
+        xmin, ymin = points.min(axis=0).tolist()
+        xmax, ymax = points.max(axis=0).tolist()
+        e += Extents(xmin, ymin, xmax, ymax)
+    for p in pathes:
+        if p.texts:
+            p.text_extents(e)
+    return e
+
+
+def outline_extents(pathes):
+    """Extents of the lines and curves of all pathes
+
+    Unlike pathes_extents() this includes the parts of curves bulging
+    out between their end points and ignores texts and moves.
+    """
+    e = Extents()
+    for batch in _batches(pathes):
+        ops, points = _concat_pathes(batch)
+        if not len(points):
+            continue
+        sizes = np.where(ops == OP_CURVE, 3, 1)
+        ends = np.cumsum(sizes) - 1
+        drawn = (ops == OP_LINE) | (ops == OP_CURVE)
+        if not drawn.any():
+            continue
+        # pathes start with a move so the previous end point is in the same path
+        used = points[np.concatenate([ends[drawn], (ends - sizes)[drawn]])]
+        curves = ends[ops == OP_CURVE]
+        if len(curves):
+            p0, p1, p2, p3 = (points[curves - k] for k in (3, 2, 1, 0))
+            # roots of the derivative of each coordinate
+            a = -p0 + 3 * p1 - 3 * p2 + p3
+            b = 2 * (p0 - 2 * p1 + p2)
+            c = p1 - p0
+            with np.errstate(divide="ignore", invalid="ignore"):
+                root = np.sqrt(b * b - 4 * a * c)
+                linear = np.abs(a) < 1e-12
+                t1 = np.where(linear, -c / b, (-b + root) / (2 * a))
+                t2 = np.where(linear, np.nan, (-b - root) / (2 * a))
+            for t in (t1, t2):
+                t = np.where((t > 0) & (t < 1), t, 0.0)
+                u = 1 - t
+                bulge = u**3 * p0 + 3 * u * u * t * p1 + 3 * u * t * t * p2 + t**3 * p3
+                used = np.concatenate([used, bulge])
+        xmin, ymin = used.min(axis=0).tolist()
+        xmax, ymax = used.max(axis=0).tolist()
+        e += Extents(xmin, ymin, xmax, ymax)
+    return e
+
+
+def transform_pathes(pathes, f, m, invert_y=False):
+    """Apply the affine transformation m to all pathes
+
+    Works on batches of pathes at once. Line widths are scaled by f.
+    """
+    for p in pathes:
+        p.params["lw"] *= f
+    for batch in _batches(pathes):
+        _, points = _concat_pathes(batch)
+        if not len(points):
+            continue
+        x = points[:, 0]
+        y = points[:, 1]
+        result = np.empty_like(points)
+        # same order of operations as Affine.__mul__
+        result[:, 0] = x * m.a + y * m.b + m.c
+        result[:, 1] = x * m.d + y * m.e + m.f
+        buffer = memoryview(result).cast("B")
+        pos = 0
+        for p in batch:
+            n = len(p.coords) * p.coords.itemsize
+            p.coords = array("d")
+            p.coords.frombytes(buffer[pos:pos+n])
+            pos += n
+    for p in pathes:
+        for t in p.texts:
+            t[0] = m * t[0]
+            if invert_y:
+                t[0] *= Affine.scale(1, -1)
+
 
 class Context:
     def __init__(self, surface, *al, **ad) -> None:
@@ -304,13 +751,17 @@ class Context:
     def line_to(self, x, y):
         self._line_to(x, y)
 
-    def _arc(self, xc, yc, radius, angle1, angle2, direction):
+    @staticmethod
+    def _arc_points(xc, yc, radius, angle1, angle2):
+        """Control and end points of the Bézier curve drawn for an arc
+
+        None if the arc is too small to be drawn.
+        """
         if abs(angle1 - angle2) < EPS or radius < EPS:
-            return
+            return None
         x1, y1 = radius * math.cos(angle1) + xc, radius * math.sin(angle1) + yc
         x4, y4 = radius * math.cos(angle2) + xc, radius * math.sin(angle2) + yc
 
-        # XXX direction seems not needed for small arcs
         ax = x1 - xc
         ay = y1 - yc
         bx = x4 - xc
@@ -323,17 +774,13 @@ class Context:
         y2 = yc + ay + k2 * ax
         x3 = xc + bx + k2 * by
         y3 = yc + by - k2 * bx
+        return x2, y2, x3, y3, x4, y4
 
-        mx1, my1 = self._m * (x1, y1)
-        mx2, my2 = self._m * (x2, y2)
-        mx3, my3 = self._m * (x3, y3)
-        mx4, my4 = self._m * (x4, y4)
-        mxc, myc = self._m * (xc, yc)
-
-        self._add_move()
-        self._dwg.append("C", mx4, my4, mx2, my2, mx3, my3)
-        self._xy = (x4, y4)
-        self._mxy = (mx4, my4)
+    def _arc(self, xc, yc, radius, angle1, angle2, direction):
+        # XXX direction seems not needed for small arcs
+        points = self._arc_points(xc, yc, radius, angle1, angle2)
+        if points is not None:
+            self.curve_to(*points)
 
     def arc(self, xc, yc, radius, angle1, angle2):
         self._arc(xc, yc, radius, angle1, angle2, 1)
@@ -392,6 +839,30 @@ class Context:
         self.line_to(x, y)
         self.stroke()
 
+    def stamp(self, calls, x, y):
+        """Repeat calls kept by a ContextRecorder moved by (x, y) in the
+        current coordinates
+
+        (x, y) is added to the first translation instead of multiplying
+        the matrix with another one. This gives the same coordinates as
+        drawing at (x, y) directly, e.g. with Boxes.hole(). Check
+        ContextRecorder.movable first.
+        """
+        moved = False
+        for name, args, m in calls:
+            if not moved:
+                if name == "translate":
+                    m = Affine.translation(x + args[0], y + args[1])
+                    moved = True
+                elif name not in ContextRecorder._unmoved:
+                    raise ValueError("Recording needs to start with a translation")
+            if m is None:
+                getattr(self, name)(*args)
+            else:
+                self._m *= m
+                if name == "translate":
+                    self._xy = (0, 0)
+
     def get_current_point(self):
         return self._xy
 
@@ -405,9 +876,103 @@ class Context:
         self._dwg.new_part()
 
 
+class ContextRecorder:
+    """Stands in for a Context and keeps the calls made to it
+
+    Nothing is drawn. The calls can be repeated at other positions with
+    Context.stamp(). Transformations are kept as matrices and arcs as the
+    curves drawn for them, so they are not calculated again.
+    """
+
+    # calls allowed before the first translation of a movable recording
+    _unmoved = ("save", "move_to", "set_source_rgb", "set_line_width", "stroke")
+
+    def __init__(self, ctx) -> None:
+        self.calls: list[tuple[str, tuple[Any, ...], Affine | None]] = []
+        # current point as Context keeps it
+        self._xy = ctx.get_current_point()
+        self._stack: list[tuple[float, float]] = []
+
+    @property
+    def movable(self) -> bool:
+        """Whether the calls translate before drawing anything"""
+        for name, _, _ in self.calls:
+            if name == "translate":
+                return True
+            if name not in self._unmoved:
+                return False
+        return False
+
+    def _keep(self, name, *args, m=None):
+        self.calls.append((name, args, m))
+
+    def get_current_point(self):
+        return self._xy
+
+    def save(self):
+        self._keep("save")
+        self._stack.append(self._xy)
+        self._xy = (0, 0)
+
+    def restore(self):
+        self._keep("restore")
+        self._xy = self._stack.pop()
+
+    def translate(self, x, y):
+        self._keep("translate", x, y, m=Affine.translation(x, y))
+        self._xy = (0, 0)
+
+    def scale(self, sx, sy):
+        self._keep("scale", sx, sy, m=Affine.scale(sx, sy))
+
+    def rotate(self, r):
+        self._keep("rotate", r, m=Affine.rotation(180 * r / math.pi))
+
+    def set_line_width(self, lw):
+        self._keep("set_line_width", lw)
+
+    def set_source_rgb(self, r, g, b):
+        self._keep("set_source_rgb", r, g, b)
+
+    def move_to(self, x, y):
+        self._keep("move_to", x, y)
+        self._xy = (x, y)
+
+    def line_to(self, x, y):
+        self._keep("line_to", x, y)
+        self._xy = (x, y)
+
+    def curve_to(self, x1, y1, x2, y2, x3, y3):
+        self._keep("curve_to", x1, y1, x2, y2, x3, y3)
+        self._xy = (x3, y3)
+
+    def arc(self, xc, yc, radius, angle1, angle2):
+        points = Context._arc_points(xc, yc, radius, angle1, angle2)
+        if points is not None:
+            self.curve_to(*points)
+
+    arc_negative = arc
+
+    def rectangle(self, x, y, width, height):
+        self._keep("rectangle", x, y, width, height)
+        self._xy = (0, 0)
+
+    def stroke(self):
+        self._keep("stroke")
+        self._xy = (0, 0)
+
+
 class SVGSurface(Surface):
 
     invert_y = True
+    chunk_size = 1 << 16  # characters per chunk yielded by stream()
+    # write pathes of the same shape once as <defs> and <use> them
+    use_symbols = False
+    symbol_min_segments = 4
+    # digits after the decimal point of coordinates
+    precision = 3
+    # relative commands without unneeded characters in path data
+    compact_paths = False
 
     fonts = {
         'serif' : 'TimesNewRoman, "Times New Roman", Times, Baskerville, Georgia, serif',
@@ -415,42 +980,43 @@ class SVGSurface(Surface):
         'monospaced' : '"Courier New", Courier, "Lucida Sans Typewriter"'
     }
 
-    def _addTag(self, parent, tag, text, first=False):
-        if first:
-            t = ET.Element(tag)
-        else:
-            t = ET.SubElement(parent, tag)
-        t.text = text
-        t.tail = '\n'
-        if first:
-            parent.insert(0, t)
-        return t
-
-    def _add_metadata(self, root) -> None:
+    def _metadata(self) -> str:
         md = self.metadata
 
         title = "{group} - {name}".format(**md)
         creation_date: str = md["creation_date"].strftime("%Y-%m-%d %H:%M:%S")
 
-        # Add Inkscape style rdf meta data
-        root.set("xmlns:dc", "http://purl.org/dc/elements/1.1/")
-        root.set("xmlns:cc", "http://creativecommons.org/ns#")
-        root.set("xmlns:rdf", "http://www.w3.org/1999/02/22-rdf-syntax-ns#")
+        # Add XML comment
+        txt = """\n{name} - {short_description}\n""".format(**md)
+        if md["description"]:
+            txt += """\n\n{description}\n\n""".format(**md)
+        txt += """\nCreated with Boxes.py (https://boxes.hackerspace-bamberg.de/)\n"""
+        if not md["reproducible"]:
+            txt += f"""Creation date: {creation_date}\n"""
+
+        txt += "Command line (remove spaces between dashes): %s\n" % md["cli_short"]
+
+        if md["url"]:
+            txt += "Url: %s\n" % md["url"]
+            txt += "Url short: %s\n" % md["url_short"]
+            txt += "SettingsUrl: %s\n" % md["url"].replace("&render=1", "")
+            txt += "SettingsUrl short: %s\n" % md["url_short"].replace("&render=1", "")
+        result = ["<!--%s-->\n" % txt.replace("--", "- -").replace("--", "- -")] # ----
 
-        m = self._addTag(root, "metadata", '\n', True)
-        r = ET.SubElement(m, 'rdf:RDF')
-        w = ET.SubElement(r, 'cc:Work')
-        w.text = '\n'
+        # title
+        result.append(_xml_element("title", {}, md["name"]) + "\n")
 
-        self._addTag(w, 'dc:title', title)
+        # Add Inkscape style rdf meta data
+        result.append("<metadata>\n<rdf:RDF><cc:Work>\n")
+        tags = [('dc:title', title)]
         if not md["reproducible"]:
-            self._addTag(w, 'dc:date', creation_date)
+            tags.append(('dc:date', creation_date))
 
         if md.get("url"):
-            self._addTag(w, 'dc:source', md["url"])
-            self._addTag(w, 'dc:source', md["url_short"])
+            tags.append(('dc:source', md["url"]))
+            tags.append(('dc:source', md["url_short"]))
         else:
-            self._addTag(w, 'dc:source', md["cli"])
+            tags.append(('dc:source', md["cli"]))
 
         desc = md["short_description"] or ""
         if md.get("description"):
@@ -463,36 +1029,194 @@ class SVGSurface(Surface):
             desc += "Url short: %s\n" % md["url_short"]
             desc += "SettingsUrl: %s\n" % md["url"].replace("&render=1", "")
             desc += "SettingsUrl short: %s\n" % md["url_short"].replace("&render=1", "")
-        self._addTag(w, 'dc:description', desc)
-
-        # title
-        self._addTag(root, "title", md["name"], True)
-
-        # Add XML comment
-        txt = """\n{name} - {short_description}\n""".format(**md)
-        if md["description"]:
-            txt += """\n\n{description}\n\n""".format(**md)
-        txt += """\nCreated with Boxes.py (https://boxes.hackerspace-bamberg.de/)\n"""
-        if not md["reproducible"]:
-            txt += f"""Creation date: {creation_date}\n"""
-
-        txt += "Command line (remove spaces between dashes): %s\n" % md["cli_short"]
-
-        if md["url"]:
-            txt += "Url: %s\n" % md["url"]
-            txt += "Url short: %s\n" % md["url_short"]
-            txt += "SettingsUrl: %s\n" % md["url"].replace("&render=1", "")
-            txt += "SettingsUrl short: %s\n" % md["url_short"].replace("&render=1", "")
-        m = ET.Comment(txt.replace("--", "- -").replace("--", "- -")) # ----
-        m.tail = '\n'
-        root.insert(0, m)
-
-    def finish(self, inner_corners="loop"):
+        tags.append(('dc:description', desc))
+        for tag, text in tags:
+            result.append(_xml_element(tag, {}, text) + "\n")
+        result.append("</cc:Work></rdf:RDF></metadata>\n")
+        return "".join(result)
+
+    def _part(self, i, part, inner_corners, uses=None):
+        """Generate the serialized group of a part piece by piece
+
+        uses maps id(path) to the <use> element replacing it (see _symbols()).
+        Their faster_edges() must already be done.
+        """
+        pathes = part.pathes
+        if uses is None:
+            for path in pathes:
+                self.faster_edges(path, inner_corners)
+            uses = {}
+        attrib = {
+            "id": f"p-{i}",
+            "style": "fill:none;stroke-linecap:round;stroke-linejoin:round;"}
+        e = outline_extents(pathes)
+        if e.xmin <= e.xmax:
+            # spares others (like svgmerge) parsing the pathes
+            attrib["data-bbox"] = " ".join(
+                f"{v:.{self.precision}f}" for v in (e.xmin, e.ymin, e.xmax, e.ymax))
+        yield _xml_start_tag("g", attrib) + ">"
+        empty = True
+        if self.compact_paths:
+            data = _compact_path_data(pathes, self.precision)
+        else:
+            data = [None] * len(pathes)
+        for path, d in zip(pathes, data):
+            if id(path) in uses:
+                elements = [uses[id(path)]]
+            else:
+                elements = self._elements(path, d=d)
+            for element in elements:
+                yield "\n  " + element
+                empty = False
+        yield "\n  </g>\n" if empty else "\n</g>\n"
+
+    def _symbols(self, inner_corners):
+        """Find pathes of the same shape up to translation and rotation
+
+        Returns the serialized <defs> and a dict mapping id(path) to the
+        <use> element replacing the path.
+        """
+        shapes: dict[Any, list[tuple[Any, Any, float]]] = {}
+        for path in self._all_pathes():
+            self.faster_edges(path, inner_corners)
+            if len(path) < self.symbol_min_segments or path.texts:
+                continue
+            points = np.frombuffer(path.coords, dtype=np.float64).reshape(-1, 2)
+            d = points - path.start_point()
+            # rotate the first point away from the start onto the x axis
+            away = np.flatnonzero(np.abs(d).max(axis=1) > EPS)
+            if not len(away):
+                continue
+            angle = math.atan2(d[away[0], 1], d[away[0], 0])
+            c, s = math.cos(angle), math.sin(angle)
+            q = np.column_stack([c * d[:, 0] + s * d[:, 1], c * d[:, 1] - s * d[:, 0]])
+            key = (bytes(path.ops), (np.round(q, self.precision) + 0.0).tobytes(),
+                   tuple(path.params["rgb"]), path.params["lw"])
+            shapes.setdefault(key, []).append((path, q, angle))
+
+        defs = []
+        uses = {}
+        for instances in shapes.values():
+            if len(instances) < 2:
+                continue
+            n = len(defs)
+            path, q, _ = instances[0]
+            symbol = Path(params=path.params)
+            symbol.ops = bytearray(path.ops)
+            symbol.coords = array("d", q.ravel().tolist())
+            defs.extend(self._elements(symbol, {"id": f"s-{n}"}))
+            for path, _, angle in instances:
+                x, y = path.start_point()
+                transform = f"translate({x:.{self.precision}f} {y:.{self.precision}f})"
+                if abs(angle) > 1e-9:
+                    transform += f" rotate({math.degrees(angle):.6f})"
+                uses[id(path)] = _xml_element(
+                    "use", {"xlink:href": f"#s-{n}", "transform": transform})
+        if not defs:
+            return "", uses
+        return ("<defs style=\"fill:none;stroke-linecap:round;stroke-linejoin:round;\">\n  " +
+                "\n  ".join(defs) + "\n</defs>\n"), uses
+
+    def _elements(self, path, attrib=None, d=None):
+        """Serialized text and path elements of one path
+
+        attrib are extra attributes of the path element. d is the path
+        data if already known.
+        """
+        elements = [self._text(m, text, params) for m, text, params in path.texts]
+        if d is None:
+            if self.compact_paths:
+                d, = _compact_path_data([path], self.precision)
+            else:
+                d = self._path_data(path)
+        color = (
+            random_svg_color()
+            if RANDOMIZE_COLORS
+            else rgb_to_svg_color(*path.params["rgb"])
+        )
+        if d:  # might be empty if only contains text
+            elements.append(_xml_element("path", {
+                **(attrib or {}),
+                "d": d,
+                "stroke": color,
+                "stroke-width": f'{path.params["lw"]:.2f}'}))
+        return elements
+
+    def _text(self, m, text, params):
+        m = m * Affine.translation(0, -params['fs'])
+        tm = " ".join(f"{m[i]:.3f}" for i in (0, 3, 1, 4, 2, 5))
+        font, bold, italic = params['ff']
+        fontweight = ("normal", "bold")[bool(bold)]
+        fontstyle = ("normal", "italic")[bool(italic)]
+
+        style = f"font-family: {font} ; font-weight: {fontweight}; font-style: {fontstyle}; fill: {rgb_to_svg_color(*params['rgb'])}"
+        return _xml_element("text", {
+            "transform": f"matrix( {tm} )",
+            "style": style,
+            "font-size": f"{params['fs']}px",
+            "text-anchor": params.get('align', 'left'),
+            "dominant-baseline": 'hanging'}, text)
+
+    def _path_data(self, path):
+        """Path data with absolute commands
+
+        All numbers are formatted at once from a template built for the
+        whole path.
+        """
+        f = f"%.{self.precision}f"
+        M, L, H, V = f"M {f} {f}", f"L {f} {f}", f"H {f}", f"V {f}"
+        C = "C " + " ".join([f] * 6)
+        coords = path.coords
+        p = []
+        values: list[float] = []
+        x = y = 0.0
+        start = last = None
+        i = 0
+        for op in path.ops:
+            x0, y0 = x, y
+            if op == OP_CURVE:
+                x, y = coords[i+4], coords[i+5]
+                p.append(C)
+                values.extend(coords[i:i+6])
+                i += 6
+            else:
+                x, y = coords[i], coords[i+1]
+                i += 2
+                if op == OP_MOVE:
+                    if start and points_equal(*start, *last):
+                        p.append("Z")
+                    start = (x, y)
+                    p.append(M)
+                    values += (x, y)
+                elif op == OP_LINE:
+                    if abs(x - x0) < EPS:
+                        p.append(V)
+                        values.append(y)
+                    elif abs(y - y0) < EPS:
+                        p.append(H)
+                        values.append(x)
+                    else:
+                        p.append(L)
+                        values += (x, y)
+            last = (x, y)
+
+        if start and path.ops[-1] != OP_MOVE and points_equal(*start, *last):
+            p.append("Z")
+        if p and p[-1] is M:
+            p.pop()
+            del values[-2:]
+        return " ".join(p) % tuple(values)
+
+    def stream(self, inner_corners="loop"):
+        """Generate the SVG document as chunks of UTF-8 encoded bytes
+
+        Elements are serialized as the chunks are consumed without building
+        the whole document in memory.
+        """
         extents = self._adjust_coordinates()
         w = extents.width * self.scale
         h = extents.height * self.scale
 
-
         nsmap = {
                 "dc": "http://purl.org/dc/elements/1.1/",
                 "cc": "http://creativecommons.org/ns#",
@@ -501,96 +1225,43 @@ class SVGSurface(Surface):
                 "xlink": "http://www.w3.org/1999/xlink",
                 "inkscape": "http://www.inkscape.org/namespaces/inkscape",
             }
-        ET.register_namespace("", "http://www.w3.org/2000/svg")
-        ET.register_namespace("xlink", "http://www.w3.org/1999/xlink")
-        svg = ET.Element('svg', width=f"{w:.2f}mm", height=f"{h:.2f}mm",
-                         viewBox=f"0.0 0.0 {w:.2f} {h:.2f}",
-                         xmlns="http://www.w3.org/2000/svg")
+        attrib = {
+            "width": f"{w:.2f}mm", "height": f"{h:.2f}mm",
+            "viewBox": f"0.0 0.0 {w:.2f} {h:.2f}",
+            "xmlns": "http://www.w3.org/2000/svg"}
         for name, value in nsmap.items():
-            svg.set(f"xmlns:{name}", value)
-        svg.text = "\n"
-        tree = ET.ElementTree(svg)
+            attrib[f"xmlns:{name}"] = value
 
-        self._add_metadata(svg)
+        defs, uses = self._symbols(inner_corners) if self.use_symbols else ("", None)
+        yield _encode("<?xml version='1.0' encoding='utf-8'?>\n" +
+                      _xml_start_tag("svg", attrib) + ">\n" +
+                      self._metadata() + defs)
 
+        chunk = []
+        size = 0
         for i, part in enumerate(self.parts):
             if not part.pathes:
                 continue
-            g = ET.SubElement(svg, "g", id=f"p-{i}",
-                              style="fill:none;stroke-linecap:round;stroke-linejoin:round;")
-            g.text = "\n  "
-            g.tail = "\n"
-            for j, path in enumerate(part.pathes):
-                p = []
-                x, y = 0, 0
-                start = None
-                last = None
-                path.faster_edges(inner_corners)
-                for c in path.path:
-                    x0, y0 = x, y
-                    C, x, y = c[0:3]
-                    if C == "M":
-                        if start and points_equal(start[1], start[2],
-                                                  last[1], last[2]):
-                            p.append("Z")
-                        start = c
-                        p.append(f"M {x:.3f} {y:.3f}")
-                    elif C == "L":
-                        if abs(x - x0) < EPS:
-                            p.append(f"V {y:.3f}")
-                        elif abs(y - y0) < EPS:
-                            p.append(f"H {x:.3f}")
-                        else:
-                            p.append(f"L {x:.3f} {y:.3f}")
-                    elif C == "C":
-                        x1, y1, x2, y2 = c[3:]
-                        p.append(
-                            f"C {x1:.3f} {y1:.3f} {x2:.3f} {y2:.3f} {x:.3f} {y:.3f}"
-                        )
-                    elif C == "T":
-                        m, text, params = c[3:]
-                        m = m * Affine.translation(0, -params['fs'])
-                        tm = " ".join(f"{m[i]:.3f}" for i in (0, 3, 1, 4, 2, 5))
-                        font, bold, italic = params['ff']
-                        fontweight = ("normal", "bold")[bool(bold)]
-                        fontstyle = ("normal", "italic")[bool(italic)]
-
-                        style = f"font-family: {font} ; font-weight: {fontweight}; font-style: {fontstyle}; fill: {rgb_to_svg_color(*params['rgb'])}"
-                        t = ET.SubElement(g, "text",
-                                          #x=f"{x:.3f}", y=f"{y:.3f}",
-                                          transform=f"matrix( {tm} )",
-                                          style=style)
-                        t.text = text
-                        t.set("font-size", f"{params['fs']}px")
-                        t.set("text-anchor", params.get('align', 'left'))
-                        t.set("dominant-baseline", 'hanging')
-                        t.tail = "\n  "
-                    else:
-                        print("Unknown", c)
-
-                    last = c
+            for text in self._part(i, part, inner_corners, uses):
+                chunk.append(text)
+                size += len(text)
+                if size >= self.chunk_size:
+                    yield _encode("".join(chunk))
+                    chunk = []
+                    size = 0
+        if self.profiler is not None:
+            chunk.append("<!--\nProfile:\n%s-->\n" % self.profiler.report())
+        chunk.append("</svg>")
+        yield _encode("".join(chunk))
 
-                if start and start is not last and \
-                   points_equal(start[1], start[2], last[1], last[2]):
-                    p.append("Z")
-                color = (
-                    random_svg_color()
-                    if RANDOMIZE_COLORS
-                    else rgb_to_svg_color(*path.params["rgb"])
-                )
-                if p and p[-1][0] == "M":
-                    p.pop()
-                if p:  # might be empty if only contains text
-                    t = ET.SubElement(g, "path", d=" ".join(p), stroke=color)
-                    t.set("stroke-width", f'{path.params["lw"]:.2f}')
-                    t.tail = "\n  "
-            t.tail = "\n"
-        reorder_attributes(tree)
+    def finish(self, inner_corners="loop"):
         f = io.BytesIO()
-        tree.write(f, encoding="utf-8", xml_declaration=True, method="xml")
+        for chunk in self.stream(inner_corners):
+            f.write(chunk)
         f.seek(0)
         return f
 
+
 class PSSurface(Surface):
 
     scale = 72 / 25.4 # 72 dpi
@@ -682,9 +1353,9 @@ class PSSurface(Surface):
             for j, path in enumerate(part.pathes):
                 p = []
                 x, y = 0, 0
-                path.faster_edges(inner_corners)
+                self.faster_edges(path, inner_corners)
 
-                for c in path.path:
+                for c in path:
                     x0, y0 = x, y
                     C, x, y = c[0:3]
                     if C == "M":
@@ -844,24 +1515,25 @@ class LBRN2Surface(Surface):
                 C = ""
                 start = None
                 last = None
-                path.faster_edges(inner_corners)
+                self.faster_edges(path, inner_corners)
+                segments = list(path)
                 num = 0
                 cnt = 1
-                end = len(path.path) - 1
+                end = len(segments) - 1
                 if self.dbg:
-                    for c in path.path:
+                    for c in segments:
                         print ("6",num, c)
                         num += 1
                     num = 0
 
-                c = path.path[num]
+                c = segments[num]
                 C, x, y = c[0:3]
                 if self.dbg:
                     print("end:", end)
-                while num < end or (C == "T" and num <= end):  # len(path.path):
+                while num < end or (C == "T" and num <= end):  # len(segments):
                     if self.dbg:
                         print("0", num)
-                    c = path.path[num]
+                    c = segments[num]
                     if self.dbg: print("first: ", num, c)
 
                     C, x, y = c[0:3]
@@ -881,9 +1553,9 @@ class LBRN2Surface(Surface):
                         # do something with M
                         done = False
                         bspline = False
-                        while done == False and num < end:  # len(path.path):
+                        while done == False and num < end:  # len(segments):
                             num += 1
-                            c = path.path[num]
+                            c = segments[num]
                             if self.dbg: print ("next: ",num, c)
                             C, x, y = c[0:3]
                             if C == "M":
@@ -1005,6 +1677,326 @@ class LBRN2Surface(Surface):
         f.seek(0)
         return f
 
+class DXFSurface(Surface):
+    """AutoCAD R12 DXF in mm
+
+    Paths become POLYLINEs with arcs as bulges, single lines LINEs and
+    single arcs and circles ARCs and CIRCLEs. Other Bézier curves are
+    flattened as R12 has no splines. There is one layer per color.
+    """
+
+    chunk_size = 1 << 16  # characters per chunk yielded by stream()
+    flatness = 0.01  # max distance of flattened curves in mm
+
+    # AutoCAD Color Index and layer names of the colors in boxes.Color
+    colors = {
+        (0.0, 0.0, 0.0): (7, "BLACK"),
+        (0.0, 0.0, 1.0): (5, "BLUE"),
+        (0.0, 1.0, 0.0): (3, "GREEN"),
+        (1.0, 0.0, 0.0): (1, "RED"),
+        (0.0, 1.0, 1.0): (4, "CYAN"),
+        (1.0, 1.0, 0.0): (2, "YELLOW"),
+        (1.0, 0.0, 1.0): (6, "MAGENTA"),
+        (1.0, 1.0, 1.0): (7, "WHITE"),
+    }
+
+    def _layer(self, rgb) -> str:
+        rgb = tuple(float(c) for c in rgb)
+        layer = self.colors.get(rgb)
+        if layer is None:
+            name = "RGB_%02X%02X%02X" % tuple(round(c * 255) for c in rgb)
+            layer = (7, name)
+        self._layers.setdefault(layer[1], layer[0])
+        return layer[1]
+
+    def _metadata(self) -> str:
+        md = self.metadata
+        lines = ["{name} - {short_description}".format(**md)]
+        if md["description"]:
+            lines.extend(md["description"].split("\n"))
+        lines.append("Created with Boxes.py (https://boxes.hackerspace-bamberg.de/)")
+        if not md["reproducible"]:
+            lines.append("Creation date: %s" % md["creation_date"].strftime("%Y-%m-%d %H:%M:%S"))
+        lines.append("Command line: %s" % md["cli"])
+        lines.append("Command line short: %s" % md["cli_short"])
+        if md["url"]:
+            lines.append("Url: %s" % md["url"])
+            lines.append("Url short: %s" % md["url_short"])
+        return "".join(f"999\n{_dxf_text(line)}\n"
+                       for text in lines for line in text.split("\n"))
+
+    def _path(self, path, inner_corners):
+        """DXF entities of one path"""
+        entities = []
+        self.faster_edges(path, inner_corners)
+        layer = self._layer(path.params["rgb"])
+        segments: list[tuple[float, float, Any]] = []
+
+        for c in path:
+            C, x, y = c[0:3]
+            if C == "M":
+                entities.append(self._polyline(segments, layer))
+                segments = [(x, y, None)]
+            elif C == "L":
+                segments.append((x, y, None))
+            elif C == "C":
+                x0, y0 = segments[-1][0:2] if segments else (x, y)
+                x1, y1, x2, y2 = c[3:]
+                arc = bezier_arc(x0, y0, x1, y1, x2, y2, x, y)
+                if arc is not None:
+                    segments.append((x, y, arc))
+                else:
+                    for xi, yi in flatten_bezier(x0, y0, x1, y1, x2, y2, x, y,
+                                                 self.flatness):
+                        segments.append((xi, yi, None))
+            elif C == "T":
+                entities.append(self._text(x, y, *c[3:]))
+            else:
+                print("Unknown", c)
+        entities.append(self._polyline(segments, layer))
+        return entities
+
+    def _polyline(self, segments, layer) -> str:
+        """Entity of a connected list of (x, y, arc) segments
+
+        arc is (xc, yc, r, sweep) of the arc ending at (x, y) or None for a line.
+        """
+        if len(segments) < 2:
+            return ""
+        x0, y0 = segments[0][0:2]
+        x, y = segments[-1][0:2]
+        closed = points_equal(x0, y0, x, y)
+        arcs = [s[2] for s in segments[1:]]
+        if len(segments) == 2 and not closed:
+            if arcs[0] is None:
+                return (f"0\nLINE\n8\n{layer}\n10\n{x0:.4f}\n20\n{y0:.4f}\n30\n0.0\n"
+                        f"11\n{x:.4f}\n21\n{y:.4f}\n31\n0.0\n")
+            xc, yc, r, sweep = arcs[0]
+            a1 = math.degrees(math.atan2(y0 - yc, x0 - xc))
+            a2 = math.degrees(math.atan2(y - yc, x - xc))
+            if sweep < 0:
+                a1, a2 = a2, a1
+            return (f"0\nARC\n8\n{layer}\n10\n{xc:.4f}\n20\n{yc:.4f}\n30\n0.0\n"
+                    f"40\n{r:.4f}\n50\n{a1 % 360:.4f}\n51\n{a2 % 360:.4f}\n")
+        if closed and arcs[0] is not None and all(
+                a is not None and points_equal(a[0], a[1], arcs[0][0], arcs[0][1])
+                and abs(a[2] - arcs[0][2]) < EPS and a[3] * arcs[0][3] > 0
+                for a in arcs):
+            xc, yc, r, _ = arcs[0]
+            return (f"0\nCIRCLE\n8\n{layer}\n10\n{xc:.4f}\n20\n{yc:.4f}\n30\n0.0\n"
+                    f"40\n{r:.4f}\n")
+
+        result = [f"0\nPOLYLINE\n8\n{layer}\n66\n1\n10\n0.0\n20\n0.0\n30\n0.0\n"
+                  f"70\n{1 if closed else 0}\n"]
+        # the last point of closed polylines is implied
+        vertices = segments[:-1] if closed else segments
+        for i, (x, y, _) in enumerate(vertices):
+            # bulge of the segment starting at this vertex
+            arc = segments[i + 1][2] if i + 1 < len(segments) else None
+            result.append(f"0\nVERTEX\n8\n{layer}\n10\n{x:.4f}\n20\n{y:.4f}\n30\n0.0\n")
+            if arc is not None:
+                result.append(f"42\n{math.tan(arc[3] / 4):.8f}\n")
+        result.append(f"0\nSEQEND\n8\n{layer}\n")
+        return "".join(result)
+
+    def _text(self, x, y, m, text, params) -> str:
+        layer = self._layer(params["rgb"])
+        height = params["fs"] * math.hypot(m.a, m.d)
+        angle = math.degrees(math.atan2(m.d, m.a))
+        align = {"left": 0, "middle": 1, "end": 2}[params.get("align", "left")]
+        result = (f"0\nTEXT\n8\n{layer}\n10\n{x:.4f}\n20\n{y:.4f}\n30\n0.0\n"
+                  f"40\n{height:.4f}\n1\n{_dxf_text(text)}\n")
+        if abs(angle) > EPS:
+            result += f"50\n{angle:.4f}\n"
+        if m.a * m.e - m.b * m.d < 0:
+            result += "71\n2\n"  # mirrored in x
+        if align:
+            result += f"72\n{align}\n11\n{x:.4f}\n21\n{y:.4f}\n31\n0.0\n"
+        return result
+
+    def stream(self, inner_corners="loop"):
+        """Generate the DXF document as chunks of encoded bytes"""
+        extents = self._adjust_coordinates()
+        self._layers: dict[str, int] = {}
+
+        # entities first as they define the layers
+        entities = []
+        for part in self.parts:
+            for path in part.pathes:
+                entities.extend(e for e in self._path(path, inner_corners) if e)
+
+        yield _encode(
+            self._metadata() +
+            "0\nSECTION\n2\nHEADER\n9\n$ACADVER\n1\nAC1009\n"
+            "9\n$INSUNITS\n70\n4\n9\n$MEASUREMENT\n70\n1\n"
+            f"9\n$EXTMIN\n10\n0.0\n20\n0.0\n30\n0.0\n"
+            f"9\n$EXTMAX\n10\n{extents.width:.4f}\n20\n{extents.height:.4f}\n30\n0.0\n"
+            "0\nENDSEC\n"
+            "0\nSECTION\n2\nTABLES\n"
+            "0\nTABLE\n2\nLTYPE\n70\n1\n"
+            "0\nLTYPE\n2\nCONTINUOUS\n70\n0\n3\nSolid line\n72\n65\n73\n0\n40\n0.0\n"
+            "0\nENDTAB\n"
+            f"0\nTABLE\n2\nLAYER\n70\n{len(self._layers)}\n" +
+            "".join(f"0\nLAYER\n2\n{name}\n70\n0\n62\n{color}\n6\nCONTINUOUS\n"
+                    for name, color in self._layers.items()) +
+            "0\nENDTAB\n"
+            "0\nTABLE\n2\nSTYLE\n70\n1\n"
+            "0\nSTYLE\n2\nSTANDARD\n70\n0\n40\n0.0\n41\n1.0\n50\n0.0\n71\n0\n42\n2.5\n3\ntxt\n4\n\n"
+            "0\nENDTAB\n"
+            "0\nENDSEC\n"
+            "0\nSECTION\n2\nENTITIES\n")
+
+        chunk = []
+        size = 0
+        for entity in entities:
+            chunk.append(entity)
+            size += len(entity)
+            if size >= self.chunk_size:
+                yield _encode("".join(chunk))
+                chunk = []
+                size = 0
+        chunk.append("0\nENDSEC\n0\nEOF\n")
+        yield _encode("".join(chunk))
+
+    def finish(self, inner_corners="loop"):
+        f = io.BytesIO()
+        for chunk in self.stream(inner_corners):
+            f.write(chunk)
+        f.seek(0)
+        return f
+
+class GCodeSurface(Surface):
+    """G-code for laser cutters in mm (M4 dynamic laser power as used by GRBL)
+
+    Parts are cut one after another. Within a part the colors are cut in
+    the order of color_order, nested strokes before the ones enclosing
+    them. Each of these groups is ordered to minimize the travel between
+    the strokes (see boxes.pathorder). Arcs are written as G2/G3, other
+    curves are approximated by lines. Texts and annotations are not cut.
+    """
+
+    feed = 1000  # mm/min while cutting
+    power = 1000  # S value while cutting
+    flatness = 0.01  # max distance of flattened curves in mm
+
+    def _strokes(self, path, inner_corners):
+        """Split a path into (segments, color) with segments being a list of
+        (x, y, arc) points, arc (xc, yc, r, sweep) of the arc ending there"""
+        self.faster_edges(path, inner_corners)
+        rgb = [float(c) for c in path.params["rgb"]]
+        if rgb not in self.color_order:
+            return []
+        color = self.color_order.index(rgb)
+        strokes = []
+        segments: list[tuple[float, float, Any]] = []
+        for c in path:
+            C, x, y = c[0:3]
+            if C == "M":
+                if len(segments) > 1:
+                    strokes.append((segments, color))
+                segments = [(x, y, None)]
+            elif C == "L":
+                segments.append((x, y, None))
+            elif C == "C":
+                x0, y0 = segments[-1][0:2]
+                x1, y1, x2, y2 = c[3:]
+                arc = bezier_arc(x0, y0, x1, y1, x2, y2, x, y)
+                if arc is not None:
+                    segments.append((x, y, arc))
+                else:
+                    segments.extend((xi, yi, None) for xi, yi in flatten_bezier(
+                        x0, y0, x1, y1, x2, y2, x, y, self.flatness))
+        if len(segments) > 1:
+            strokes.append((segments, color))
+        return strokes
+
+    @staticmethod
+    def _reversed(segments):
+        result = [(segments[-1][0], segments[-1][1], None)]
+        for (x, y, _), (_, _, arc) in zip(segments[-2::-1], segments[:0:-1]):
+            if arc is not None:
+                arc = (arc[0], arc[1], arc[2], -arc[3])
+            result.append((x, y, arc))
+        return result
+
+    def _order(self, parts):
+        """Strokes of all parts in cut order"""
+        order = pathorder.order_parts(
+            [[(s[0][0:2], s[-1][0:2], self._bbox(s), points_equal(*s[0][0:2], *s[-1][0:2]),
+               color, True) for s, color in strokes] for strokes in parts])
+        result = []
+        for n, i, flipped in order:
+            segments, color = parts[n][i]
+            if flipped:
+                segments = self._reversed(segments)
+            result.append((segments, color))
+        return result
+
+    @staticmethod
+    def _bbox(segments):
+        xs = [s[0] for s in segments]
+        ys = [s[1] for s in segments]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def _metadata(self) -> str:
+        md = self.metadata
+        lines = ["{name} - {short_description}".format(**md),
+                 "Created with Boxes.py (https://boxes.hackerspace-bamberg.de/)"]
+        if not md["reproducible"]:
+            lines.append("Creation date: %s" % md["creation_date"].strftime("%Y-%m-%d %H:%M:%S"))
+        lines.append("Command line: %s" % md["cli"])
+        if md["url"]:
+            lines.append("Url: %s" % md["url"])
+        return "".join(f"; {line}\n" for text in lines for line in text.split("\n"))
+
+    def finish(self, inner_corners="loop"):
+        self._adjust_coordinates()
+        parts = [[s for path in part.pathes for s in self._strokes(path, inner_corners)]
+                 for part in self.parts]
+        drawn = [s for strokes in parts for s in strokes]
+        strokes = self._order(parts)
+
+        lines = []
+        feed = f" F{self.feed}"  # modal, only needed once
+        self.cut_length = self.travel_length = 0.0
+        x, y = 0.0, 0.0
+        color = None
+        for segments, c in strokes:
+            if c != color:
+                color = c
+                lines.append("; color %s" % rgb_to_svg_color(*self.color_order[c]))
+            x0, y0 = segments[0][0:2]
+            self.travel_length += math.hypot(x0 - x, y0 - y)
+            lines.append(f"G0 X{x0:.3f} Y{y0:.3f}")
+            lines.append(f"M4 S{self.power}")
+            x, y = x0, y0
+            for xi, yi, arc in segments[1:]:
+                if arc is None:
+                    self.cut_length += math.hypot(xi - x, yi - y)
+                    lines.append(f"G1 X{xi:.3f} Y{yi:.3f}{feed}")
+                else:
+                    xc, yc, r, sweep = arc
+                    self.cut_length += abs(r * sweep)
+                    lines.append(f"{'G3' if sweep > 0 else 'G2'} X{xi:.3f} Y{yi:.3f} "
+                                 f"I{xc - x:.3f} J{yc - y:.3f}{feed}")
+                feed = ""
+                x, y = xi, yi
+            lines.append("M5")
+
+        # travel in the order the strokes were drawn for comparison
+        self.unordered_travel_length = 0.0
+        x, y = 0.0, 0.0
+        for segments, _ in drawn:
+            self.unordered_travel_length += math.hypot(segments[0][0] - x, segments[0][1] - y)
+            x, y = segments[-1][0:2]
+
+        header = (self._metadata() +
+                  f"; cut length: {self.cut_length:.1f}mm\n"
+                  f"; travel length: {self.travel_length:.1f}mm "
+                  f"({self.unordered_travel_length:.1f}mm in drawing order)\n"
+                  "G21\nG90\nM5\n")
+        return io.BytesIO(_encode(header + "\n".join(lines) + "\nG0 X0 Y0\nM2\n"))
+
 from random import random
 
 
@@ -1046,3 +2038,58 @@ def line_intersection(line1, line2):
     )
 
     return min(on_segments), x, y
+
+
+def _dxf_text(text: str) -> str:
+    """Escape non ASCII characters the way R12 DXF expects"""
+    return "".join(c if ord(c) < 128 else "\\U+%04X" % ord(c) for c in text)
+
+
+def bezier_arc(x0, y0, x1, y1, x2, y2, x3, y3):
+    """Circular arc of a cubic Bézier curve if it is one
+
+    Detects curves created by Context._arc and returns (xc, yc, r, sweep)
+    with the sweep angle in radians (positive for counter clockwise) or None.
+    """
+    dx0, dy0 = x1 - x0, y1 - y0
+    dx3, dy3 = x3 - x2, y3 - y2
+    l0, l3 = math.hypot(dx0, dy0), math.hypot(dx3, dy3)
+    if l0 < EPS or abs(l0 - l3) > EPS:
+        return None
+    # center is on the normals of both tangents
+    det = dx0 * dy3 - dy0 * dx3
+    if abs(det) < EPS * l0 * l3:
+        return None
+    t = ((x3 - x0) * dx3 + (y3 - y0) * dy3) / det
+    xc, yc = x0 - t * dy0, y0 + t * dx0
+    r = math.hypot(x0 - xc, y0 - yc)
+    if abs(math.hypot(x3 - xc, y3 - yc) - r) > EPS:
+        return None
+    sweep = math.atan2((x0 - xc) * (y3 - yc) - (y0 - yc) * (x3 - xc),
+                       (x0 - xc) * (x3 - xc) + (y0 - yc) * (y3 - yc))
+    ccw = (x0 - xc) * dy0 - (y0 - yc) * dx0 > 0
+    if ccw and sweep < 0:
+        sweep += 2 * math.pi
+    elif not ccw and sweep > 0:
+        sweep -= 2 * math.pi
+    if abs(4 / 3 * math.tan(abs(sweep) / 4) * r - l0) > max(EPS, 1e-3 * l0):
+        return None
+    return xc, yc, r, sweep
+
+
+def flatten_bezier(x0, y0, x1, y1, x2, y2, x3, y3, tolerance):
+    """Points approximating a cubic Bézier curve within tolerance
+
+    The start point is not included.
+    """
+    dd = max(math.hypot(x0 - 2 * x1 + x2, y0 - 2 * y1 + y2),
+             math.hypot(x1 - 2 * x2 + x3, y1 - 2 * y2 + y3))
+    n = max(1, math.ceil(math.sqrt(0.75 * dd / tolerance)))
+    points = []
+    for i in range(1, n + 1):
+        t = i / n
+        s = 1 - t
+        a, b, c, d = s * s * s, 3 * s * s * t, 3 * s * t * t, t * t * t
+        points.append((a * x0 + b * x1 + c * x2 + d * x3,
+                       a * y0 + b * y1 + c * y2 + d * y3))
+    return points
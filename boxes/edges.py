@@ -1087,10 +1087,15 @@ class FingerHoles(FingerJointBase):
             if self.boxes.debug:
                 self.ctx.rectangle(b, -self.settings.width / 2 + b,
                                    length - 2 * b, self.settings.width - 2 * b)
+            if not bedBolts:
+                self.boxes.holesAt(
+                    [(leftover / 2.0 + i * (s + f) + 0.5 * f, 0) for i in range(fingers)],
+                    shape="rectangle", dx=f + p, dy=self.settings.width + p)
+                return
             for i in range(fingers):
                 pos = leftover / 2.0 + i * (s + f)
 
-                if bedBolts and bedBolts.drawBolt(i):
+                if bedBolts.drawBolt(i):
                     d = (bedBoltSettings or self.boxes.bedBoltSettings)[0]
                     self.boxes.hole(pos - 0.5 * s, 0, d * 0.5)
 
@@ -14,12 +14,13 @@
 #   along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
+import functools
 import os
 import shutil
 import subprocess
 import tempfile
 import io
-from boxes.drawing import Context, LBRN2Surface, PSSurface, SVGSurface
+from boxes.drawing import Context, DXFSurface, GCodeSurface, LBRN2Surface, PSSurface, SVGSurface
 
 
 class Formats:
@@ -27,15 +28,15 @@ class Formats:
     pstoedit_candidates = ["/usr/bin/pstoedit", "pstoedit", r"C:\Program Files\pstoedit\pstoedit.exe", "pstoedit.exe"]
     ps2pdf_candidates = ["/usr/bin/ps2pdf", "ps2pdf", "ps2pdf.exe"]
 
-    _BASE_FORMATS = ['svg', 'svg_Ponoko', 'ps', 'lbrn2']
+    _BASE_FORMATS = ['svg', 'svg_Ponoko', 'ps', 'lbrn2', 'dxf', 'gcode']
 
     formats = {
         "svg": None,
         "svg_Ponoko": None,
         "ps": None,
         "lbrn2": None,
-        "dxf": "{pstoedit} -flat 0.1 -f dxf:-mm {input} {output}",
-        "gcode": "{pstoedit} -f gcode {input} {output}",
+        "dxf": None,
+        "gcode": None,
         "plt": "{pstoedit} -f hpgl {input} {output}",
         # "ai": "{pstoedit} -f ps2ai",
         "pdf": "{ps2pdf} -dEPSCrop {input} {output}",
@@ -54,14 +55,20 @@ class Formats:
     }
 
     def __init__(self) -> None:
-        for cmd in self.pstoedit_candidates:
-            self.pstoedit = shutil.which(cmd)
-            if self.pstoedit:
-                break
-        for cmd in self.ps2pdf_candidates:
-            self.ps2pdf = shutil.which(cmd)
-            if self.ps2pdf:
-                break
+        self.pstoedit, self.ps2pdf = self._findTools()
+
+    @classmethod
+    @functools.cache
+    def _findTools(cls):
+        """Search the PATH for the converters once per process"""
+        tools = []
+        for candidates in (cls.pstoedit_candidates, cls.ps2pdf_candidates):
+            for cmd in candidates:
+                path = shutil.which(cmd)
+                if path:
+                    break
+            tools.append(path)
+        return tuple(tools)
 
     def getFormats(self):
         if self.pstoedit:
@@ -73,6 +80,10 @@ class Formats:
             surface = SVGSurface()
         elif fmt == "lbrn2":
             surface = LBRN2Surface()
+        elif fmt == "dxf":
+            surface = DXFSurface()
+        elif fmt == "gcode":
+            surface = GCodeSurface()
         else:
             surface = PSSurface()
 
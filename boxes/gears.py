@@ -40,11 +40,17 @@ from os import devnull  # for debugging
 
 two_pi = 2 * pi
 import argparse
+from functools import lru_cache
 
-from boxes.vectors import vdiff, vlength
+import numpy as np
+
+from boxes.vectors import kerf, vdiff, vlength
 
 __version__ = '0.9'
 
+# number of gear outlines kept by spur_gear_points()
+SPUR_CACHE_SIZE = 64
+
 def linspace(a,b,n):
     """ return list of linear interp of a to b in n steps
         - if a and b are ints - you'll get an int result.
@@ -192,48 +198,63 @@ def generate_rack_points(tooth_count, pitch, addendum, pressure_angle,
     return (points, p)
 
 
-def generate_spur_points(teeth, base_radius, pitch_radius, outer_radius, root_radius, accuracy_involute, accuracy_circular):
-    """ given a set of core gear params
-        - generate the svg path for the gear
+def spur_tooth_polar(teeth, base_radius, pitch_radius, outer_radius, root_radius, accuracy_involute, accuracy_circular):
+    """ one tooth centered at angle 0 followed by the gap to the next one
+        - returns arrays of the radii and angles of its points
     """
     half_thick_angle = two_pi / (4.0 * teeth ) #?? = pi / (2.0 * teeth)
     pitch_to_base_angle  = involute_intersect_angle( base_radius, pitch_radius )
-    pitch_to_outer_angle = involute_intersect_angle( base_radius, outer_radius ) - pitch_to_base_angle
 
     start_involute_radius = max(base_radius, root_radius)
-    radii = linspace(start_involute_radius, outer_radius, accuracy_involute)
-    angles = [involute_intersect_angle(base_radius, r) for r in radii]
-
-    centers = [(x * two_pi / float( teeth) ) for x in range( teeth ) ]
-    points = []
-
-    for c in centers:
-    # Angles
-        pitch1 = c - half_thick_angle
-        base1  = pitch1 - pitch_to_base_angle
-        offsetangles1 = [ base1 + x for x in angles]
-        points1 = [ point_on_circle( radii[i], offsetangles1[i]) for i in range(0,len(radii)) ]
-
-        pitch2 = c + half_thick_angle
-        base2  = pitch2 + pitch_to_base_angle
-        offsetangles2 = [ base2 - x for x in angles]
-        points2 = [ point_on_circle( radii[i], offsetangles2[i]) for i in range(0,len(radii)) ]
-
-        points_on_outer_radius = [ point_on_circle(outer_radius, x) for x in linspace(offsetangles1[-1], offsetangles2[-1], accuracy_circular) ]
-
-        if root_radius > base_radius:
-            pitch_to_root_angle = pitch_to_base_angle - involute_intersect_angle(base_radius, root_radius )
-            root1 = pitch1 - pitch_to_root_angle
-            root2 = pitch2 + pitch_to_root_angle
-            points_on_root = [point_on_circle (root_radius, x) for x in linspace(root2, root1+(two_pi/float(teeth)), accuracy_circular) ]
-            p_tmp = points1 + points_on_outer_radius[1:-1] + points2[::-1] + points_on_root[1:-1] # [::-1] reverses list; [1:-1] removes first and last element
-        else:
-            points_on_root = [point_on_circle (root_radius, x) for x in linspace(base2, base1+(two_pi/float(teeth)), accuracy_circular) ]
-            p_tmp = points1 + points_on_outer_radius[1:-1] + points2[::-1] + points_on_root # [::-1] reverses list
+    radii = np.linspace(start_involute_radius, outer_radius, accuracy_involute)
+    angles = np.sqrt(radii**2 - base_radius**2) / base_radius - np.arccos(base_radius / radii)
+
+    pitch1 = -half_thick_angle
+    base1  = pitch1 - pitch_to_base_angle
+    offsetangles1 = base1 + angles
+
+    pitch2 = half_thick_angle
+    base2  = pitch2 + pitch_to_base_angle
+    offsetangles2 = base2 - angles
 
-        points.extend( p_tmp )
+    outer_angles = np.linspace(offsetangles1[-1], offsetangles2[-1], accuracy_circular)[1:-1]
 
-    return (points)
+    if root_radius > base_radius:
+        pitch_to_root_angle = pitch_to_base_angle - involute_intersect_angle(base_radius, root_radius )
+        root1 = pitch1 - pitch_to_root_angle
+        root2 = pitch2 + pitch_to_root_angle
+        root_angles = np.linspace(root2, root1+(two_pi/float(teeth)), accuracy_circular)[1:-1] # [1:-1] removes first and last element
+    else:
+        root_angles = np.linspace(base2, base1+(two_pi/float(teeth)), accuracy_circular)
+
+    r = np.concatenate([radii, np.full(len(outer_angles), outer_radius),
+                        radii[::-1], np.full(len(root_angles), root_radius)]) # [::-1] reverses
+    a = np.concatenate([offsetangles1, outer_angles, offsetangles2[::-1], root_angles])
+    return r, a
+
+def generate_spur_points(teeth, base_radius, pitch_radius, outer_radius, root_radius, accuracy_involute, accuracy_circular):
+    """ given a set of core gear params
+        - generate the svg path for the gear
+        - one tooth is calculated and replicated by rotation
+    """
+    r, a = spur_tooth_polar(teeth, base_radius, pitch_radius, outer_radius, root_radius, accuracy_involute, accuracy_circular)
+    centers = np.arange(teeth) * (two_pi / float(teeth))
+    a = (centers[:, None] + a).ravel()
+    r = np.tile(r, teeth)
+    return list(zip((r * np.cos(a)).tolist(), (r * np.sin(a)).tolist()))
+
+@lru_cache(maxsize=SPUR_CACHE_SIZE)
+def spur_gear_points(teeth, circular_pitch, pressure_angle, clearance=0, ring_gear=False, profile_shift=0.,
+                     accuracy_involute=20, accuracy_circular=9, burn=0.):
+    """ outline of a spur or ring gear, outset by burn
+        - cached as gears with the same parameters are often drawn several times
+    """
+    (pitch_radius, base_radius, addendum, dedendum,
+     outer_radius, root_radius, tooth) = gear_calculations(teeth, circular_pitch, pressure_angle, clearance, ring_gear, profile_shift)
+    points = generate_spur_points(teeth, base_radius, pitch_radius, outer_radius, root_radius, accuracy_involute, accuracy_circular)
+    if burn:
+        points = kerf(points, burn)
+    return tuple(tuple(p) for p in points)
 
 def inkbool(val):
     return val not in ("False", False, "0", 0, "None", None)
@@ -638,12 +659,13 @@ class Gears:
             warnings.extend(msg.split("\n"))
 
         # All base calcs done. Start building gear
-        points = generate_spur_points(teeth, base_radius, pitch_radius, outer_radius, root_radius, accuracy_involute, accuracy_circular)
+        points = spur_gear_points(teeth, pitch, angle, clearance, self.options.internal_ring, self.options.profile_shift*0.01,
+                                  accuracy_involute, accuracy_circular, b)
 
         if not teeth_only:
             self.boxes.moveTo(width/2, height/2)
         self.boxes.cc(callback, None, 0, 0)
-        self.boxes.drawPoints(points)
+        self.boxes.drawPoints(points, kerfdir=0)
         # Spokes
         if not teeth_only and not self.options.internal_ring:  # only draw internals if spur gear
             msg = self.generate_spokes(root_radius, spoke_width, spoke_count, mount_radius, mount_hole,
@@ -4,6 +4,7 @@ import importlib
 import inspect
 import os
 import pkgutil
+import pprint
 from types import ModuleType
 from typing import Any
 
@@ -66,6 +67,73 @@ def getAllBoxGenerators() -> dict[str, type[boxes.Boxes]]:
     return generators
 
 
+def buildGeneratorIndex() -> dict[str, dict[str, Any]]:
+    """Index of all generators found by getAllBoxGenerators()"""
+    index = {}
+    for key, generator in sorted(getAllBoxGenerators().items()):
+        # classes imported into other modules show up there too
+        if generator.__module__ + "." + generator.__name__ != key:
+            continue
+        index[key] = {
+            "name": generator.__name__,
+            "module": generator.__module__,
+            "ui_group": generator.ui_group,
+            "webinterface": generator.webinterface,
+            "doc": inspect.cleandoc(generator.__doc__ or ""),
+        }
+    return index
+
+
+def writeGeneratorIndex(filename: str | None = None) -> None:
+    """Write the index used by getBoxGenerator() to _index.py"""
+    if filename is None:
+        filename = os.path.join(os.path.dirname(__file__), "_index.py")
+    with open(filename, "w") as f:
+        f.write("# Generated by boxes.generators.writeGeneratorIndex(). Do not edit!\n")
+        f.write("# Regenerate after adding, renaming or removing generators.\n")
+        f.write("INDEX = ")
+        pprint.pprint(buildGeneratorIndex(), stream=f, sort_dicts=False, width=100)
+
+
+def getGeneratorIndex() -> dict[str, dict[str, Any]]:
+    """Prebuilt index of the generators shipped with boxes.py
+
+    Maps "module.ClassName" to name, module, ui_group, webinterface and doc.
+    Empty if the index is missing.
+    """
+    try:
+        from boxes.generators._index import INDEX
+    except ImportError:
+        return {}
+    return INDEX
+
+
+def getBoxGenerator(name: str) -> type[boxes.Boxes] | None:
+    """Generator class by (case insensitive) class name
+
+    Uses the prebuilt index to import only the module of the generator.
+    Falls back to importing all generators if the name is not in the index,
+    the index is outdated or BOXES_GENERATOR_PATH adds more generators.
+    """
+    lower_name = name.lower()
+    if "BOXES_GENERATOR_PATH" not in os.environ:
+        for entry in getGeneratorIndex().values():
+            if entry["name"].lower() != lower_name:
+                continue
+            try:
+                module = importlib.import_module(entry["module"])
+            except ImportError:
+                break
+            generator = getattr(module, entry["name"], None)
+            if inspect.isclass(generator) and issubclass(generator, boxes.Boxes):
+                return generator
+            break
+    for generator in getAllBoxGenerators().values():
+        if generator.__name__.lower() == lower_name:
+            return generator
+    return None
+
+
 def getAllGeneratorModules() -> dict[str, ModuleType]:
     generators = {}
     path = __path__
@@ -0,0 +1,1012 @@
+# Generated by boxes.generators.writeGeneratorIndex(). Do not edit!
+# Regenerate after adding, renaming or removing generators.
+INDEX = {'boxes.generators.abox.ABox': {'name': 'ABox',
+                                'module': 'boxes.generators.abox',
+                                'ui_group': 'Box',
+                                'webinterface': True,
+                                'doc': 'A simple Box'},
+ 'boxes.generators.agricolainsert.AgricolaInsert': {'name': 'AgricolaInsert',
+                                                    'module': 'boxes.generators.agricolainsert',
+                                                    'ui_group': 'Misc',
+                                                    'webinterface': True,
+                                                    'doc': 'Agricola Revised Edition game box '
+                                                           'insert, including some expansions.'},
+ 'boxes.generators.airpurifier.AirPurifier': {'name': 'AirPurifier',
+                                              'module': 'boxes.generators.airpurifier',
+                                              'ui_group': 'Misc',
+                                              'webinterface': True,
+                                              'doc': 'Housing for the Nukit Open Air Purifier'},
+ 'boxes.generators.alledges.AllEdges': {'name': 'AllEdges',
+                                        'module': 'boxes.generators.alledges',
+                                        'ui_group': 'Misc',
+                                        'webinterface': True,
+                                        'doc': 'Showing all edge types'},
+ 'boxes.generators.angledbox.AngledBox': {'name': 'AngledBox',
+                                          'module': 'boxes.generators.angledbox',
+                                          'ui_group': 'Box',
+                                          'webinterface': True,
+                                          'doc': 'Box with both ends cornered'},
+ 'boxes.generators.angledcutjig.AngledCutJig': {'name': 'AngledCutJig',
+                                                'module': 'boxes.generators.angledcutjig',
+                                                'ui_group': 'Misc',
+                                                'webinterface': True,
+                                                'doc': 'Jig for making angled cuts in a laser '
+                                                       'cutter'},
+ 'boxes.generators.arcade.Arcade': {'name': 'Arcade',
+                                    'module': 'boxes.generators.arcade',
+                                    'ui_group': 'Misc',
+                                    'webinterface': True,
+                                    'doc': 'Desktop Arcade Machine'},
+ 'boxes.generators.atreus21.Atreus21': {'name': 'Atreus21',
+                                        'module': 'boxes.generators.atreus21',
+                                        'ui_group': 'Misc',
+                                        'webinterface': True,
+                                        'doc': 'Generator for a split atreus keyboard.'},
+ 'boxes.generators.basedbox.BasedBox': {'name': 'BasedBox',
+                                        'module': 'boxes.generators.basedbox',
+                                        'ui_group': 'Box',
+                                        'webinterface': True,
+                                        'doc': 'Fully closed box on a base'},
+ 'boxes.generators.bayonetbox.BayonetBox': {'name': 'BayonetBox',
+                                            'module': 'boxes.generators.bayonetbox',
+                                            'ui_group': 'Box',
+                                            'webinterface': True,
+                                            'doc': 'Round box made from layers with twist on top'},
+ 'boxes.generators.beequeencage.BeeQueenCage': {'name': 'BeeQueenCage',
+                                                'module': 'boxes.generators.beequeencage',
+                                                'ui_group': 'Beekeeping',
+                                                'webinterface': True,
+                                                'doc': 'Cage box to house a bee queen'},
+ 'boxes.generators.beequeentransportbox.BeeQueenTransportBox': {'name': 'BeeQueenTransportBox',
+                                                                'module': 'boxes.generators.beequeentransportbox',
+                                                                'ui_group': 'Beekeeping',
+                                                                'webinterface': True,
+                                                                'doc': 'Box to hold Bee Queen '
+                                                                       'Transport Cages'},
+ 'boxes.generators.bintray.BinTray': {'name': 'BinTray',
+                                      'module': 'boxes.generators.bintray',
+                                      'ui_group': 'Shelf',
+                                      'webinterface': True,
+                                      'doc': 'A Type tray variant to be used up right with sloped '
+                                             'walls in front'},
+ 'boxes.generators.birdhouse.BirdHouse': {'name': 'BirdHouse',
+                                          'module': 'boxes.generators.birdhouse',
+                                          'ui_group': 'Misc',
+                                          'webinterface': True,
+                                          'doc': 'Simple Bird House'},
+ 'boxes.generators.bookholder.BookHolder': {'name': 'BookHolder',
+                                            'module': 'boxes.generators.bookholder',
+                                            'ui_group': 'Misc',
+                                            'webinterface': True,
+                                            'doc': 'Angled display stand for books, ring files, '
+                                                   'flyers, postcards, or business cards.'},
+ 'boxes.generators.bottlestack.BottleStack': {'name': 'BottleStack',
+                                              'module': 'boxes.generators.bottlestack',
+                                              'ui_group': 'Misc',
+                                              'webinterface': True,
+                                              'doc': 'Stack bottles in a fridge'},
+ 'boxes.generators.bottletag.BottleTag': {'name': 'BottleTag',
+                                          'module': 'boxes.generators.bottletag',
+                                          'ui_group': 'Misc',
+                                          'webinterface': True,
+                                          'doc': 'Paper slip over bottle tag'},
+ 'boxes.generators.breadbox.BreadBox': {'name': 'BreadBox',
+                                        'module': 'boxes.generators.breadbox',
+                                        'ui_group': 'FlexBox',
+                                        'webinterface': True,
+                                        'doc': 'A BreadBox with a gliding door'},
+ 'boxes.generators.brick_sorter.BrickSorter': {'name': 'BrickSorter',
+                                               'module': 'boxes.generators.brick_sorter',
+                                               'ui_group': 'Box',
+                                               'webinterface': True,
+                                               'doc': 'Stackable nestable sorting sieve for '
+                                                      'bricks'},
+ 'boxes.generators.burntest.BurnTest': {'name': 'BurnTest',
+                                        'module': 'boxes.generators.burntest',
+                                        'ui_group': 'Part',
+                                        'webinterface': True,
+                                        'doc': 'Test different burn values'},
+ 'boxes.generators.can_storage.CanStorage': {'name': 'CanStorage',
+                                             'module': 'boxes.generators.can_storage',
+                                             'ui_group': 'Misc',
+                                             'webinterface': True,
+                                             'doc': 'Storage box for round containers'},
+ 'boxes.generators.carbonfilter.CarbonFilter': {'name': 'CarbonFilter',
+                                                'module': 'boxes.generators.carbonfilter',
+                                                'ui_group': 'Misc',
+                                                'webinterface': True,
+                                                'doc': 'Compact filter for activated char coal '
+                                                       'pellets'},
+ 'boxes.generators.cardbox.CardBox': {'name': 'CardBox',
+                                      'module': 'boxes.generators.cardbox',
+                                      'ui_group': 'Box',
+                                      'webinterface': True,
+                                      'doc': 'Box for storage of playing cards, with versatile '
+                                             'options'},
+ 'boxes.generators.cardholder.CardHolder': {'name': 'CardHolder',
+                                            'module': 'boxes.generators.cardholder',
+                                            'ui_group': 'Shelf',
+                                            'webinterface': True,
+                                            'doc': 'Shelf for holding (multiple) piles of playing '
+                                                   'cards / notes'},
+ 'boxes.generators.castle.Castle': {'name': 'Castle',
+                                    'module': 'boxes.generators.castle',
+                                    'ui_group': 'Unstable',
+                                    'webinterface': True,
+                                    'doc': 'Castle tower with two walls'},
+ 'boxes.generators.clock.Clock': {'name': 'Clock',
+                                  'module': 'boxes.generators.clock',
+                                  'ui_group': 'Misc',
+                                  'webinterface': True,
+                                  'doc': 'Clock (old style with clock hands)'},
+ 'boxes.generators.closedbox.ClosedBox': {'name': 'ClosedBox',
+                                          'module': 'boxes.generators.closedbox',
+                                          'ui_group': 'Box',
+                                          'webinterface': True,
+                                          'doc': 'Fully closed box'},
+ 'boxes.generators.coffeecapsulesholder.CoffeeCapsuleHolder': {'name': 'CoffeeCapsuleHolder',
+                                                               'module': 'boxes.generators.coffeecapsulesholder',
+                                                               'ui_group': 'Misc',
+                                                               'webinterface': True,
+                                                               'doc': 'Coffee capsule holder'},
+ 'boxes.generators.coinbanksafe.CoinBankSafe': {'name': 'CoinBankSafe',
+                                                'module': 'boxes.generators.coinbanksafe',
+                                                'ui_group': 'Misc',
+                                                'webinterface': True,
+                                                'doc': 'A piggy-bank designed to look like a '
+                                                       'safe.'},
+ 'boxes.generators.coindisplay.CoinDisplay': {'name': 'CoinDisplay',
+                                              'module': 'boxes.generators.coindisplay',
+                                              'ui_group': 'Misc',
+                                              'webinterface': True,
+                                              'doc': 'A showcase for a single coin'},
+ 'boxes.generators.compartmentbox.CompartmentBox': {'name': 'CompartmentBox',
+                                                    'module': 'boxes.generators.compartmentbox',
+                                                    'ui_group': 'Tray',
+                                                    'webinterface': True,
+                                                    'doc': 'Type tray variation with sliding lid'},
+ 'boxes.generators.concaveknob.ConcaveKnob': {'name': 'ConcaveKnob',
+                                              'module': 'boxes.generators.concaveknob',
+                                              'ui_group': 'Part',
+                                              'webinterface': True,
+                                              'doc': 'Round knob serrated outside for better '
+                                                     'gripping'},
+ 'boxes.generators.console.Console': {'name': 'Console',
+                                      'module': 'boxes.generators.console',
+                                      'ui_group': 'Box',
+                                      'webinterface': True,
+                                      'doc': 'Console with slanted panel'},
+ 'boxes.generators.console2.Console2': {'name': 'Console2',
+                                        'module': 'boxes.generators.console2',
+                                        'ui_group': 'Box',
+                                        'webinterface': True,
+                                        'doc': 'Console with slanted panel and service hatches'},
+ 'boxes.generators.crate.Crate': {'name': 'Crate',
+                                  'module': 'boxes.generators.crate',
+                                  'ui_group': 'Box',
+                                  'webinterface': True,
+                                  'doc': 'Crate with handles. Can be made stackable. Can produce '
+                                         'additional mask to put patterns onto crate walls'},
+ 'boxes.generators.desksign.Desksign': {'name': 'Desksign',
+                                        'module': 'boxes.generators.desksign',
+                                        'ui_group': 'Misc',
+                                        'webinterface': True,
+                                        'doc': 'Simple diagonal plate with stands to show name or '
+                                               'message.'},
+ 'boxes.generators.dicebox.DiceBox': {'name': 'DiceBox',
+                                      'module': 'boxes.generators.dicebox',
+                                      'ui_group': 'Box',
+                                      'webinterface': True,
+                                      'doc': 'Box with lid and integrated hinge for storing dice.'},
+ 'boxes.generators.dicetower.DiceTower': {'name': 'DiceTower',
+                                          'module': 'boxes.generators.dicetower',
+                                          'ui_group': 'Misc',
+                                          'webinterface': True,
+                                          'doc': 'Tool for fairly rolling dice'},
+ 'boxes.generators.dinrailbox.DinRailBox': {'name': 'DinRailBox',
+                                            'module': 'boxes.generators.dinrailbox',
+                                            'ui_group': 'WallMounted',
+                                            'webinterface': True,
+                                            'doc': 'Box for DIN rail used in electrical junction '
+                                                   'boxes'},
+ 'boxes.generators.discrack.DiscRack': {'name': 'DiscRack',
+                                        'module': 'boxes.generators.discrack',
+                                        'ui_group': 'Shelf',
+                                        'webinterface': True,
+                                        'doc': 'A rack for storing disk-shaped objects vertically '
+                                               'next to each other'},
+ 'boxes.generators.dispenser.Dispenser': {'name': 'Dispenser',
+                                          'module': 'boxes.generators.dispenser',
+                                          'ui_group': 'Misc',
+                                          'webinterface': True,
+                                          'doc': 'Dispenser for stackable (flat) items of same '
+                                                 'size'},
+ 'boxes.generators.display.Display': {'name': 'Display',
+                                      'module': 'boxes.generators.display',
+                                      'ui_group': 'Misc',
+                                      'webinterface': True,
+                                      'doc': 'Display for flyers or leaflets'},
+ 'boxes.generators.displaycase.DisplayCase': {'name': 'DisplayCase',
+                                              'module': 'boxes.generators.displaycase',
+                                              'ui_group': 'Box',
+                                              'webinterface': True,
+                                              'doc': 'Fully closed box intended to be cut from '
+                                                     'transparent acrylics and to serve as a '
+                                                     'display case.'},
+ 'boxes.generators.displayshelf.DisplayShelf': {'name': 'DisplayShelf',
+                                                'module': 'boxes.generators.displayshelf',
+                                                'ui_group': 'Shelf',
+                                                'webinterface': True,
+                                                'doc': 'Shelf with slanted floors'},
+ 'boxes.generators.dividertray.DividerTray': {'name': 'DividerTray',
+                                              'module': 'boxes.generators.dividertray',
+                                              'ui_group': 'Tray',
+                                              'webinterface': True,
+                                              'doc': 'Divider tray - rows and dividers'},
+ 'boxes.generators.doubleflexdoorbox.DoubleFlexDoorBox': {'name': 'DoubleFlexDoorBox',
+                                                          'module': 'boxes.generators.doubleflexdoorbox',
+                                                          'ui_group': 'FlexBox',
+                                                          'webinterface': True,
+                                                          'doc': 'Box with two part lid with '
+                                                                 'living hinges and round corners'},
+ 'boxes.generators.drillbox.DrillBox': {'name': 'DrillBox',
+                                        'module': 'boxes.generators.drillbox',
+                                        'ui_group': 'Tray',
+                                        'webinterface': True,
+                                        'doc': 'A parametrized box for drills'},
+ 'boxes.generators.drillgauge.DrillGauge': {'name': 'DrillGauge',
+                                            'module': 'boxes.generators.drillgauge',
+                                            'ui_group': 'Misc',
+                                            'webinterface': True,
+                                            'doc': 'A drill gauge with a narrowing slot'},
+ 'boxes.generators.drillstand.DrillStand': {'name': 'DrillStand',
+                                            'module': 'boxes.generators.drillstand',
+                                            'ui_group': 'Misc',
+                                            'webinterface': True,
+                                            'doc': 'Box for drills with each compartment of a '
+                                                   'different height'},
+ 'boxes.generators.edges.Edges': {'name': 'Edges',
+                                  'module': 'boxes.generators.edges',
+                                  'ui_group': 'Misc',
+                                  'webinterface': False,
+                                  'doc': 'Print all registered Edge types'},
+ 'boxes.generators.electronicsbox.ElectronicsBox': {'name': 'ElectronicsBox',
+                                                    'module': 'boxes.generators.electronicsbox',
+                                                    'ui_group': 'Box',
+                                                    'webinterface': True,
+                                                    'doc': 'Closed box with screw on top and '
+                                                           'mounting holes'},
+ 'boxes.generators.engravingframe.EngravingFrame': {'name': 'EngravingFrame',
+                                                    'module': 'boxes.generators.engravingframe',
+                                                    'ui_group': 'Box',
+                                                    'webinterface': True,
+                                                    'doc': 'A frame for an engraving ; can be '
+                                                           'either standing or hanging, both in '
+                                                           'portrait or landscape'},
+ 'boxes.generators.eurorackskiff.EuroRackSkiff': {'name': 'EuroRackSkiff',
+                                                  'module': 'boxes.generators.eurorackskiff',
+                                                  'ui_group': 'Box',
+                                                  'webinterface': True,
+                                                  'doc': '3U Height case with adjustable width and '
+                                                         'height and included rails'},
+ 'boxes.generators.fanhole.FanHole': {'name': 'FanHole',
+                                      'module': 'boxes.generators.fanhole',
+                                      'ui_group': 'Holes',
+                                      'webinterface': True,
+                                      'doc': 'Hole pattern for mounting a fan'},
+ 'boxes.generators.fatballdispenser.FatBallDispenser': {'name': 'FatBallDispenser',
+                                                        'module': 'boxes.generators.fatballdispenser',
+                                                        'ui_group': 'Misc',
+                                                        'webinterface': True,
+                                                        'doc': 'Birdhouse for fat balls.'},
+ 'boxes.generators.filamentspool.FilamentSpool': {'name': 'FilamentSpool',
+                                                  'module': 'boxes.generators.filamentspool',
+                                                  'ui_group': 'Misc',
+                                                  'webinterface': True,
+                                                  'doc': 'A two part spool for 3D printing '
+                                                         'filament'},
+ 'boxes.generators.filltest.FillTest': {'name': 'FillTest',
+                                        'module': 'boxes.generators.filltest',
+                                        'ui_group': 'Part',
+                                        'webinterface': True,
+                                        'doc': 'Piece for testing different settings for hole '
+                                               'filling'},
+ 'boxes.generators.flexbook.FlexBook': {'name': 'FlexBook',
+                                        'module': 'boxes.generators.flexbook',
+                                        'ui_group': 'FlexBox',
+                                        'webinterface': True,
+                                        'doc': 'Box with living hinge styled after a book.'},
+ 'boxes.generators.flexbox.FlexBox': {'name': 'FlexBox',
+                                      'module': 'boxes.generators.flexbox',
+                                      'ui_group': 'FlexBox',
+                                      'webinterface': True,
+                                      'doc': 'Box with living hinge and round corners'},
+ 'boxes.generators.flexbox2.FlexBox2': {'name': 'FlexBox2',
+                                        'module': 'boxes.generators.flexbox2',
+                                        'ui_group': 'FlexBox',
+                                        'webinterface': True,
+                                        'doc': 'Box with living hinge and top corners rounded'},
+ 'boxes.generators.flexbox3.FlexBox3': {'name': 'FlexBox3',
+                                        'module': 'boxes.generators.flexbox3',
+                                        'ui_group': 'FlexBox',
+                                        'webinterface': True,
+                                        'doc': 'Box with living hinge'},
+ 'boxes.generators.flexbox4.FlexBox4': {'name': 'FlexBox4',
+                                        'module': 'boxes.generators.flexbox4',
+                                        'ui_group': 'FlexBox',
+                                        'webinterface': True,
+                                        'doc': 'Box with living hinge and left corners rounded'},
+ 'boxes.generators.flexbox5.FlexBox5': {'name': 'FlexBox5',
+                                        'module': 'boxes.generators.flexbox5',
+                                        'ui_group': 'FlexBox',
+                                        'webinterface': True,
+                                        'doc': 'Box with living hinge and round corners'},
+ 'boxes.generators.flextest.FlexTest': {'name': 'FlexTest',
+                                        'module': 'boxes.generators.flextest',
+                                        'ui_group': 'Part',
+                                        'webinterface': True,
+                                        'doc': 'Piece for testing different flex settings'},
+ 'boxes.generators.flextest2.FlexTest2': {'name': 'FlexTest2',
+                                          'module': 'boxes.generators.flextest2',
+                                          'ui_group': 'Part',
+                                          'webinterface': True,
+                                          'doc': 'Piece for testing 2D flex settings'},
+ 'boxes.generators.folder.Folder': {'name': 'Folder',
+                                    'module': 'boxes.generators.folder',
+                                    'ui_group': 'Misc',
+                                    'webinterface': True,
+                                    'doc': 'Book cover with flex for the spine'},
+ 'boxes.generators.frontpanel.FrontPanel': {'name': 'FrontPanel',
+                                            'module': 'boxes.generators.frontpanel',
+                                            'ui_group': 'Holes',
+                                            'webinterface': True,
+                                            'doc': 'Mounting Holes and cutouts for all your holy '
+                                                   'needs.'},
+ 'boxes.generators.gear.Gears': {'name': 'Gears',
+                                 'module': 'boxes.generators.gear',
+                                 'ui_group': 'Part',
+                                 'webinterface': True,
+                                 'doc': 'Gears'},
+ 'boxes.generators.gearbox.GearBox': {'name': 'GearBox',
+                                      'module': 'boxes.generators.gearbox',
+                                      'ui_group': 'Part',
+                                      'webinterface': True,
+                                      'doc': 'Gearbox with multiple identical stages'},
+ 'boxes.generators.gridfinitybase.GridfinityBase': {'name': 'GridfinityBase',
+                                                    'module': 'boxes.generators.gridfinitybase',
+                                                    'ui_group': 'Tray',
+                                                    'webinterface': True,
+                                                    'doc': 'A parameterized Gridfinity base'},
+ 'boxes.generators.gridfinitydrillbox.GridfinityDrillBox': {'name': 'GridfinityDrillBox',
+                                                            'module': 'boxes.generators.gridfinitydrillbox',
+                                                            'ui_group': 'Tray',
+                                                            'webinterface': True,
+                                                            'doc': 'A Gridfinity box for drills or '
+                                                                   'similar tools'},
+ 'boxes.generators.gridfinitytraylayout.GridfinityTrayLayout': {'name': 'GridfinityTrayLayout',
+                                                                'module': 'boxes.generators.gridfinitytraylayout',
+                                                                'ui_group': 'Tray',
+                                                                'webinterface': True,
+                                                                'doc': 'A Gridfinity Tray '
+                                                                       'Generator based on '
+                                                                       'TrayLayout'},
+ 'boxes.generators.halfbox.HalfBox': {'name': 'HalfBox',
+                                      'module': 'boxes.generators.halfbox',
+                                      'ui_group': 'Box',
+                                      'webinterface': True,
+                                      'doc': 'Configurable half of a box which can be: a bookend, '
+                                             'a hanging shelf, an angle clamping jig, ...'},
+ 'boxes.generators.heart.HeartBox': {'name': 'HeartBox',
+                                     'module': 'boxes.generators.heart',
+                                     'ui_group': 'FlexBox',
+                                     'webinterface': True,
+                                     'doc': 'Box in the form of a heart'},
+ 'boxes.generators.hingebox.HingeBox': {'name': 'HingeBox',
+                                        'module': 'boxes.generators.hingebox',
+                                        'ui_group': 'Box',
+                                        'webinterface': True,
+                                        'doc': 'Box with lid attached by cabinet hinges'},
+ 'boxes.generators.hobbycase.HobbyCase': {'name': 'HobbyCase',
+                                          'module': 'boxes.generators.hobbycase',
+                                          'ui_group': 'Tray',
+                                          'webinterface': True,
+                                          'doc': 'A case that can be used in any hobby involving '
+                                                 'small pieces in need of organizing.'},
+ 'boxes.generators.holepattern.HolePattern': {'name': 'HolePattern',
+                                              'module': 'boxes.generators.holepattern',
+                                              'ui_group': 'Holes',
+                                              'webinterface': True,
+                                              'doc': 'Generate hole patterns in different simple '
+                                                     'shapes'},
+ 'boxes.generators.hooks.Hook': {'name': 'Hook',
+                                 'module': 'boxes.generators.hooks',
+                                 'ui_group': 'Misc',
+                                 'webinterface': True,
+                                 'doc': 'A hook with a rectangular mouth to mount at the wall'},
+ 'boxes.generators.integratedhingebox.IntegratedHingeBox': {'name': 'IntegratedHingeBox',
+                                                            'module': 'boxes.generators.integratedhingebox',
+                                                            'ui_group': 'Box',
+                                                            'webinterface': True,
+                                                            'doc': 'Box with lid and integrated '
+                                                                   'hinge.'},
+ 'boxes.generators.jigsaw.JigsawPuzzle': {'name': 'JigsawPuzzle',
+                                          'module': 'boxes.generators.jigsaw',
+                                          'ui_group': 'Misc',
+                                          'webinterface': False,
+                                          'doc': 'Fractal jigsaw puzzle. Still alpha.'},
+ 'boxes.generators.jointpanel.JointPanel': {'name': 'JointPanel',
+                                            'module': 'boxes.generators.jointpanel',
+                                            'ui_group': 'Misc',
+                                            'webinterface': True,
+                                            'doc': 'Create pieces larger than your laser cutter by '
+                                                   'joining them with Dove Tails'},
+ 'boxes.generators.kamishibai.Kamishibai': {'name': 'Kamishibai',
+                                            'module': 'boxes.generators.kamishibai',
+                                            'ui_group': 'Misc',
+                                            'webinterface': True,
+                                            'doc': 'Kamishibai butai (japanese image theatre)'},
+ 'boxes.generators.keyholder.KeyHolder': {'name': 'KeyHolder',
+                                          'module': 'boxes.generators.keyholder',
+                                          'ui_group': 'WallMounted',
+                                          'webinterface': True,
+                                          'doc': 'Wall organizer with hooks for keys or similar '
+                                                 'small items'},
+ 'boxes.generators.keypad.Keypad': {'name': 'Keypad',
+                                    'module': 'boxes.generators.keypad',
+                                    'ui_group': 'Box',
+                                    'webinterface': True,
+                                    'doc': 'Generator for keypads with mechanical switches.'},
+ 'boxes.generators.lamp.Lamp': {'name': 'Lamp',
+                                'module': 'boxes.generators.lamp',
+                                'ui_group': 'Misc',
+                                'webinterface': False,
+                                'doc': ''},
+ 'boxes.generators.laptopstand.LaptopStand': {'name': 'LaptopStand',
+                                              'module': 'boxes.generators.laptopstand',
+                                              'ui_group': 'Misc',
+                                              'webinterface': True,
+                                              'doc': 'A simple X shaped frame to support a laptop '
+                                                     'on a given angle'},
+ 'boxes.generators.laserclamp.LaserClamp': {'name': 'LaserClamp',
+                                            'module': 'boxes.generators.laserclamp',
+                                            'ui_group': 'Misc',
+                                            'webinterface': True,
+                                            'doc': 'A clamp to hold down material to a knife '
+                                                   'table'},
+ 'boxes.generators.laserholdfast.LaserHoldfast': {'name': 'LaserHoldfast',
+                                                  'module': 'boxes.generators.laserholdfast',
+                                                  'ui_group': 'Part',
+                                                  'webinterface': True,
+                                                  'doc': 'A holdfast for honey comb tables of '
+                                                         'laser cutters'},
+ 'boxes.generators.lbeam.LBeam': {'name': 'LBeam',
+                                  'module': 'boxes.generators.lbeam',
+                                  'ui_group': 'Part',
+                                  'webinterface': True,
+                                  'doc': 'Simple L-Beam: two pieces joined with a right angle'},
+ 'boxes.generators.linkage.Linkage': {'name': 'Linkage',
+                                      'module': 'boxes.generators.linkage',
+                                      'ui_group': 'Part',
+                                      'webinterface': True,
+                                      'doc': 'Model for trying out linkages'},
+ 'boxes.generators.magazinefile.MagazineFile': {'name': 'MagazineFile',
+                                                'module': 'boxes.generators.magazinefile',
+                                                'ui_group': 'Misc',
+                                                'webinterface': True,
+                                                'doc': 'Open magazine file'},
+ 'boxes.generators.makitapowersupply.MakitaPowerSupply': {'name': 'MakitaPowerSupply',
+                                                          'module': 'boxes.generators.makitapowersupply',
+                                                          'ui_group': 'Misc',
+                                                          'webinterface': True,
+                                                          'doc': 'Bench power supply powered with '
+                                                                 'Maktia 18V battery or laptop '
+                                                                 'power supply'},
+ 'boxes.generators.matrix.Matrix': {'name': 'Matrix',
+                                    'module': 'boxes.generators.matrix',
+                                    'ui_group': 'Misc',
+                                    'webinterface': True,
+                                    'doc': 'WS2812b matrix enclosure'},
+ 'boxes.generators.microrack.SBCMicroRack': {'name': 'SBCMicroRack',
+                                             'module': 'boxes.generators.microrack',
+                                             'ui_group': 'Shelf',
+                                             'webinterface': True,
+                                             'doc': 'Stackable rackable racks for SBC Pi-Style '
+                                                    'Computers'},
+ 'boxes.generators.nemamount.NemaMount': {'name': 'NemaMount',
+                                          'module': 'boxes.generators.nemamount',
+                                          'ui_group': 'Part',
+                                          'webinterface': True,
+                                          'doc': 'Mounting bracket for a Nema motor'},
+ 'boxes.generators.nemapattern.NemaPattern': {'name': 'NemaPattern',
+                                              'module': 'boxes.generators.nemapattern',
+                                              'ui_group': 'Holes',
+                                              'webinterface': True,
+                                              'doc': 'Mounting holes for a Nema motor'},
+ 'boxes.generators.nightlightbox.NightLightBox': {'name': 'NightLightBox',
+                                                  'module': 'boxes.generators.nightlightbox',
+                                                  'ui_group': 'Misc',
+                                                  'webinterface': True,
+                                                  'doc': 'Simple decorative lamp with creatively '
+                                                         'laser cut plates'},
+ 'boxes.generators.notesholder.NotesHolder': {'name': 'NotesHolder',
+                                              'module': 'boxes.generators.notesholder',
+                                              'ui_group': 'Box',
+                                              'webinterface': True,
+                                              'doc': 'Box for holding a stack of paper, coasters '
+                                                     'etc'},
+ 'boxes.generators.openbox.OpenBox': {'name': 'OpenBox',
+                                      'module': 'boxes.generators.openbox',
+                                      'ui_group': 'Box',
+                                      'webinterface': True,
+                                      'doc': 'Box with top and front open'},
+ 'boxes.generators.organpipe.OrganPipe': {'name': 'OrganPipe',
+                                          'module': 'boxes.generators.organpipe',
+                                          'ui_group': 'Unstable',
+                                          'webinterface': True,
+                                          'doc': 'Rectangular organ pipe based on pipecalc'},
+ 'boxes.generators.ottobody.OttoBody': {'name': 'OttoBody',
+                                        'module': 'boxes.generators.ottobody',
+                                        'ui_group': 'Misc',
+                                        'webinterface': True,
+                                        'doc': 'Otto LC - a laser cut chassis for Otto DIY - body'},
+ 'boxes.generators.ottolegs.OttoLegs': {'name': 'OttoLegs',
+                                        'module': 'boxes.generators.ottolegs',
+                                        'ui_group': 'Misc',
+                                        'webinterface': True,
+                                        'doc': 'Otto LC - a laser cut chassis for Otto DIY - legs'},
+ 'boxes.generators.ottosoles.OttoSoles': {'name': 'OttoSoles',
+                                          'module': 'boxes.generators.ottosoles',
+                                          'ui_group': 'Misc',
+                                          'webinterface': True,
+                                          'doc': 'Foam soles for the OttO bot'},
+ 'boxes.generators.paintbox.PaintStorage': {'name': 'PaintStorage',
+                                            'module': 'boxes.generators.paintbox',
+                                            'ui_group': 'Shelf',
+                                            'webinterface': True,
+                                            'doc': 'Stackable storage for hobby paint or other '
+                                                   'things'},
+ 'boxes.generators.paperbox.PaperBox': {'name': 'PaperBox',
+                                        'module': 'boxes.generators.paperbox',
+                                        'ui_group': 'Misc',
+                                        'webinterface': True,
+                                        'doc': 'Box made of paper, with lid.'},
+ 'boxes.generators.penholderbox.PenHolderBox': {'name': 'PenHolderBox',
+                                                'module': 'boxes.generators.penholderbox',
+                                                'ui_group': 'Tray',
+                                                'webinterface': True,
+                                                'doc': 'PenHolderBox: Open pen holder box with two '
+                                                       'internal grid plates.'},
+ 'boxes.generators.phoneholder.PhoneHolder': {'name': 'PhoneHolder',
+                                              'module': 'boxes.generators.phoneholder',
+                                              'ui_group': 'Misc',
+                                              'webinterface': True,
+                                              'doc': 'Smartphone desk holder'},
+ 'boxes.generators.photoframe.PhotoFrame': {'name': 'PhotoFrame',
+                                            'module': 'boxes.generators.photoframe',
+                                            'ui_group': 'Misc',
+                                            'webinterface': True,
+                                            'doc': '3-layer photo frame with a slot at the top to '
+                                                   'slide matboard/acrylic/glass over the photo '
+                                                   'after glue-up.'},
+ 'boxes.generators.piratechest.PirateChest': {'name': 'PirateChest',
+                                              'module': 'boxes.generators.piratechest',
+                                              'ui_group': 'Box',
+                                              'webinterface': True,
+                                              'doc': 'Box with polygon lid with chest hinges.'},
+ 'boxes.generators.pizzashovel.PizzaShovel': {'name': 'PizzaShovel',
+                                              'module': 'boxes.generators.pizzashovel',
+                                              'ui_group': 'Misc',
+                                              'webinterface': True,
+                                              'doc': 'Pizza shovel with conveyor belt action'},
+ 'boxes.generators.planetary.Planetary': {'name': 'Planetary',
+                                          'module': 'boxes.generators.planetary',
+                                          'ui_group': 'Part',
+                                          'webinterface': True,
+                                          'doc': 'Planetary Gear with possibly multiple identical '
+                                                 'stages'},
+ 'boxes.generators.planetary2.Planetary2': {'name': 'Planetary2',
+                                            'module': 'boxes.generators.planetary2',
+                                            'ui_group': 'Unstable',
+                                            'webinterface': True,
+                                            'doc': 'Balanced force Difference Planetary Gear (not '
+                                                   'yet working properly)'},
+ 'boxes.generators.platonic.Platonic': {'name': 'Platonic',
+                                        'module': 'boxes.generators.platonic',
+                                        'ui_group': 'Unstable',
+                                        'webinterface': True,
+                                        'doc': 'Platonic solids generator'},
+ 'boxes.generators.polehook.PoleHook': {'name': 'PoleHook',
+                                        'module': 'boxes.generators.polehook',
+                                        'ui_group': 'Misc',
+                                        'webinterface': True,
+                                        'doc': 'Hook for pole like things to be clamped to another '
+                                               'pole'},
+ 'boxes.generators.pulley.Pulley': {'name': 'Pulley',
+                                    'module': 'boxes.generators.pulley',
+                                    'ui_group': 'Part',
+                                    'webinterface': True,
+                                    'doc': 'Timing belt pulleys for different profiles'},
+ 'boxes.generators.rack10box.Rack10Box': {'name': 'Rack10Box',
+                                          'module': 'boxes.generators.rack10box',
+                                          'ui_group': 'Box',
+                                          'webinterface': True,
+                                          'doc': 'Closed box with screw on top for mounting in a '
+                                                 '10" rack.'},
+ 'boxes.generators.rack19box.Rack19Box': {'name': 'Rack19Box',
+                                          'module': 'boxes.generators.rack19box',
+                                          'ui_group': 'Box',
+                                          'webinterface': True,
+                                          'doc': 'Closed box with screw on top for mounting in a '
+                                                 '19" rack.'},
+ 'boxes.generators.rack19halfwidth.Rack19HalfWidth': {'name': 'Rack19HalfWidth',
+                                                      'module': 'boxes.generators.rack19halfwidth',
+                                                      'ui_group': 'Box',
+                                                      'webinterface': True,
+                                                      'doc': 'Half width 19inch rack unit for '
+                                                             'musical equipment.'},
+ 'boxes.generators.rackbox.RackBox': {'name': 'RackBox',
+                                      'module': 'boxes.generators.rackbox',
+                                      'ui_group': 'Box',
+                                      'webinterface': True,
+                                      'doc': 'Closed box with screw on top and mounting holes'},
+ 'boxes.generators.ramp.Ramp': {'name': 'Ramp',
+                                'module': 'boxes.generators.ramp',
+                                'ui_group': 'Misc',
+                                'webinterface': True,
+                                'doc': 'Ramp for accessibility purposes'},
+ 'boxes.generators.rectangularWall.RectangularWall': {'name': 'RectangularWall',
+                                                      'module': 'boxes.generators.rectangularWall',
+                                                      'ui_group': 'Part',
+                                                      'webinterface': True,
+                                                      'doc': 'Simple wall with options for '
+                                                             'different edges'},
+ 'boxes.generators.regularbox.RegularBox': {'name': 'RegularBox',
+                                            'module': 'boxes.generators.regularbox',
+                                            'ui_group': 'Box',
+                                            'webinterface': True,
+                                            'doc': 'Box with regular polygon as base'},
+ 'boxes.generators.regularstarbox.RegularStarBox': {'name': 'RegularStarBox',
+                                                    'module': 'boxes.generators.regularstarbox',
+                                                    'ui_group': 'Box',
+                                                    'webinterface': True,
+                                                    'doc': 'Regular polygon boxes that form a star '
+                                                           'when closed'},
+ 'boxes.generators.robotarm.RobotArm': {'name': 'RobotArm',
+                                        'module': 'boxes.generators.robotarm',
+                                        'ui_group': 'Part',
+                                        'webinterface': True,
+                                        'doc': 'Segments of servo powered robot arm'},
+ 'boxes.generators.rollholder.RollHolder': {'name': 'RollHolder',
+                                            'module': 'boxes.generators.rollholder',
+                                            'ui_group': 'WallMounted',
+                                            'webinterface': True,
+                                            'doc': 'Holder for kitchen rolls or other rolls'},
+ 'boxes.generators.rotary.Rotary': {'name': 'Rotary',
+                                    'module': 'boxes.generators.rotary',
+                                    'ui_group': 'Unstable',
+                                    'webinterface': True,
+                                    'doc': 'Rotary Attachment for engraving cylindrical objects in '
+                                           'a laser cutter'},
+ 'boxes.generators.roundedbox.RoundedBox': {'name': 'RoundedBox',
+                                            'module': 'boxes.generators.roundedbox',
+                                            'ui_group': 'FlexBox',
+                                            'webinterface': True,
+                                            'doc': 'Box with vertical edges rounded'},
+ 'boxes.generators.roundedregularbox.RoundedRegularBox': {'name': 'RoundedRegularBox',
+                                                          'module': 'boxes.generators.roundedregularbox',
+                                                          'ui_group': 'FlexBox',
+                                                          'webinterface': True,
+                                                          'doc': 'Regular polygon box with rounded '
+                                                                 'vertical edges.'},
+ 'boxes.generators.roundedtrapezoidbox.RoundedTrapezoidBox': {'name': 'RoundedTrapezoidBox',
+                                                              'module': 'boxes.generators.roundedtrapezoidbox',
+                                                              'ui_group': 'Unstable',
+                                                              'webinterface': True,
+                                                              'doc': 'Trapezoid box with rounded '
+                                                                     'vertical edges.'},
+ 'boxes.generators.royalgame.RoyalGame': {'name': 'RoyalGame',
+                                          'module': 'boxes.generators.royalgame',
+                                          'ui_group': 'Misc',
+                                          'webinterface': True,
+                                          'doc': 'The Royal Game of Ur'},
+ 'boxes.generators.sevensegment.SevenSegmentPattern': {'name': 'SevenSegmentPattern',
+                                                       'module': 'boxes.generators.sevensegment',
+                                                       'ui_group': 'Holes',
+                                                       'webinterface': True,
+                                                       'doc': 'Holepatterns and walls for a seven '
+                                                              'segment digit'},
+ 'boxes.generators.sevensegmentclock.SevenSegmentClock': {'name': 'SevenSegmentClock',
+                                                          'module': 'boxes.generators.sevensegmentclock',
+                                                          'ui_group': 'Misc',
+                                                          'webinterface': True,
+                                                          'doc': 'Seven segment clock build with '
+                                                                 'LED stripe'},
+ 'boxes.generators.shadowbox.Shadowbox': {'name': 'Shadowbox',
+                                          'module': 'boxes.generators.shadowbox',
+                                          'ui_group': 'Misc',
+                                          'webinterface': True,
+                                          'doc': 'The frame and spacers necessary to display a '
+                                                 'shadowbox / lightbox.'},
+ 'boxes.generators.shoe.Shoe': {'name': 'Shoe',
+                                'module': 'boxes.generators.shoe',
+                                'ui_group': 'Misc',
+                                'webinterface': True,
+                                'doc': 'Shoe shaped box'},
+ 'boxes.generators.shutterbox.ShutterBox': {'name': 'ShutterBox',
+                                            'module': 'boxes.generators.shutterbox',
+                                            'ui_group': 'FlexBox',
+                                            'webinterface': True,
+                                            'doc': 'Box with a rolling shutter made of flex'},
+ 'boxes.generators.sidedoorhousing.SideDoorHousing': {'name': 'SideDoorHousing',
+                                                      'module': 'boxes.generators.sidedoorhousing',
+                                                      'ui_group': 'Box',
+                                                      'webinterface': True,
+                                                      'doc': 'Box with service hatches on either '
+                                                             'one or both of the sides that are '
+                                                             'locked with latches'},
+ 'boxes.generators.sidehingebox.SideHingeBox': {'name': 'SideHingeBox',
+                                                'module': 'boxes.generators.sidehingebox',
+                                                'ui_group': 'Box',
+                                                'webinterface': True,
+                                                'doc': 'Box, with an hinge that does not protrude '
+                                                       'from the back of the box, and a latch.'},
+ 'boxes.generators.silverwarebox.Silverware': {'name': 'Silverware',
+                                               'module': 'boxes.generators.silverwarebox',
+                                               'ui_group': 'Unstable',
+                                               'webinterface': True,
+                                               'doc': 'Cuttlery stand with carrying grip\n'
+                                                      'using flex for rounded corners'},
+ 'boxes.generators.skadis.SkadisBoard': {'name': 'SkadisBoard',
+                                         'module': 'boxes.generators.skadis',
+                                         'ui_group': 'WallMounted',
+                                         'webinterface': True,
+                                         'doc': 'Customizable Ikea like pegboard'},
+ 'boxes.generators.skadisstand.SkadisStand': {'name': 'SkadisStand',
+                                              'module': 'boxes.generators.skadisstand',
+                                              'ui_group': 'WallMounted',
+                                              'webinterface': True,
+                                              'doc': 'Feet for a Skadis board so it can stand on '
+                                                     'its own'},
+ 'boxes.generators.slantedtray.SlantedTray': {'name': 'SlantedTray',
+                                              'module': 'boxes.generators.slantedtray',
+                                              'ui_group': 'Tray',
+                                              'webinterface': True,
+                                              'doc': 'One row tray with high back wall and low '
+                                                     'front wall'},
+ 'boxes.generators.slidingdrawer.SlidingDrawer': {'name': 'SlidingDrawer',
+                                                  'module': 'boxes.generators.slidingdrawer',
+                                                  'ui_group': 'Box',
+                                                  'webinterface': True,
+                                                  'doc': 'Sliding drawer box'},
+ 'boxes.generators.slidinglidbox.SlidingLidBox': {'name': 'SlidingLidBox',
+                                                  'module': 'boxes.generators.slidinglidbox',
+                                                  'ui_group': 'Box',
+                                                  'webinterface': True,
+                                                  'doc': 'Box with rails for a sliding lid'},
+ 'boxes.generators.smallpartstray.SmallPartsTray': {'name': 'SmallPartsTray',
+                                                    'module': 'boxes.generators.smallpartstray',
+                                                    'ui_group': 'Tray',
+                                                    'webinterface': True,
+                                                    'doc': 'Tray with slants to easier get out '
+                                                           'game tokens or screws'},
+ 'boxes.generators.smallpartstray2.SmallPartsTray2': {'name': 'SmallPartsTray2',
+                                                      'module': 'boxes.generators.smallpartstray2',
+                                                      'ui_group': 'Tray',
+                                                      'webinterface': True,
+                                                      'doc': 'A Type Tray variant with slopes '
+                                                             'toward the front'},
+ 'boxes.generators.sphere.Sphere': {'name': 'Sphere',
+                                    'module': 'boxes.generators.sphere',
+                                    'ui_group': 'Misc',
+                                    'webinterface': True,
+                                    'doc': 'Actually not a sphere, but a hosohedron. Also not '
+                                           'actually a box, but a globe, lamp, ornament or '
+                                           'whatever you want it to be.'},
+ 'boxes.generators.spicesrack.SpicesRack': {'name': 'SpicesRack',
+                                            'module': 'boxes.generators.spicesrack',
+                                            'ui_group': 'Shelf',
+                                            'webinterface': True,
+                                            'doc': 'Rack for cans of spices'},
+ 'boxes.generators.spool.Spool': {'name': 'Spool',
+                                  'module': 'boxes.generators.spool',
+                                  'ui_group': 'Misc',
+                                  'webinterface': True,
+                                  'doc': 'A simple spool'},
+ 'boxes.generators.stachel.Stachel': {'name': 'Stachel',
+                                      'module': 'boxes.generators.stachel',
+                                      'ui_group': 'Misc',
+                                      'webinterface': True,
+                                      'doc': 'Bass Recorder Endpin'},
+ 'boxes.generators.stackablebin.StackableBin': {'name': 'StackableBin',
+                                                'module': 'boxes.generators.stackablebin',
+                                                'ui_group': 'Shelf',
+                                                'webinterface': True,
+                                                'doc': 'Stackable bin base on bintray'},
+ 'boxes.generators.stevensonscreenbox.StevensonScreenBox': {'name': 'StevensonScreenBox',
+                                                            'module': 'boxes.generators.stevensonscreenbox',
+                                                            'ui_group': 'Box',
+                                                            'webinterface': True,
+                                                            'doc': 'A box with Stevenson Screens '
+                                                                   'front and back.'},
+ 'boxes.generators.storagerack.StorageRack': {'name': 'StorageRack',
+                                              'module': 'boxes.generators.storagerack',
+                                              'ui_group': 'Shelf',
+                                              'webinterface': True,
+                                              'doc': 'StorageRack to store boxes and trays which '
+                                                     'have their own floor'},
+ 'boxes.generators.storageshelf.StorageShelf': {'name': 'StorageShelf',
+                                                'module': 'boxes.generators.storageshelf',
+                                                'ui_group': 'Shelf',
+                                                'webinterface': True,
+                                                'doc': 'StorageShelf can be used to store '
+                                                       'Typetray'},
+ 'boxes.generators.tetris.Tetris': {'name': 'Tetris',
+                                    'module': 'boxes.generators.tetris',
+                                    'ui_group': 'Misc',
+                                    'webinterface': True,
+                                    'doc': '3D Tetris shapes'},
+ 'boxes.generators.trafficlight.TrafficLight': {'name': 'TrafficLight',
+                                                'module': 'boxes.generators.trafficlight',
+                                                'ui_group': 'Misc',
+                                                'webinterface': True,
+                                                'doc': 'Traffic light'},
+ 'boxes.generators.trayinsert.TrayInsert': {'name': 'TrayInsert',
+                                            'module': 'boxes.generators.trayinsert',
+                                            'ui_group': 'Tray',
+                                            'webinterface': True,
+                                            'doc': 'Tray insert without floor and outer walls - '
+                                                   'allows only continuous walls'},
+ 'boxes.generators.traylayout.TrayLayout': {'name': 'TrayLayout',
+                                            'module': 'boxes.generators.traylayout',
+                                            'ui_group': 'Tray',
+                                            'webinterface': True,
+                                            'doc': 'Generate a typetray from a layout file.'},
+ 'boxes.generators.traylayout.TrayLayoutFile': {'name': 'TrayLayoutFile',
+                                                'module': 'boxes.generators.traylayout',
+                                                'ui_group': 'Tray',
+                                                'webinterface': False,
+                                                'doc': 'Generate a layout file for a typetray.'},
+ 'boxes.generators.trianglelamp.TriangleLamp': {'name': 'TriangleLamp',
+                                                'module': 'boxes.generators.trianglelamp',
+                                                'ui_group': 'Misc',
+                                                'webinterface': True,
+                                                'doc': 'Triangle LED Lamp'},
+ 'boxes.generators.triangularwall.TriangularWall': {'name': 'TriangularWall',
+                                                    'module': 'boxes.generators.triangularwall',
+                                                    'ui_group': 'Part',
+                                                    'webinterface': True,
+                                                    'doc': 'Simple wall with options for different '
+                                                           'edges'},
+ 'boxes.generators.two_piece.TwoPiece': {'name': 'TwoPiece',
+                                         'module': 'boxes.generators.two_piece',
+                                         'ui_group': 'Box',
+                                         'webinterface': True,
+                                         'doc': 'A two piece box where top slips over the bottom '
+                                                'half to form the enclosure.'},
+ 'boxes.generators.typetray.TypeTray': {'name': 'TypeTray',
+                                        'module': 'boxes.generators.typetray',
+                                        'ui_group': 'Tray',
+                                        'webinterface': True,
+                                        'doc': 'Type tray - allows only continuous walls'},
+ 'boxes.generators.ubox.UBox': {'name': 'UBox',
+                                'module': 'boxes.generators.ubox',
+                                'ui_group': 'FlexBox',
+                                'webinterface': True,
+                                'doc': 'Box various options for different stypes and lids'},
+ 'boxes.generators.unevenheightbox.UnevenHeightBox': {'name': 'UnevenHeightBox',
+                                                      'module': 'boxes.generators.unevenheightbox',
+                                                      'ui_group': 'Box',
+                                                      'webinterface': True,
+                                                      'doc': 'Box with different height in each '
+                                                             'corner'},
+ 'boxes.generators.universalbox.UniversalBox': {'name': 'UniversalBox',
+                                                'module': 'boxes.generators.universalbox',
+                                                'ui_group': 'Box',
+                                                'webinterface': True,
+                                                'doc': 'Box with various options for different '
+                                                       'styles and lids'},
+ 'boxes.generators.wallcaliperholder.WallCaliper': {'name': 'WallCaliper',
+                                                    'module': 'boxes.generators.wallcaliperholder',
+                                                    'ui_group': 'WallMounted',
+                                                    'webinterface': True,
+                                                    'doc': 'Holds a single caliper to a wall'},
+ 'boxes.generators.wallchiselholder.WallChiselHolder': {'name': 'WallChiselHolder',
+                                                        'module': 'boxes.generators.wallchiselholder',
+                                                        'ui_group': 'WallMounted',
+                                                        'webinterface': True,
+                                                        'doc': 'Wall tool holder for chisels, '
+                                                               'files and similar tools'},
+ 'boxes.generators.wallconsole.WallConsole': {'name': 'WallConsole',
+                                              'module': 'boxes.generators.wallconsole',
+                                              'ui_group': 'WallMounted',
+                                              'webinterface': True,
+                                              'doc': 'Outset and angled plate to mount stuff to'},
+ 'boxes.generators.walldrillbox.WallDrillBox': {'name': 'WallDrillBox',
+                                                'module': 'boxes.generators.walldrillbox',
+                                                'ui_group': 'WallMounted',
+                                                'webinterface': True,
+                                                'doc': 'Box for drills with each compartment with '
+                                                       'a different height'},
+ 'boxes.generators.walledges.WallEdges': {'name': 'WallEdges',
+                                          'module': 'boxes.generators.walledges',
+                                          'ui_group': 'WallMounted',
+                                          'webinterface': True,
+                                          'doc': 'Shows the different edge types for wall systems'},
+ 'boxes.generators.wallhook.WallHook': {'name': 'WallHook',
+                                        'module': 'boxes.generators.wallhook',
+                                        'ui_group': 'WallMounted',
+                                        'webinterface': True,
+                                        'doc': 'Hook to install on a wall'},
+ 'boxes.generators.wallhopper.WallHopper': {'name': 'WallHopper',
+                                            'module': 'boxes.generators.wallhopper',
+                                            'ui_group': 'WallMounted',
+                                            'webinterface': True,
+                                            'doc': 'Storage hopper with dispensing tray'},
+ 'boxes.generators.wallpinrow.WallPinRow': {'name': 'WallPinRow',
+                                            'module': 'boxes.generators.wallpinrow',
+                                            'ui_group': 'WallMounted',
+                                            'webinterface': True,
+                                            'doc': 'Outset and angled plate to mount stuff to'},
+ 'boxes.generators.wallplaneholder.WallPlaneHolder': {'name': 'WallPlaneHolder',
+                                                      'module': 'boxes.generators.wallplaneholder',
+                                                      'ui_group': 'WallMounted',
+                                                      'webinterface': True,
+                                                      'doc': 'Hold a plane to a wall'},
+ 'boxes.generators.wallpliersholder.WallPliersHolder': {'name': 'WallPliersHolder',
+                                                        'module': 'boxes.generators.wallpliersholder',
+                                                        'ui_group': 'WallMounted',
+                                                        'webinterface': True,
+                                                        'doc': 'Bar to hang pliers on'},
+ 'boxes.generators.wallrack.WallRack': {'name': 'WallRack',
+                                        'module': 'boxes.generators.wallrack',
+                                        'ui_group': 'WallMounted',
+                                        'webinterface': True,
+                                        'doc': 'Wall mountable rack for spices or other items'},
+ 'boxes.generators.wallrollholder.WallRollHolder': {'name': 'WallRollHolder',
+                                                    'module': 'boxes.generators.wallrollholder',
+                                                    'ui_group': 'WallMounted',
+                                                    'webinterface': True,
+                                                    'doc': 'Holder for kitchen rolls or other '
+                                                           'rolls'},
+ 'boxes.generators.wallslottedholder.WallSlottedHolder': {'name': 'WallSlottedHolder',
+                                                          'module': 'boxes.generators.wallslottedholder',
+                                                          'ui_group': 'WallMounted',
+                                                          'webinterface': True,
+                                                          'doc': 'Wall tool holder with slots'},
+ 'boxes.generators.wallstackablebin.WallStackableBin': {'name': 'WallStackableBin',
+                                                        'module': 'boxes.generators.wallstackablebin',
+                                                        'ui_group': 'WallMounted',
+                                                        'webinterface': True,
+                                                        'doc': 'A wall-mounted bin that can stack '
+                                                               'or hang from a wall.'},
+ 'boxes.generators.wallstairs.WallStairs': {'name': 'WallStairs',
+                                            'module': 'boxes.generators.wallstairs',
+                                            'ui_group': 'WallMounted',
+                                            'webinterface': True,
+                                            'doc': 'Platforms in different heights e.g. for screw '
+                                                   'drivers'},
+ 'boxes.generators.walltypetray.WallTypeTray': {'name': 'WallTypeTray',
+                                                'module': 'boxes.generators.walltypetray',
+                                                'ui_group': 'WallMounted',
+                                                'webinterface': True,
+                                                'doc': 'Type tray - allows only continuous walls'},
+ 'boxes.generators.wallwrenchholder.WallWrenchHolder': {'name': 'WallWrenchHolder',
+                                                        'module': 'boxes.generators.wallwrenchholder',
+                                                        'ui_group': 'WallMounted',
+                                                        'webinterface': True,
+                                                        'doc': 'Hold a set of wrenches at a wall'},
+ 'boxes.generators.wavyknob.WavyKnob': {'name': 'WavyKnob',
+                                        'module': 'boxes.generators.wavyknob',
+                                        'ui_group': 'Part',
+                                        'webinterface': True,
+                                        'doc': 'Round knob serrated outside for better gripping'},
+ 'boxes.generators.winerack.WineRack': {'name': 'WineRack',
+                                        'module': 'boxes.generators.winerack',
+                                        'ui_group': 'Shelf',
+                                        'webinterface': True,
+                                        'doc': 'Honey Comb Style Wine Rack'},
+ 'boxes.generators.zbeam.ZBeam': {'name': 'ZBeam',
+                                  'module': 'boxes.generators.zbeam',
+                                  'ui_group': 'Part',
+                                  'webinterface': True,
+                                  'doc': 'Z-Beam (or U-Beam): three pieces joined at right angles'}}
@@ -0,0 +1,164 @@
+"""Build manifest for incremental multi_generate runs
+
+Maps a digest of everything a rendered box depends on -- the source of
+the generator (and of the generator modules it uses), the core boxes
+modules, the translations, the settings, the output format and whether
+profiling is enabled -- to the files written and their hashes. Boxes
+whose digest is found and whose files are still unchanged on disk do not
+need to be rendered again.
+"""
+from __future__ import annotations
+
+import gettext
+import hashlib
+import inspect
+import json
+import os
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+from boxes.profiler import profiling_enabled
+
+CORE_PATH = Path(__file__).parent
+
+
+def fileHash(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _generatorModules(module: ModuleType) -> list[ModuleType]:
+    """The module and all generator modules it (indirectly) uses"""
+    result: dict[str, ModuleType] = {}
+    stack = [module]
+    while stack:
+        module = stack.pop()
+        if module.__name__ in result:
+            continue
+        result[module.__name__] = module
+        for value in vars(module).values():
+            used: ModuleType | None
+            if isinstance(value, ModuleType):
+                used = value
+            else:
+                used = sys.modules.get(getattr(value, "__module__", None) or "")
+            if (used is not None and used.__name__ not in result and
+                    used.__name__.startswith("boxes.generators.")):
+                stack.append(used)
+    return [result[name] for name in sorted(result)]
+
+
+class BuildManifest:
+
+    filename = ".boxes_manifest.json"
+    version = 1
+
+    def __init__(self, output_path) -> None:
+        self.output_path = output_path
+        self.path = os.path.join(output_path, self.filename)
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.used: dict[str, dict[str, Any]] = {}
+        self._source_hashes: dict[type, str] = {}
+        self._core_hash: str | None = None
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get("version") == self.version:
+                self.entries = data["entries"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def coreHash(self) -> str:
+        """Hash of the boxes modules shared by all generators, of
+        boxes_main and of the message catalogs it loads"""
+        if self._core_hash is None:
+            h = hashlib.sha256()
+            for path in (sorted(CORE_PATH.glob("*.py")) +
+                         [CORE_PATH / "scripts" / "boxes_main.py"]):
+                h.update(f"{path.relative_to(CORE_PATH)}:{fileHash(path)}\n".encode())
+            # same lookup as boxes_main.get_translation()
+            for catalog in gettext.find("boxes.py", localedir="locale", all=True):
+                h.update(f"{catalog}:{fileHash(catalog)}\n".encode())
+            self._core_hash = h.hexdigest()
+        return self._core_hash
+
+    def sourceHash(self, box_cls: type) -> str:
+        """Hash of the core and of the generator modules used by box_cls"""
+        if box_cls not in self._source_hashes:
+            modules: dict[str, ModuleType] = {}
+            for cls in box_cls.__mro__:
+                module = sys.modules.get(cls.__module__)
+                if module is not None and module.__name__.startswith("boxes.generators."):
+                    modules.update((m.__name__, m) for m in _generatorModules(module))
+                elif cls is box_cls and module is not None:
+                    # generators outside of boxes.generators
+                    modules[module.__name__] = module
+            h = hashlib.sha256(self.coreHash().encode())
+            for name, module in sorted(modules.items()):
+                path = inspect.getsourcefile(module)
+                h.update(f"{name}:{fileHash(path) if path else ''}\n".encode())
+            self._source_hashes[box_cls] = h.hexdigest()
+        return self._source_hashes[box_cls]
+
+    def digest(self, box_cls, ii, box_settings, defaults, output_name_formater, format) -> str:
+        """Digest of all inputs of a box of multi_generate"""
+        settings = dict(defaults)
+        settings.update(box_settings.get("args", {}))
+        layout = settings.get("layout")
+        if isinstance(layout, str) and os.path.exists(layout):
+            settings["layout"] = fileHash(layout)
+        if callable(output_name_formater):
+            names = output_name_formater.__module__ + "." + output_name_formater.__qualname__
+        else:
+            names = str(output_name_formater)
+        inputs = {
+            "source": self.sourceHash(box_cls),
+            "generator": box_cls.__name__,
+            "name": box_settings.get("name"),
+            "settings": {k: repr(v) for k, v in sorted(settings.items())},
+            "count": box_settings.get("count"),
+            "format": format,
+            "names": names,
+            # profiled output contains the timings
+            "profile": profiling_enabled(),
+        }
+        # the index only matters if it can end up in the file names
+        if callable(output_name_formater) or "box_idx" in names:
+            inputs["box_idx"] = ii
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+    def outputs(self, digest: str) -> list[str] | None:
+        """Files of a previous run with the same inputs if they are unchanged"""
+        entry = self.entries.get(digest)
+        if entry is None:
+            return None
+        files = []
+        for name, file_hash in entry["files"]:
+            path = os.path.join(self.output_path, name)
+            try:
+                if fileHash(path) != file_hash:
+                    return None
+            except OSError:
+                return None
+            files.append(path)
+        self.used[digest] = entry
+        return files
+
+    def record(self, digest: str, generator: str, files: list[str]) -> None:
+        self.used[digest] = {
+            "generator": generator,
+            "files": [(os.path.relpath(path, self.output_path), fileHash(path))
+                      for path in files],
+        }
+
+    def save(self) -> None:
+        """Write the entries of this run, dropping all others"""
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": self.version, "entries": self.used}, f, indent=1)
+        os.replace(tmp, self.path)
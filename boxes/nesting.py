@@ -0,0 +1,318 @@
+"""Packing of the parts of several rendered boxes onto panels
+
+Works directly on the parts of the surfaces instead of on written SVG
+files: the parts are copied, their extents are taken from the stored
+pathes, they are placed with rectpack and moved by transforming the
+copies. All panels end up on one new surface that can be written in any
+of the output formats.
+
+ShapeNester packs arbitrary outlines instead of their bounding boxes.
+Parts and panels are rasterized and the free positions for a part are
+found for all of its rotations at once by correlating the occupancy of
+the panel with the part using FFTs.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import random
+import time
+from array import array
+
+import numpy as np
+import rectpack
+import shapely
+import shapely.affinity
+from affine import Affine
+
+from boxes.Color import Color
+from boxes.drawing import Part, Path, outline_extents, transform_pathes
+from boxes.extents import Extents
+from boxes.formats import Formats
+
+# space between the panels on the output surface
+PANEL_SPACING = 20.0
+
+
+def copy_path(path: Path) -> Path:
+    result = Path(params=dict(path.params))
+    result.ops = bytearray(path.ops)
+    result.coords = array("d", path.coords)
+    result.texts = [list(t) for t in path.texts]
+    return result
+
+
+def box_parts(box) -> list[Part]:
+    """Copies of the non empty parts of a rendered box
+
+    Call after .render() and before .close(), which moves the parts to
+    the coordinates of the output file.
+    """
+    box.ctx.stroke()
+    box.surface.flush()
+    result = []
+    for part in box.surface.parts:
+        if part.pathes:
+            p = Part("part")
+            p.pathes = [copy_path(path) for path in part.pathes]
+            result.append(p)
+    return result
+
+
+def part_extents(part: Part) -> Extents:
+    """Extents of the outline and the texts of a part"""
+    e = outline_extents(part.pathes)
+    for path in part.pathes:
+        if path.texts:
+            path.text_extents(e)
+    return e
+
+
+def pack_parts(parts, panel_width: float, panel_height: float, margin: float = 1.0,
+               rotation: bool = False, bin_algo: str = "Global",
+               pack_algo: str = "MaxRectsBssf") -> list[list[Part]]:
+    """Place parts on as few panels as possible
+
+    :param parts: list of Part, moved in place to their position on the panel
+    :param margin: free space around each part in mm
+    :param rotation: allow turning parts by 90°
+    :param bin_algo: name of a rectpack.PackingBin
+    :param pack_algo: name of a rectpack packing algorithm
+
+    Returns the parts of each panel. Parts larger than a panel are left out.
+    """
+    try:
+        bin_algo = getattr(rectpack.PackingBin, bin_algo)
+    except AttributeError:
+        raise ValueError(f"invalid bin algorithm {bin_algo!r}")
+    try:
+        pack_algo = getattr(rectpack, pack_algo)
+    except AttributeError:
+        raise ValueError(f"invalid pack algorithm {pack_algo!r}")
+
+    packer = rectpack.newPacker(rotation=rotation, pack_algo=pack_algo, bin_algo=bin_algo)
+    extents = []
+    for i, part in enumerate(parts):
+        e = part_extents(part)
+        extents.append(e)
+        w, h = e.width + 2 * margin, e.height + 2 * margin
+        if not (w <= panel_width and h <= panel_height or
+                rotation and h <= panel_width and w <= panel_height):
+            logging.warning("Part %i (%.1fmm x %.1fmm) does not fit on a panel", i, e.width, e.height)
+            continue
+        packer.add_rect(w, h, i)
+    packer.add_bin(panel_width, panel_height, float("inf"))
+    packer.pack()
+
+    panels = []
+    for abin in packer:
+        panel = []
+        for rect in abin:
+            part, e = parts[rect.rid], extents[rect.rid]
+            m = Affine.translation(rect.x + margin, rect.y + margin)
+            # rectpack swaps width and height of turned rectangles
+            if rotation and abs(rect.width - (e.width + 2 * margin)) > 1e-6:
+                m *= Affine.translation(e.height, 0) * Affine.rotation(90)
+            m *= Affine.translation(-e.xmin, -e.ymin)
+            transform_pathes(part.pathes, 1.0, m)
+            panel.append(part)
+        panels.append(panel)
+    return panels
+
+
+def panels_surface(panels, panel_width: float, panel_height: float, metadata,
+                   format: str = "svg", outline: bool = True, debug: bool = False):
+    """Surface with all panels side by side
+
+    :param panels: parts per panel as returned by pack_parts()
+    :param metadata: metadata of the output, e.g. Boxes.metadata of one of the boxes
+    :param outline: draw the borders of the panels as annotations
+    :param debug: draw the bounding boxes of the parts as annotations
+
+    Write the result with surface.finish() and Formats().convert().
+    """
+    surface, ctx = Formats().getSurface(format)
+    for i, panel in enumerate(panels):
+        x = i * (panel_width + PANEL_SPACING)
+        if outline:
+            surface.new_part("panel")
+            ctx.set_source_rgb(*Color.ANNOTATIONS)
+            ctx.set_line_width(0.1)
+            ctx.rectangle(x, 0, panel_width, panel_height)
+            ctx.stroke()
+        m = Affine.translation(x, 0)
+        for part in panel:
+            if x:
+                transform_pathes(part.pathes, 1.0, m)
+            surface.parts.append(part)
+            if debug:
+                e = part_extents(part)
+                surface.new_part("debug")
+                ctx.set_source_rgb(*Color.ANNOTATIONS)
+                ctx.set_line_width(0.1)
+                ctx.rectangle(e.xmin, e.ymin, e.width, e.height)
+                ctx.stroke()
+    surface.parts = [part for part in surface.parts if part.pathes]
+    surface.set_metadata(metadata)
+    return surface
+
+
+def nest(boxes, panel_width: float, panel_height: float, format: str = "svg",
+         margin: float = 1.0, rotation: bool = False, bin_algo: str = "Global",
+         pack_algo: str = "MaxRectsBssf", inner_corners: str = "loop"):
+    """Pack the parts of rendered boxes onto panels and write them in one file
+
+    Boxes must be rendered but not closed. Returns the output data.
+    """
+    parts = [part for box in boxes for part in box_parts(box)]
+    panels = pack_parts(parts, panel_width, panel_height, margin, rotation,
+                        bin_algo, pack_algo)
+    surface = panels_surface(panels, panel_width, panel_height,
+                             dict(boxes[0].metadata), format)
+    formats = Formats()
+    return formats.convert(surface.finish(inner_corners), format)
+
+
+def filled(geometry):
+    """The polygons of geometry with their holes filled"""
+    polygons = [shapely.Polygon(shapely.get_exterior_ring(p))
+                for p in shapely.get_parts(geometry)
+                if isinstance(p, shapely.Polygon) and not p.is_empty]
+    return shapely.union_all(polygons)
+
+
+class ShapeNester:
+    """Packing of outlines onto panels on a raster
+
+    :param margin: free space around each part, like for pack_parts()
+    :param rotations: number of evenly spaced angles tried for each part
+    :param resolution: size of the raster cells, outlines are grown to whole cells
+    :param time_budget: seconds spent on trying other orders of the parts
+
+    The parts are placed one after another, largest first, on the first
+    panel they fit on, as far to the top and left as possible. The first
+    such packing is always completed, the remaining time of the budget is
+    used to pack the parts in randomly changed orders, keeping the packing
+    using the fewest panels. Holes in the parts are not used.
+    """
+
+    def __init__(self, panel_width: float, panel_height: float, margin: float = 1.0,
+                 rotations: int = 4, resolution: float = 1.0, time_budget: float = 10.0,
+                 seed: int = 0) -> None:
+        self.panel_width = panel_width
+        self.panel_height = panel_height
+        self.margin = margin
+        self.angles = [360.0 * i / rotations for i in range(max(rotations, 1))]
+        self.resolution = resolution
+        self.time_budget = time_budget
+        self.random = random.Random(seed)
+        self.rows = int(panel_height / resolution + 1e-9)
+        self.cols = int(panel_width / resolution + 1e-9)
+        # fraction of the area of each panel covered by parts
+        self.utilization: list[float] = []
+
+    def _masks(self, shape):
+        """Raster of the grown shape for each angle
+
+        Returns a list of (angle, mask, transformed mask, xmin, ymin).
+        """
+        res = self.resolution
+        grown = filled(shapely.buffer(shape, self.margin, join_style="mitre")
+                       if self.margin > 0 else shape)
+        result = []
+        for angle in self.angles:
+            rotated = shapely.affinity.rotate(grown, angle, origin=(0, 0))
+            xmin, ymin, xmax, ymax = rotated.bounds
+            w = max(math.ceil((xmax - xmin) / res - 1e-9), 1)
+            h = max(math.ceil((ymax - ymin) / res - 1e-9), 1)
+            if w > self.cols or h > self.rows:
+                continue
+            # all cells touching the shape: their centers are no farther
+            # away than half of the diagonal
+            touching = shapely.buffer(rotated, res * 0.7072, join_style="mitre")
+            xs, ys = np.meshgrid(xmin + (np.arange(w) + 0.5) * res,
+                                 ymin + (np.arange(h) + 0.5) * res)
+            mask = shapely.contains_xy(touching, xs, ys)
+            result.append((angle, mask, np.fft.rfft2(mask, s=(self.rows, self.cols)),
+                           xmin, ymin))
+        return result
+
+    def _place(self, panel_fft, masks):
+        """Best (score, rotation, row, column) on a panel or None"""
+        best = None
+        for k, (angle, mask, fft, xmin, ymin) in enumerate(masks):
+            h, w = mask.shape
+            # overlapping cells for every position of the mask
+            overlap = np.fft.irfft2(panel_fft * np.conj(fft), s=(self.rows, self.cols))
+            rows, cols = np.nonzero(overlap[:self.rows - h + 1, :self.cols - w + 1] < 0.5)
+            if not len(rows):
+                continue
+            score = (rows + h) * (self.cols + 1) + cols + w
+            i = int(score.argmin())
+            if best is None or score[i] < best[0]:
+                best = (int(score[i]), k, int(rows[i]), int(cols[i]))
+        return best
+
+    def _pack(self, order, masks):
+        panels: list[np.ndarray] = []
+        ffts: list[np.ndarray] = []
+        placements = {}
+        for n in order:
+            for p, fft in enumerate(ffts):
+                best = self._place(fft, masks[n])
+                if best is not None:
+                    break
+            else:
+                p = len(panels)
+                panels.append(np.zeros((self.rows, self.cols), dtype=bool))
+                ffts.append(np.zeros((self.rows, self.cols // 2 + 1), dtype=complex))
+                best = self._place(ffts[p], masks[n])
+            _, k, row, col = best
+            angle, mask, _, xmin, ymin = masks[n][k]
+            panels[p][row:row + mask.shape[0], col:col + mask.shape[1]] |= mask
+            ffts[p] = np.fft.rfft2(panels[p])
+            placements[n] = (p, angle, col * self.resolution - xmin,
+                             row * self.resolution - ymin)
+        return placements, panels
+
+    def nest(self, shapes):
+        """Place the shapes
+
+        :param shapes: outlines as shapely geometries
+
+        Returns per shape (panel, angle, dx, dy) or None if it does not
+        fit on a panel. The shape is to be rotated by angle (in degrees,
+        around the origin) and then moved by (dx, dy).
+        """
+        start = time.monotonic()
+        masks = [self._masks(shape) for shape in shapes]
+        for i, m in enumerate(masks):
+            if not m:
+                logging.warning("Part %i does not fit on a panel", i)
+        order = sorted((i for i, m in enumerate(masks) if m),
+                       key=lambda i: -shapes[i].area)
+
+        def cost(result):
+            # fewer panels first, then less on the last panel
+            placements, panels = result
+            return (len(panels), int(panels[-1].sum()) if panels else 0)
+
+        # the panels needed for the area of the parts can't be improved on
+        needed = math.ceil(sum(masks[n][0][1].sum() for n in order) / (self.rows * self.cols))
+        best = self._pack(order, masks)
+        best_cost = cost(best)
+        while (best_cost[0] > needed and
+               time.monotonic() - start < self.time_budget):
+            candidate = order[:]
+            i, j = sorted(self.random.sample(range(len(order)), 2))
+            candidate.insert(i, candidate.pop(j))
+            result = self._pack(candidate, masks)
+            if cost(result) < best_cost:
+                best, best_cost, order = result, cost(result), candidate
+
+        placements, panels = best
+        areas = [0.0] * len(panels)
+        for n, (p, angle, dx, dy) in placements.items():
+            areas[p] += filled(shapes[n]).area
+        self.utilization = [a / (self.panel_width * self.panel_height) for a in areas]
+        return [placements.get(n) for n in range(len(shapes))]
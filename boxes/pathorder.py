@@ -0,0 +1,235 @@
+"""Ordering of strokes to minimize the travel of a laser or tool head
+
+Strokes are given as arrays of start and end points. They may be cut in
+either direction. The order is built by a nearest neighbour search and
+then improved with 2-opt moves, where reversing a run of strokes also
+reverses the direction of each of them. Strokes that must keep their
+direction (like the ones containing texts) are only cut from their start.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+# 2-opt is quadratic per pass, larger groups only get nearest neighbour
+MAX_TWO_OPT = 2000
+MAX_TWO_OPT_PASSES = 5
+# nearest neighbour searches on more strokes use a grid index
+GRID_INDEX_MIN = 200
+
+
+class _GridIndex:
+    """Uniform grid over points for nearest neighbour searches with removal"""
+
+    def __init__(self, points) -> None:
+        self.points = points
+        self.alive = np.ones(len(points), dtype=bool)
+        self.xmin, self.ymin = points.min(axis=0)
+        xmax, ymax = points.max(axis=0)
+        area = max((xmax - self.xmin) * (ymax - self.ymin), 1e-12)
+        # about two points per cell
+        self.size = max(float(np.sqrt(2 * area / len(points))), 1e-6)
+        cells = np.floor((points - (self.xmin, self.ymin)) / self.size).astype(np.intp)
+        self.nx, self.ny = cells.max(axis=0) + 1
+        self.cells: dict[tuple[int, int], list[int]] = {}
+        for i, (cx, cy) in enumerate(cells.tolist()):
+            self.cells.setdefault((cx, cy), []).append(i)
+
+    def remove(self, i: int) -> None:
+        self.alive[i] = False
+
+    def nearest(self, x: float, y: float) -> int | None:
+        points, alive, size = self.points, self.alive, self.size
+        cx = min(max(int((x - self.xmin) // size), 0), self.nx - 1)
+        cy = min(max(int((y - self.ymin) // size), 0), self.ny - 1)
+        best, best_d = None, np.inf
+        for r in range(max(self.nx, self.ny) + 1):
+            for i in range(cx - r, cx + r + 1):
+                for j in (range(cy - r, cy + r + 1) if i in (cx - r, cx + r)
+                          else (cy - r, cy + r)):
+                    cell = self.cells.get((i, j))
+                    if not cell:
+                        continue
+                    cell[:] = [p for p in cell if alive[p]]
+                    for p in cell:
+                        d = (points[p, 0] - x) ** 2 + (points[p, 1] - y) ** 2
+                        if d < best_d:
+                            best, best_d = p, d
+            # distance to everything outside of the searched square
+            margin = min(x - self.xmin - (cx - r) * size, self.xmin + (cx + r + 1) * size - x,
+                         y - self.ymin - (cy - r) * size, self.ymin + (cy + r + 1) * size - y)
+            if best is not None and margin > 0 and margin * margin >= best_d:
+                break
+        return best
+
+
+def nearest_neighbour(starts, ends, pos=(0.0, 0.0), reversible=None):
+    """Greedy order starting at pos
+
+    Returns (order, flipped) with flipped[i] True if stroke order[i] is
+    cut from its end to its start. Strokes that are not reversible are
+    always cut from their start. Large sets of strokes are searched with a
+    grid index.
+    """
+    n = len(starts)
+    if reversible is None:
+        reversible = np.ones(n, dtype=bool)
+    order = np.empty(n, dtype=np.intp)
+    flipped = np.zeros(n, dtype=bool)
+    x, y = pos
+    if n > GRID_INDEX_MIN:
+        # points 0..n-1 are the starts, n.. the ends of the reversible strokes
+        owners = np.concatenate([np.arange(n), np.flatnonzero(reversible)])
+        index = _GridIndex(np.concatenate([starts, ends[reversible]]))
+        ends_of = np.full(n, -1, dtype=np.intp)
+        ends_of[reversible] = np.arange(n, len(owners))
+        for i in range(n):
+            p = index.nearest(x, y)
+            s = int(owners[p])
+            index.remove(s)
+            if ends_of[s] >= 0:
+                index.remove(int(ends_of[s]))
+            order[i], flipped[i] = s, p >= n
+            x, y = starts[s] if p >= n else ends[s]
+        return order, flipped
+
+    left = np.ones(n, dtype=bool)
+    for i in range(n):
+        ds = np.hypot(starts[:, 0] - x, starts[:, 1] - y)
+        de = np.hypot(ends[:, 0] - x, ends[:, 1] - y)
+        ds[~left] = np.inf
+        de[~left | ~reversible] = np.inf
+        s, e = int(ds.argmin()), int(de.argmin())
+        if de[e] < ds[s]:
+            order[i], flipped[i] = e, True
+            x, y = starts[e]
+        else:
+            order[i] = s
+            x, y = ends[s]
+        left[order[i]] = False
+    return order, flipped
+
+
+def two_opt(starts, ends, order, flipped, pos=(0.0, 0.0), reversible=None,
+            max_passes=MAX_TWO_OPT_PASSES):
+    """Improve an order in place by reversing runs of strokes
+
+    Runs containing strokes that are not reversible are left alone.
+    """
+    n = len(order)
+    if n < 2:
+        return order, flipped
+    for _ in range(max_passes):
+        # entry and exit points in the current order and direction
+        entry = np.where(flipped[:, None], ends[order], starts[order])
+        exit_ = np.where(flipped[:, None], starts[order], ends[order])
+        nx, ny = entry[:, 0], entry[:, 1]
+        ex, ey = exit_[:, 0], exit_[:, 1]
+        # position of the next stroke that must not be reversed
+        limit = np.full(n + 1, n, dtype=np.intp)
+        if reversible is not None:
+            for k in range(n - 1, -1, -1):
+                limit[k] = k if not reversible[order[k]] else limit[k + 1]
+        improved = False
+        for i in range(n - 1):
+            m = limit[i]
+            if m <= i + 1:
+                continue
+            px, py = pos if i == 0 else exit_[i - 1]
+            # reversing order[i:j+1] for i < j < m replaces the moves
+            # prev -> i and j -> j+1 with prev -> j and i -> j+1
+            delta = np.hypot(ex[i+1:m] - px, ey[i+1:m] - py)
+            delta -= np.hypot(nx[i] - px, ny[i] - py)
+            last = m if m < n else n - 1  # the last stroke has no successor
+            delta[:last-i-1] += (np.hypot(nx[i+2:last+1] - nx[i], ny[i+2:last+1] - ny[i]) -
+                                 np.hypot(nx[i+2:last+1] - ex[i+1:last], ny[i+2:last+1] - ey[i+1:last]))
+            k = int(delta.argmin())
+            if delta[k] < -1e-9:
+                j = i + 1 + k
+                order[i:j+1] = order[i:j+1][::-1].copy()
+                flipped[i:j+1] = ~flipped[i:j+1][::-1]
+                entry[i:j+1], exit_[i:j+1] = exit_[i:j+1][::-1].copy(), entry[i:j+1][::-1].copy()
+                improved = True
+        if not improved:
+            break
+    return order, flipped
+
+
+def order_strokes(starts, ends, pos=(0.0, 0.0), reversible=None):
+    """Order with nearest neighbour and 2-opt, see nearest_neighbour()"""
+    starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+    if reversible is not None:
+        reversible = np.asarray(reversible, dtype=bool)
+    order, flipped = nearest_neighbour(starts, ends, pos, reversible)
+    if len(order) <= MAX_TWO_OPT:
+        two_opt(starts, ends, order, flipped, pos, reversible)
+    return order, flipped
+
+
+def order_parts(parts, pos=(0.0, 0.0)):
+    """Cut order of the strokes of several parts
+
+    :param parts: per part a list of strokes as tuples
+      (start, end, bbox, closed, priority, reversible)
+    :param pos: start position of the tool
+
+    Parts are cut one after another, the nearest first. Within a part the
+    strokes are cut by ascending priority and nested strokes before the
+    closed ones enclosing them. Returns a list of
+    (part index, stroke index, flipped).
+    """
+    result = []
+    left = [i for i, strokes in enumerate(parts) if strokes]
+    part_bboxes = {}
+    for i in left:
+        bboxes = np.array([s[2] for s in parts[i]], dtype=float).reshape(-1, 4)
+        part_bboxes[i] = (bboxes, (*bboxes[:, :2].min(axis=0), *bboxes[:, 2:].max(axis=0)))
+    while left:
+        # nearest part next
+        distances = [np.hypot(max(b[0] - pos[0], 0, pos[0] - b[2]),
+                              max(b[1] - pos[1], 0, pos[1] - b[3]))
+                     for b in (part_bboxes[i][1] for i in left)]
+        n = left.pop(int(np.argmin(distances)))
+        strokes = parts[n]
+        depth = containment_depth(part_bboxes[n][0], [s[3] for s in strokes])
+        groups: dict[tuple[int, int], list[int]] = {}
+        for i, (stroke, d) in enumerate(zip(strokes, depth)):
+            groups.setdefault((stroke[4], -int(d)), []).append(i)
+        for key in sorted(groups):
+            group = groups[key]
+            starts = [strokes[i][0] for i in group]
+            ends = [strokes[i][1] for i in group]
+            reversible = [strokes[i][5] for i in group]
+            order, flipped = order_strokes(starts, ends, pos, reversible)
+            for i, f in zip(order.tolist(), flipped.tolist()):
+                result.append((n, group[i], f))
+            pos = tuple(starts[order[-1]] if flipped[-1] else ends[order[-1]])
+    return result
+
+
+def travel_length(starts, ends, order, flipped, pos=(0.0, 0.0)) -> float:
+    """Length of the moves between the strokes, starting at pos"""
+    starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+    if not len(order):
+        return 0.0
+    entry = np.where(flipped[:, None], ends[order], starts[order])
+    exit_ = np.where(flipped[:, None], starts[order], ends[order])
+    previous = np.vstack([np.asarray(pos, dtype=float)[None, :], exit_[:-1]])
+    return float(np.hypot(*(entry - previous).T).sum())
+
+
+def containment_depth(bboxes, closed):
+    """Number of closed strokes whose bounding box encloses the one of each stroke
+
+    :param bboxes: array of (xmin, ymin, xmax, ymax)
+    :param closed: bool array, only closed strokes can enclose others
+    """
+    bboxes = np.asarray(bboxes, dtype=float).reshape(-1, 4)
+    outer = bboxes[np.asarray(closed, dtype=bool)]
+    depth = np.zeros(len(bboxes), dtype=np.intp)
+    eps = 1e-4
+    for xmin, ymin, xmax, ymax in outer:
+        depth += ((bboxes[:, 0] > xmin + eps) & (bboxes[:, 1] > ymin + eps) &
+                  (bboxes[:, 2] < xmax - eps) & (bboxes[:, 3] < ymax - eps))
+    return depth
@@ -0,0 +1,177 @@
+"""Opt-in instrumentation of the rendering phases
+
+Set the environment variable BOXES_PROFILE=1 (or use boxes --profile) to
+record wall and CPU time of parseArgs, open, buildObjects, render, close,
+finish and faster_edges and to count calls to Surface.append,
+Surface.stroke, Boxes.saved_context and edges per phase.
+
+Methods are wrapped on the instances only, so nothing changes when
+profiling is off. Nested phases are included in the times of the outer
+phase. Calls are counted in the innermost running phase.
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any
+
+COUNTERS = ("append", "stroke", "saved_context", "edge")
+
+
+def profiling_enabled() -> bool:
+    return os.environ.get("BOXES_PROFILE", "0") not in ("", "0")
+
+
+def http_headers(profile: dict[str, dict[str, Any]]) -> list[tuple[str, str]]:
+    """Server-Timing and X-Boxes-Profile (JSON) headers for the result of Profiler.as_dict()"""
+    timing = ", ".join(
+        f'{name};dur={entry["wall"]*1000:.2f};desc="cpu {entry["cpu"]*1000:.2f}ms"'
+        for name, entry in profile.items())
+    return [("Server-Timing", timing),
+            ("X-Boxes-Profile", json.dumps(profile, separators=(",", ":")))]
+
+
+class Profiler:
+
+    def __init__(self) -> None:
+        self.phases: dict[str, dict[str, Any]] = {}
+        # (entry, (wall start, cpu start)) of the running phases
+        self._stack: list[tuple[dict[str, Any], tuple[float, float] | None]] = []
+        self._edge_classes: dict[type, type] = {}
+
+    def start(self, name: str) -> None:
+        entry = self.phases.get(name)
+        if entry is None:
+            entry = self.phases[name] = {"wall": 0.0, "cpu": 0.0}
+            entry.update((c, 0) for c in COUNTERS)
+        if any(e is entry for e, _ in self._stack):
+            # recursion, time is already taken by the outer call
+            self._stack.append((entry, None))
+        else:
+            self._stack.append((entry, (time.perf_counter(), time.process_time())))
+
+    def stop(self) -> None:
+        entry, start = self._stack.pop()
+        if start is not None:
+            wall, cpu = start
+            entry["wall"] += time.perf_counter() - wall
+            entry["cpu"] += time.process_time() - cpu
+
+    @contextmanager
+    def phase(self, name: str):
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop()
+
+    def count(self, counter: str) -> None:
+        if self._stack:
+            self._stack[-1][0][counter] += 1
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Copy of the results, running phases with their time so far"""
+        result = {name: dict(entry) for name, entry in self.phases.items()}
+        now_wall, now_cpu = time.perf_counter(), time.process_time()
+        names = {id(entry): name for name, entry in self.phases.items()}
+        for entry, start in self._stack:
+            if start is None:
+                continue
+            wall, cpu = start
+            r = result[names[id(entry)]]
+            r["wall"] += now_wall - wall
+            r["cpu"] += now_cpu - cpu
+        return result
+
+    def report(self) -> str:
+        lines = []
+        for name, entry in self.as_dict().items():
+            counts = " ".join(f"{c}={entry[c]}" for c in COUNTERS if entry[c])
+            lines.append(f"{name:14} wall {entry['wall']*1000:9.2f}ms "
+                         f"cpu {entry['cpu']*1000:9.2f}ms {counts}".rstrip())
+        return "\n".join(lines) + "\n"
+
+    ### wrappers
+
+    def timed(self, func, name: str):
+        @wraps(func)
+        def f(*args, **kw):
+            with self.phase(name):
+                return func(*args, **kw)
+        return f
+
+    def timed_iter(self, func, name: str):
+        """Wrap a generator function and time every step"""
+        @wraps(func)
+        def f(*args, **kw):
+            it = iter(func(*args, **kw))
+            while True:
+                with self.phase(name):
+                    try:
+                        item = next(it)
+                    except StopIteration:
+                        return
+                yield item
+        return f
+
+    def counted(self, func, counter: str):
+        @wraps(func)
+        def f(*args, **kw):
+            self.count(counter)
+            return func(*args, **kw)
+        return f
+
+    def _edge_class(self, cls: type) -> type:
+        """Subclass of an edge class counting its calls"""
+        sub = self._edge_classes.get(cls)
+        if sub is None:
+            profiler = self
+            def __call__(edge, *args, **kw):
+                profiler.count("edge")
+                return cls.__call__(edge, *args, **kw)
+            sub = self._edge_classes[cls] = type(
+                cls.__name__, (cls,),
+                {"__call__": __call__, "__module__": cls.__module__,
+                 "__qualname__": cls.__qualname__})
+        return sub
+
+    def instrument_surface(self, surface) -> None:
+        surface.append = self.counted(surface.append, "append")
+        surface.stroke = self.counted(surface.stroke, "stroke")
+        surface.faster_edges = self.timed(surface.faster_edges, "faster_edges")
+        surface.finish = self.timed(surface.finish, "finish")
+        if hasattr(surface, "stream"):
+            surface.stream = self.timed_iter(surface.stream, "finish")
+        surface.profiler = self
+
+    def instrument(self, box) -> None:
+        """Wrap the methods of a Boxes instance"""
+        from boxes import edges
+
+        box.parseArgs = self.timed(box.parseArgs, "parseArgs")
+        box.open = self.timed(box.open, "open")
+        box._buildObjects = self.timed(box._buildObjects, "buildObjects")
+        box.render = self.timed(box.render, "render")
+        box.close = self.timed(box.close, "close")
+        box.closeStream = self.timed(box.closeStream, "close")
+        box.saved_context = self.counted(box.saved_context, "saved_context")
+
+        addPart = box.addPart
+        @wraps(addPart)
+        def instrumented_addPart(part, name=None):
+            if (isinstance(part, edges.BaseEdge) and
+                part.__class__ not in self._edge_classes.values()):
+                part.__class__ = self._edge_class(part.__class__)
+            return addPart(part, name)
+        box.addPart = instrumented_addPart
+
+        getSurface = box.formats.getSurface
+        @wraps(getSurface)
+        def instrumented_getSurface(fmt):
+            surface, ctx = getSurface(fmt)
+            self.instrument_surface(surface)
+            return surface, ctx
+        box.formats.getSurface = instrumented_getSurface
@@ -5,6 +5,9 @@ from typing import Any, IO
 
 import qrcode.image.base
 import qrcode.image.svg
+from shapely.geometry import box
+from shapely.geometry.polygon import orient
+from shapely.ops import unary_union
 from typing_extensions import override
 
 
@@ -17,18 +20,53 @@ class BoxesQrCodeFactory(qrcode.image.base.BaseImage):
     kind = "SVG"
     allowed_kinds = ("SVG",)
 
+    # make_image() of newer qrcode versions calls process() which draws the
+    # modules, Boxes.qrcode() calls it for the older ones, too
+    needs_processing = True
+
     def __init__(self, *args, ctx=None, x: float = 0, y: float = 0, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         self.ctx = ctx
         self.x, self.y = x, y
         # Save the unit size, for example the default box_size of 10 is '1mm'.
         self.unit_size = self.units(self.box_size)
+        self._modules: list[tuple[int, int]] = []
+        self._drawn = False
 
     @override
-    def drawrect(self, row: float, col: float) -> None:
-        self.ctx.rectangle(*self._rect(row, col))
+    def drawrect(self, row: int, col: int) -> None:
+        self._modules.append((row, col))
         self._img.append(self._rect(row, col))
 
+    @override
+    def process(self) -> None:
+        """Draw the dark modules as outlines of the areas they cover
+
+        Each area becomes one closed path with its holes as additional
+        sub paths turning the other way. This covers exactly the same
+        modules as drawing every module on its own.
+        """
+        if self.ctx is None or self._drawn:
+            return
+        self._drawn = True
+        # merge into runs along the columns first, keeps the union cheap
+        runs: list[list[int]] = []
+        for row, col in sorted(self._modules):
+            if runs and runs[-1][0] == row and runs[-1][2] == col:
+                runs[-1][2] = col + 1
+            else:
+                runs.append([row, col, col + 1])
+        areas = unary_union([box(row, c0, row + 1, c1) for row, c0, c1 in runs])
+        for area in getattr(areas, "geoms", [areas]):
+            area = orient(area.simplify(0))
+            self.ctx.stroke()
+            for ring in (area.exterior, *area.interiors):
+                points = [self._point(row, col) for row, col in ring.coords]
+                self.ctx.move_to(*points[0])
+                for point in points[1:]:
+                    self.ctx.line_to(*point)
+            self.ctx.stroke()
+
     @override
     def save(self, stream: IO[bytes], kind: str | None = None) -> None:
         self.check_kind(kind=kind)
@@ -52,10 +90,14 @@ class BoxesQrCodeFactory(qrcode.image.base.BaseImage):
         return f"".join(self._img)
 
     def _rect(self, row: float, col: float) -> tuple[float, float, float, float]:
+        size = self.box_size / 10
+        return (*self._point(row, col), size, size)
+
+    def _point(self, row: float, col: float) -> tuple[float, float]:
         size = self.box_size / 10
         x = self.x + (row + self.border) * size
         y = self.y + (col + self.border) * size
-        return x, y, size, size
+        return x, y
 
     def _write(self, stream) -> None:
         stream.write("".join(self._img))
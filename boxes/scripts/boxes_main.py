@@ -6,6 +6,7 @@ Generate stencils for wooden boxes.
 """
 from __future__ import annotations
 
+import concurrent.futures
 import gettext
 import os
 import sys
@@ -13,6 +14,8 @@ import copy
 import argparse
 import logging
 import hashlib
+import time
+import traceback
 from pathlib import Path
 from typing import TextIO
 try:
@@ -23,6 +26,7 @@ except ImportError:
 
 import boxes.generators
 import boxes.svgmerge
+from boxes.manifest import BuildManifest
 
 import yaml
 
@@ -51,7 +55,14 @@ def print_grouped_generators() -> None:
             description = description.replace("\n", "").replace("\r", "").strip()
             print(f' *  {box.__name__:<15} - {ConsoleColors.ITALIC}{description}{ConsoleColors.CLEAR}')
 
-def multi_generate(config_path : Path|str|TextIO, output_path : Path|str, output_name_formater=None, format="svg") -> list[str]:
+def multi_generate(config_path : Path|str|TextIO, output_path : Path|str, output_name_formater=None, format="svg", jobs=1, errors: list|None=None, incremental=False) -> list[str]:
+    """
+    Render all boxes of a configuration YAML
+
+    :param jobs: number of processes to render in, 0 for one per CPU
+    :param incremental: skip boxes whose code, settings and output files are unchanged since the last incremental run (see boxes.manifest)
+    :param errors: list to collect (box index, generator name, traceback) of failed boxes into
+    """
     if isinstance(config_path, str) or isinstance(config_path, Path):
         with open(config_path) as ff:
             config_data = yaml.safe_load(ff)
@@ -61,8 +72,8 @@ def multi_generate(config_path : Path|str|TextIO, output_path : Path|str, output
     all_generators = boxes.generators.getAllBoxGenerators()
     generators_by_name = {b.__name__: b for b in all_generators.values()}
 
-    generated_files = []
     defaults = config_data.get("Defaults", {})
+    tasks = []
 
     for ii, box_settings in enumerate(config_data.get("Boxes", [])):
         # Allow for skipping generation
@@ -77,9 +88,10 @@ def multi_generate(config_path : Path|str|TextIO, output_path : Path|str, output
         # __ALL__ is a special case
         box_classes: tuple|None = None
         if box_type != "__ALL__":
-            box_classes = ( generators_by_name.get(box_type, None), )
-            if box_classes is None:
+            box_cls = generators_by_name.get(box_type, None)
+            if box_cls is None:
                 raise ValueError("invalid generator '%s'" % box_type)
+            box_classes = (box_cls, )
         else:
             skipGenerators = set(box_settings.get("skipGenerators", []))
             brokenGenerators = set(box_settings.get("brokenGenerators", []))
@@ -87,115 +99,188 @@ def multi_generate(config_path : Path|str|TextIO, output_path : Path|str, output
             box_classes = tuple(filter(lambda x: x.__name__ not in avoidGenerators, all_generators.values()))
 
         for box_cls in box_classes:
-            box_cls_name = box_cls.__name__
-
-            # Instantitate the box object
-            box = box_cls()
-            box.translations = get_translation()
-
-            # Create the settings for the generator
-            settings = copy.deepcopy(defaults)
-            settings.update(box_settings.get("args", {}))
-
-            # Handle layout separately
-            if hasattr(box, "layout") and "layout" in settings:
-                if os.path.exists(settings["layout"]):
-                    with open(settings["layout"]) as ff:
-                        settings["layout"] = ff.read()
-                else:
-                    box.layout = settings["layout"]
-
-            # Turn the settings into arguments, but ignore format
-            # in the YAML file if provided and use the argument to the function
-            box_args = []
-            for kk, vv in settings.items():
-                # Handle format separately
-                if kk in ("format","layout"):
-                    continue
-                box_args.append(f"--{kk}={vv}")
-
-            # Layout has three options:
-            #  - provided verbatim in the YAML file
-            #  - provided as a path to a file in the YAML file
-            #  - using the special placeholder __GENERATE__ which will invoke the default
-            if "layout" in settings:
-                if os.path.exists(settings["layout"]):
-                    with open(settings["layout"]) as ff:
-                        layout = ff.read()
-                else:
-                    layout = settings["layout"]
-                box_args.append(f"--layout={layout}")
-
-            # SVG is default, only apply argument if changing default
-            if format != "svg":
-                box_args.append(f"--format={format}")
-
-            # Parse the box arguments - because we allow arguments at the
-            # top-level defaults, we ignore unknown arguments
-            try:
-                # Ignore unknown arguments by pre-parsing. This two stage
-                # approach was performed to avoid modifying parseArgs and
-                # changing it's behavior.  A long-term better solution
-                # might be to allow parseArgs to take a 'strict' argument
-                # the can enable/disable strict parsing of arguments
-                args, argv = box.argparser.parse_known_args(box_args)
-                if len(argv) > 0:
-                    for unknown_arg in argv:
-                        box_args.remove(unknown_arg)
-                box.parseArgs(box_args)
-            except ArgumentParserError:
-                print("Error parsing box args for box %s : %s", ii, box_cls_name)
+            tasks.append((box_cls, ii, box_settings, defaults, output_path, output_name_formater, format))
+
+    # boxes unchanged since the last incremental run
+    build_manifest = BuildManifest(output_path) if incremental else None
+    digests: dict[int, str] = {}
+    unchanged: dict[int, list[str]] = {}
+    if build_manifest is not None:
+        for nr, (box_cls, ii, box_settings, defaults, _, output_name_formater, format) in enumerate(tasks):
+            digests[nr] = digest = build_manifest.digest(
+                box_cls, ii, box_settings, defaults, output_name_formater, format)
+            files = build_manifest.outputs(digest)
+            if files is not None:
+                unchanged[nr] = files
+    pending = [task for nr, task in enumerate(tasks) if nr not in unchanged]
+
+    if jobs == 1 or len(pending) < 2:
+        rendered = (_multi_generate_box(*task) for task in pending)
+        executor = None
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(jobs or None)
+        futures = [executor.submit(_multi_generate_box, *task) for task in pending]
+        rendered = (_future_result(future, task) for future, task in zip(futures, pending))
+
+    generated_files = []
+    failed = 0
+    try:
+        # in order of the configuration, not of completion
+        for nr, task in enumerate(tasks):
+            if nr in unchanged:
+                box_cls_name, ii = task[0].__name__, task[1]
+                print(f"Unchanged box {ii} : {box_cls_name}")
+                generated_files.extend(unchanged[nr])
                 continue
+            box_cls_name, ii, files, duration, error, skipped = next(rendered)
+            for output_file in files:
+                print(f"Writing {output_file}")
+            generated_files.extend(files)
+            if error:
+                failed += 1
+                sys.stderr.write(f"Error in box {ii} : {box_cls_name}\n{error}\n")
+                if errors is not None:
+                    errors.append((ii, box_cls_name, error))
+            elif skipped:
+                print(f"{skipped} for box {ii} : {box_cls_name}")
+            else:
+                print(f"Rendered box {ii} : {box_cls_name} in {duration:.2f}s")
+                if build_manifest is not None:
+                    build_manifest.record(digests[nr], box_cls_name, files)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if build_manifest is not None:
+            build_manifest.save()
+
+    if failed:
+        sys.stderr.write(f"{failed} of {len(tasks)} boxes failed\n")
+    return generated_files
+
 
-            # handle __GENERATE__ which must be called after parseArgs
-            if getattr(box, "layout", None) == "__GENERATE__":
-                if hasattr(box, "generate_layout") and callable(box.generate_layout):
-                    box.layout = box.generate_layout()
-                else:
-                    print("Error box %s : %s requires manual layout", ii, box_cls_name)
-                    continue
-
-            box.metadata["reproducible"] = True
-
-            # Render the box SVG
-            box.open()
-            box.render()
-            data = box.close()
-
-            if callable(output_name_formater):
-                output_fname = output_name_formater(
-                    box_type=box_cls_name,
-                    name=box_settings.get("name", box_cls_name),
-                    box_idx=ii,
-                    metadata=box.metadata,
-                    box_args=box_args
-                )
+def _future_result(future, task):
+    try:
+        return future.result()
+    except Exception:
+        # the worker process died
+        return task[0].__name__, task[1], [], 0.0, traceback.format_exc(), None
+
+
+def _multi_generate_box(box_cls, ii, box_settings, defaults, output_path, output_name_formater, format):
+    """Render one box of multi_generate
+
+    Returns (generator name, box index, written files, seconds, traceback or None,
+    reason for skipping the box or None)
+    """
+    start = time.perf_counter()
+    box_cls_name = box_cls.__name__
+    generated_files: list[str] = []
+    try:
+        # Instantitate the box object
+        box = box_cls()
+        box.translations = get_translation()
+
+        # Create the settings for the generator
+        settings = copy.deepcopy(defaults)
+        settings.update(box_settings.get("args", {}))
+
+        # Handle layout separately
+        if hasattr(box, "layout") and "layout" in settings:
+            if os.path.exists(settings["layout"]):
+                with open(settings["layout"]) as ff:
+                    settings["layout"] = ff.read()
             else:
-                output_fname = output_name_formater.format(
-                    box_type=box_cls_name,
-                    name=box_settings.get("name", box_cls_name),
-                    box_idx=ii,
-                    metadata=box.metadata,
-                )
-
-            # Write the output - if count is provided generate multiple copies
-            if box_settings.get("count") is not None:
-                for jj in range(int(box_settings.get("count"))):
-                    output_file = os.path.join(output_path, f"{output_fname}_{jj}.{format}")
-                    print(f"Writing {output_file}")
-                    with open(output_file, "wb") as ff:
-                        ff.write(data.read())
-                        data.seek(0)
-                    generated_files.append(output_file)
+                box.layout = settings["layout"]
+
+        # Turn the settings into arguments, but ignore format
+        # in the YAML file if provided and use the argument to the function
+        box_args = []
+        for kk, vv in settings.items():
+            # Handle format separately
+            if kk in ("format","layout"):
+                continue
+            box_args.append(f"--{kk}={vv}")
+
+        # Layout has three options:
+        #  - provided verbatim in the YAML file
+        #  - provided as a path to a file in the YAML file
+        #  - using the special placeholder __GENERATE__ which will invoke the default
+        if "layout" in settings:
+            if os.path.exists(settings["layout"]):
+                with open(settings["layout"]) as ff:
+                    layout = ff.read()
+            else:
+                layout = settings["layout"]
+            box_args.append(f"--layout={layout}")
+
+        # SVG is default, only apply argument if changing default
+        if format != "svg":
+            box_args.append(f"--format={format}")
 
+        # Parse the box arguments - because we allow arguments at the
+        # top-level defaults, we ignore unknown arguments
+        try:
+            # Ignore unknown arguments by pre-parsing. This two stage
+            # approach was performed to avoid modifying parseArgs and
+            # changing it's behavior.  A long-term better solution
+            # might be to allow parseArgs to take a 'strict' argument
+            # the can enable/disable strict parsing of arguments
+            args, argv = box.argparser.parse_known_args(box_args)
+            if len(argv) > 0:
+                for unknown_arg in argv:
+                    box_args.remove(unknown_arg)
+            box.parseArgs(box_args)
+        except (ArgumentParserError, SystemExit):
+            return box_cls_name, ii, [], time.perf_counter() - start, None, "Error parsing box args"
+
+        # handle __GENERATE__ which must be called after parseArgs
+        if getattr(box, "layout", None) == "__GENERATE__":
+            if hasattr(box, "generate_layout") and callable(box.generate_layout):
+                box.layout = box.generate_layout()
             else:
-                output_file = os.path.join(output_path, f"{output_fname}.{format}")
-                print(f"Writing {output_file}")
+                return box_cls_name, ii, [], time.perf_counter() - start, None, "requires manual layout"
+
+        box.metadata["reproducible"] = True
+
+        # Render the box SVG
+        box.open()
+        box.render()
+        data = box.close()
+
+        if callable(output_name_formater):
+            output_fname = output_name_formater(
+                box_type=box_cls_name,
+                name=box_settings.get("name", box_cls_name),
+                box_idx=ii,
+                metadata=box.metadata,
+                box_args=box_args
+            )
+        else:
+            output_fname = output_name_formater.format(
+                box_type=box_cls_name,
+                name=box_settings.get("name", box_cls_name),
+                box_idx=ii,
+                metadata=box.metadata,
+            )
+
+        # Write the output - if count is provided generate multiple copies
+        if box_settings.get("count") is not None:
+            for jj in range(int(box_settings.get("count"))):
+                output_file = os.path.join(output_path, f"{output_fname}_{jj}.{format}")
                 with open(output_file, "wb") as ff:
                     ff.write(data.read())
+                    data.seek(0)
                 generated_files.append(output_file)
 
-    return generated_files
+        else:
+            output_file = os.path.join(output_path, f"{output_fname}.{format}")
+            with open(output_file, "wb") as ff:
+                ff.write(data.read())
+            generated_files.append(output_file)
+    except Exception:
+        return box_cls_name, ii, generated_files, time.perf_counter() - start, traceback.format_exc(), None
+
+    return box_cls_name, ii, generated_files, time.perf_counter() - start, None, None
 
 def get_translation():
     try:
@@ -205,11 +290,10 @@ def get_translation():
 
 
 def run_generator(name: str, args) -> None:
-    generators = generators_by_name()
-    lower_name = name.lower()
+    generator = boxes.generators.getBoxGenerator(name)
 
-    if lower_name in generators.keys():
-        box = generators[lower_name]()
+    if generator is not None:
+        box = generator()
         box.translations = get_translation()
         box.parseArgs(args)
         box.open()
@@ -217,6 +301,12 @@ def run_generator(name: str, args) -> None:
         data = box.close()
         with os.fdopen(sys.stdout.fileno(), "wb", closefd=False) if box.output == "-" else open(box.output, 'wb') as f:
             f.write(data.getvalue())
+        if box.profiler is not None:
+            sys.stderr.write(box.profiler.report())
+        if getattr(box, "travel_lengths", None):
+            before, after = box.travel_lengths
+            sys.stderr.write(f"Travel length: {after:.1f}mm (was {before:.1f}mm, "
+                             f"saved {before - after:.1f}mm)\n")
     else:
         msg = f"Unknown generator '{name}'. Use boxes --list to get a list of available commands.\n"
         sys.stderr.write(msg)
@@ -270,15 +360,22 @@ def main() -> None:
     parser.add_argument("--examples", action="store_true", default=False, help='Generates an SVG for every generator into the "examples" folder.')
     parser.add_argument("--help", action="store_true", default=False)
     parser.add_argument("--multi-generator", type=argparse.FileType('r', encoding='UTF-8'), help="Generate multiple boxes from a configuration YAML")
+    parser.add_argument("--jobs", type=int, default=1, help="number of processes for --examples and --multi-generator (0 for one per CPU)")
+    parser.add_argument("--incremental", action="store_true", default=False, help="with --examples and --multi-generator only render boxes that changed since the last run (keeps a manifest in the output folder)")
     parser.add_argument("--merge", action="store_true", default=False, help="Merge multiple SVG files into optimal cuts for a given panel size")
+    parser.add_argument("--profile", action="store_true", default=False, help="Print time and call counts of the rendering phases to stderr (same as setting BOXES_PROFILE=1)")
+    parser.add_argument("--benchmark", action="store_true", default=False, help="Time rendering of all generators and write the results as JSON. See boxes --benchmark --help")
     args, extra = parser.parse_known_args()
-    if args.generator and (args.examples or args.multi_generator or args.list):
+    if args.generator and (args.examples or args.multi_generator or args.list or args.benchmark):
         parser.error("cannot combine --generator with other commands")
 
     # if debug is True set logging level
     if args.debug:
         logging.getLogger().setLevel(logging.DEBUG)
 
+    if args.profile:
+        os.environ["BOXES_PROFILE"] = "1"
+
     # Handle various actions
     if args.version:
         print_version()
@@ -288,7 +385,11 @@ def main() -> None:
         print("Generating SVG examples for every possible generator.")
         config_path = Path(__file__).parent.parent.parent / 'examples.yml'
         output_path = Path("examples")
-        multi_generate(config_path, output_path, example_output_fname_formatter)
+        errors: list = []
+        multi_generate(config_path, output_path, example_output_fname_formatter,
+                       jobs=args.jobs, errors=errors, incremental=args.incremental)
+        if errors:
+            sys.exit(1)
     elif args.multi_generator:
         try:
             if os.path.isdir(extra[0]):
@@ -310,11 +411,20 @@ def main() -> None:
             # No template has been provided, use defaults
             output_path = Path(".")
             output_fname_format = "{name}_{box_idx}"
-        multi_generate(args.multi_generator, output_path, output_fname_format)
+        errors = []
+        multi_generate(args.multi_generator, output_path, output_fname_format,
+                       jobs=args.jobs, errors=errors, incremental=args.incremental)
+        if errors:
+            sys.exit(1)
+    elif args.benchmark:
+        if args.help:
+            extra.append("--help")
+        from boxes import benchmark
+        benchmark.main(extra)
     elif args.merge:
         merger = boxes.svgmerge.SvgMerge()
         merger.parseArgs(extra)
-        merger.render(extra)
+        merger.render(merger.cuts)
         data = merger.close()
         with os.fdopen(sys.stdout.fileno(), "wb", closefd=False) if merger.output == "-" else open(merger.output, 'wb') as f:
             f.write(data.getvalue())
@@ -18,18 +18,27 @@ from __future__ import annotations
 import argparse
 import gettext
 import glob
+import hashlib
 import html
 import io
+import itertools
 import mimetypes
+import multiprocessing
 import os.path
 import re
+import signal
+import socketserver
 import sys
 import threading
 import time
 import traceback
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.context import BaseContext
 from typing import Any, NoReturn
 from urllib.parse import quote, unquote_plus
-from wsgiref.simple_server import make_server
+from wsgiref.simple_server import WSGIServer, make_server
 
 import markdown
 import qrcode
@@ -40,6 +49,7 @@ except ImportError:
     sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), "../.."))
     import boxes.generators
 import boxes
+import boxes.profiler
 
 
 class FileChecker(threading.Thread):
@@ -82,6 +92,161 @@ class FileChecker(threading.Thread):
         self._stopped = True
 
 
+class RenderCache:
+    """LRU cache for rendered output
+
+    Entries are keyed by generator name, the normalized non default
+    arguments, the output format and the language. The memory tier is
+    bounded by the total size of the cached data in bytes. If a directory
+    is given, entries are also written to disk and looked up there on a
+    memory miss. Disk entries include a fingerprint of the loaded boxes
+    modules so they are not reused after the code changed.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, directory: str | None = None,
+                 max_disk_bytes: int = 1024 * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.size = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self._fingerprint = self._codeFingerprint()
+        self._disk_size = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._disk_size = sum(os.path.getsize(p) for p in self._diskFiles())
+
+    @staticmethod
+    def _codeFingerprint() -> str:
+        h = hashlib.sha256()
+        for name, module in sorted(sys.modules.items()):
+            path = getattr(module, "__file__", None)
+            if not path or not (name == "boxes" or name.startswith("boxes.")):
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            h.update(f"{name}:{st.st_mtime_ns}:{st.st_size}\n".encode())
+        return h.hexdigest()
+
+    @staticmethod
+    def key(name: str, non_default_args: dict, format: str, language: str | None,
+            url: str = "") -> tuple:
+        """Key of a rendered box
+
+        The url of the request is part of the output (in the metadata and
+        possibly as QR code) and therefore also of the key.
+        """
+        args = tuple(sorted((k, repr(v)) for k, v in non_default_args.items()
+                            if k not in ("format", "output")))
+        return (name, args, format, language, url)
+
+    def _diskPath(self, key: tuple) -> str:
+        assert self.directory
+        digest = hashlib.sha256(repr((self._fingerprint, key)).encode()).hexdigest()
+        return os.path.join(self.directory, digest + ".cache")
+
+    def _diskFiles(self) -> list[str]:
+        assert self.directory
+        return glob.glob(os.path.join(self.directory, "*.cache"))
+
+    def get(self, key: tuple) -> bytes | None:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+        if self.directory:
+            try:
+                path = self._diskPath(key)
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.utime(path)
+            except OSError:
+                data = None
+            if data is not None:
+                self._store(key, data)
+                with self._lock:
+                    self.disk_hits += 1
+                return data
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: tuple, data: bytes) -> None:
+        self._store(key, data)
+        if self.directory:
+            self._writeDisk(key, data)
+
+    def _store(self, key: tuple, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def _writeDisk(self, key: tuple, data: bytes) -> None:
+        path = self._diskPath(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        with self._lock:
+            self._disk_size += len(data)
+            if self._disk_size <= self.max_disk_bytes:
+                return
+            files = []
+            for p in self._diskFiles():
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, p))
+            files.sort()
+            self._disk_size = sum(f[1] for f in files)
+            for mtime, size, p in files:
+                if self._disk_size <= self.max_disk_bytes:
+                    break
+                try:
+                    os.unlink(p)
+                except OSError:
+                    continue
+                self._disk_size -= size
+
+    def tee(self, key, chunks):
+        """Pass chunks through and store them once all have been consumed"""
+        result = []
+        for chunk in chunks:
+            result.append(chunk)
+            yield chunk
+        self.put(key, b"".join(result))
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
+
+
 def filter_url(url, non_default_args):
     if len(url) == 0:
         return ''
@@ -116,10 +281,128 @@ class ThrowingArgumentParser(argparse.ArgumentParser):
 boxes.ArgumentParser = ThrowingArgumentParser  # type: ignore
 
 
+class RenderTimeoutError(ValueError): pass
+
+
+class RenderPoolFullError(Exception): pass
+
+
+_worker_generators: dict[str, type[boxes.Boxes]] = {}
+
+
+def _cpu_limit_exceeded(signum, frame) -> NoReturn:
+    raise RenderTimeoutError("Rendering took too long. Try a smaller design or fewer holes.")
+
+
+def _init_render_worker() -> None:
+    """Runs once in every worker process of the RenderPool"""
+    if hasattr(signal, "setitimer"):
+        signal.signal(signal.SIGPROF, _cpu_limit_exceeded)
+    # let the server process handle Ctrl-C
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _render_in_worker(name, args, language, url, url_short, cpu_limit) -> tuple[bytes, dict | None]:
+    generator = _worker_generators.get(name)
+    if generator is None:
+        # only imports the module of the generator if not forked from the server
+        generator = boxes.generators.getBoxGenerator(name)
+        if generator is None:
+            raise ValueError(f"Unknown generator: {name}")
+        generator.UI = "web"
+        _worker_generators[name] = generator
+    box = generator()
+    if language:
+        try:
+            box.translations = gettext.translation('boxes.py', localedir='locale', languages=[language])
+        except OSError:
+            box.translations = gettext.translation('boxes.py', languages=[language], fallback=True)
+    box.parseArgs(args)
+    box.metadata["url"] = url
+    box.metadata["url_short"] = url_short
+    limit = cpu_limit and hasattr(signal, "setitimer")
+    if limit:
+        signal.setitimer(signal.ITIMER_PROF, cpu_limit)
+    try:
+        box.open()
+        box.render()
+        data = box.close()
+    finally:
+        if limit:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+    return data.getvalue(), box.getProfile()
+
+
+class RenderPool:
+    """Pool of pre-forked processes rendering boxes
+
+    Generators are looked up once per worker. Each render is limited
+    to cpu_limit seconds of CPU time (where supported by the OS). At most
+    workers + max_queue renders are accepted at the same time, further
+    requests raise RenderPoolFullError.
+    """
+
+    def __init__(self, workers: int, max_queue: int | None = None, cpu_limit: float = 60.0) -> None:
+        self.workers = workers
+        self.max_queue = workers * 2 if max_queue is None else max_queue
+        self.cpu_limit = cpu_limit
+        self.pending = 0
+        self._lock = threading.Lock()
+        self._mp_context: BaseContext
+        try:
+            self._mp_context = multiprocessing.get_context("fork")
+        except ValueError:
+            self._mp_context = multiprocessing.get_context()
+        self._executor = self._newExecutor()
+
+    def _newExecutor(self) -> ProcessPoolExecutor:
+        executor = ProcessPoolExecutor(self.workers, mp_context=self._mp_context,
+                                       initializer=_init_render_worker)
+        # start all workers now instead of on first demand
+        for f in [executor.submit(os.getpid) for _ in range(self.workers)]:
+            f.result()
+        return executor
+
+    def _done(self, future) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    def render(self, name: str, args: list[str], language: str | None, url: str, url_short: str) -> tuple[bytes, dict | None]:
+        """Rendered output and the profile (if enabled) of the box"""
+        with self._lock:
+            if self.pending >= self.workers + self.max_queue:
+                raise RenderPoolFullError("Server is busy. Please try again later.")
+            self.pending += 1
+            executor = self._executor
+        try:
+            future = executor.submit(_render_in_worker, name, args, language,
+                                     url, url_short, self.cpu_limit)
+        except BaseException:
+            self._done(None)
+            raise
+        future.add_done_callback(self._done)
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            # a worker died (e.g. killed for using too much memory) - start over
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = self._newExecutor()
+            executor.shutdown(wait=False)
+            raise
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ThreadingWSGIServer(socketserver.ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
 class BServer:
     lang_re = re.compile(r"([a-z]{2,3}(-[-a-zA-Z0-9]*)?)\s*(;\s*q=(\d\.?\d*))?")
 
-    def __init__(self, url_prefix="", static_url="static", static_path="../static/", legal_url="") -> None:
+    def __init__(self, url_prefix="", static_url="static", static_path="../static/", legal_url="", render_cache: RenderCache | None = None, render_pool: RenderPool | None = None) -> None:
         self.boxes = {b.__name__: b for b in boxes.generators.getAllBoxGenerators().values() if b.webinterface}
         self.groups = boxes.generators.ui_groups
         self.groups_by_name = boxes.generators.ui_groups_by_name
@@ -140,6 +423,8 @@ class BServer:
         self.url_prefix = url_prefix
         self.static_url = static_url
         self.legal_url = legal_url
+        self.render_cache = render_cache
+        self.render_pool = render_pool
 
     def getLanguages(self, domain=None, localedir=None):
         if self._languages is not None:
@@ -683,13 +968,51 @@ class BServer:
                 start_response(status, headers)
                 return self.genPageError(name, e, lang)
 
+        cache_key = None
+        cached = None
+        profile = None
         try:
             box.metadata["url"] = self.getURL(environ)
             box.metadata["url_short"] = filter_url(box.metadata["url"],
                                                    box.non_default_args)
-            box.open()
-            box.render()
-            data = box.close()
+            # profiled output contains the timings of its own render
+            if (self.render_cache is not None and render != "3" and
+                    not boxes.profiler.profiling_enabled()):
+                cache_key = self.render_cache.key(
+                    name, box.non_default_args, box.format,
+                    lang.info().get('language', None), box.metadata["url"])
+                cached = self.render_cache.get(cache_key)
+            if cached is not None:
+                data = io.BytesIO(cached)
+            elif self.render_pool is not None and render != "3":
+                data, profile = self.render_pool.render(
+                    name, args, lang.info().get('language', None),
+                    box.metadata["url"], box.metadata["url_short"])
+                data = io.BytesIO(data)
+            else:
+                box.open()
+                box.render()
+                if box.profiler is not None:
+                    # the profile headers need the finished output
+                    data = box.close()
+                    profile = box.getProfile()
+                else:
+                    data = None
+                    chunks = box.closeStream()
+                    # serialize the header now to catch errors early
+                    first = next(chunks, b"")
+            if data is None:
+                chunks = itertools.chain((first,), chunks)
+                if cache_key is not None:
+                    chunks = self.render_cache.tee(cache_key, chunks)
+            elif cache_key is not None and cached is None:
+                self.render_cache.put(cache_key, data.getvalue())
+        except RenderPoolFullError as e:
+            start_response("503 Service Unavailable", headers + [('Retry-After', '5')])
+            return self.genPageError(name, e, lang)
+        except RenderTimeoutError as e:
+            start_response("503 Service Unavailable", headers)
+            return self.genPageError(name, e, lang)
         except Exception as e:
             if not isinstance(e, ValueError):
                 print("Exception during rendering:")
@@ -704,6 +1027,10 @@ class BServer:
         http_headers = box.formats.http_headers.get(box.format, [('Content-type', 'application/unknown; charset=utf-8')])[:]
         # Prevent crawlers.
         http_headers.append(('X-Robots-Tag', 'noindex,nofollow'))
+        if cache_key is not None:
+            http_headers.append(('X-Boxes-Cache', "hit" if cached is not None else "miss"))
+        if profile:
+            http_headers.extend(boxes.profiler.http_headers(profile))
 
         if render == "3":
             http_headers = [('Content-type', 'image/png')]
@@ -720,8 +1047,26 @@ class BServer:
                 extension = "svg"
             http_headers.append(('Content-Disposition', f'attachment; filename="{box.__class__.__name__}.{extension}"'))
         start_response(status, http_headers)
+        if data is None:
+            return self.streamChunks(chunks, start_response, http_headers)
         return environ['wsgi.file_wrapper'](data, 512 * 1024)
 
+    def streamChunks(self, chunks, start_response, headers):
+        """Pass on the output of a render that is still being serialized
+
+        The status has already been sent when serialization fails.
+        The error is passed to start_response() as exc_info which
+        raises it again so the server aborts the response instead of
+        ending it like a complete one.
+        """
+        try:
+            yield from chunks
+        except Exception:
+            print("Exception during rendering:")
+            traceback.print_exc()
+            start_response("500 Internal Server Error", headers, sys.exc_info())
+            raise
+
 
 def get_qrcode(url, format):
     if url is None:
@@ -745,21 +1090,50 @@ def main() -> None:
                         help="location of static content on disk")
     parser.add_argument("--legal_url", default="",
                         help="URL of legal web page")
+    parser.add_argument("--cache_size", type=float, default=64,
+                        help="size of the in memory cache for rendered output in MB (zero to disable)")
+    parser.add_argument("--cache_dir", default="",
+                        help="directory for caching rendered output on disk")
+    parser.add_argument("--cache_dir_size", type=float, default=1024,
+                        help="maximum size of the on disk cache in MB")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="number of worker processes for rendering (zero to render in the server process)")
+    parser.add_argument("--max_queue", type=int, default=None,
+                        help="number of renders waiting for a worker before answering 503 (default: twice the number of workers)")
+    parser.add_argument("--cpu_limit", type=float, default=60.0,
+                        help="maximum CPU time per render in seconds when using workers (zero for no limit)")
     args = parser.parse_args()
 
+    render_cache = None
+    if args.cache_size > 0 or args.cache_dir:
+        render_cache = RenderCache(int(args.cache_size * 1024 * 1024),
+                                   args.cache_dir or None,
+                                   int(args.cache_dir_size * 1024 * 1024))
+
     boxserver = BServer(url_prefix=args.url_prefix, static_url=args.static_url,
-                        static_path=args.static_path)
+                        static_path=args.static_path, render_cache=render_cache)
+
+    if args.workers > 0:
+        # fork the workers before starting any threads
+        boxserver.render_pool = RenderPool(args.workers, args.max_queue, args.cpu_limit)
 
     fc = FileChecker()
     fc.start()
 
-    httpd = make_server(args.host, args.port, boxserver.serve)
+    httpd: WSGIServer
+    if args.workers > 0:
+        httpd = make_server(args.host, args.port, boxserver.serve,
+                            server_class=ThreadingWSGIServer)
+    else:
+        httpd = make_server(args.host, args.port, boxserver.serve)
     print(f"BoxesServer serving on http://{args.host or '*'}:{args.port}/...")
     try:
         httpd.serve_forever()
     except KeyboardInterrupt:
         fc.stop()
     httpd.server_close()
+    if boxserver.render_pool is not None:
+        boxserver.render_pool.shutdown()
     print("BoxesServer stops.")
 
 
@@ -767,5 +1141,10 @@ if __name__ == "__main__":
     main()
 else:
     static_url = os.environ.get('STATIC_URL', 'https://florianfesti.github.io/boxes/static')
-    boxserver = BServer(static_url=static_url)
+    cache_size = float(os.environ.get('BOXES_CACHE_SIZE', '64'))
+    cache_dir = os.environ.get('BOXES_CACHE_DIR', '')
+    render_cache = None
+    if cache_size > 0 or cache_dir:
+        render_cache = RenderCache(int(cache_size * 1024 * 1024), cache_dir or None)
+    boxserver = BServer(static_url=static_url, render_cache=render_cache)
     application = boxserver.serve
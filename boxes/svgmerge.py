@@ -5,13 +5,103 @@ import io
 import re
 
 import xml.etree.ElementTree as ET
+import numpy as np
 import rectpack
+import shapely
 from rectpack import newPacker, PackingBin
-from svgpathtools import parse_path
+from svgpathtools import Line, parse_path
+
+from boxes.nesting import ShapeNester, filled
 
 SVG_NS = "http://www.w3.org/2000/svg"
 ET.register_namespace("", SVG_NS)
 
+# line segments per curve when converting pathes to outlines
+CURVE_STEPS = 8
+_T = np.linspace(0.0, 1.0, CURVE_STEPS + 1)[1:, None]
+_PATH_TOKENS = re.compile(r"([MmLlHhVvCcZz])|([AaQqSsTt])|([-+]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?)")
+
+
+def path_polylines(d):
+    """
+    Points of the sub paths of an SVG path as list of (points, closed).
+    Curves are replaced by CURVE_STEPS lines.
+    """
+    tokens = _PATH_TOKENS.findall(d)
+    if any(t[1] for t in tokens):
+        # arcs and quadratic curves are left to svgpathtools
+        result = []
+        for sub in parse_path(d).continuous_subpaths():
+            points = [(sub.start.real, sub.start.imag)]
+            for seg in sub:
+                ts = [1.0] if isinstance(seg, Line) else _T[:, 0]
+                points.extend((p.real, p.imag) for p in (seg.point(t) for t in ts))
+            result.append((points, sub.isclosed()))
+        return result
+
+    result = []
+    points = []
+    x = y = x0 = y0 = 0.0
+
+    def finish(closed):
+        if len(points) > 1:
+            result.append((points, closed))
+
+    cmd = None
+    args = []
+    # the last command is run when the final M is reached
+    for c, _, number in tokens + [("M", "", "")]:
+        if number:
+            args.append(float(number))
+            continue
+        if cmd is None:
+            pass
+        elif cmd in "Mm":
+            for i in range(0, len(args) - 1, 2):
+                dx, dy = (x, y) if cmd == "m" else (0.0, 0.0)
+                x, y = args[i] + dx, args[i + 1] + dy
+                if i == 0:
+                    finish(False)
+                    points = [(x, y)]
+                    x0, y0 = x, y
+                else:
+                    points.append((x, y))
+        elif cmd in "Ll":
+            for i in range(0, len(args) - 1, 2):
+                x, y = (args[i] + x, args[i + 1] + y) if cmd == "l" else (args[i], args[i + 1])
+                points.append((x, y))
+        elif cmd in "HhVv":
+            for v in args:
+                if cmd == "H":
+                    x = v
+                elif cmd == "h":
+                    x += v
+                elif cmd == "V":
+                    y = v
+                else:
+                    y += v
+                points.append((x, y))
+        elif cmd in "Cc":
+            for i in range(0, len(args) - 5, 6):
+                p = np.array(args[i:i + 6]).reshape(3, 2)
+                if cmd == "c":
+                    p += (x, y)
+                t = _T
+                u = 1 - t
+                curve = u**3 * (x, y) + 3 * u * u * t * p[0] + 3 * u * t * t * p[1] + t**3 * p[2]
+                points.extend(map(tuple, curve.tolist()))
+                x, y = p[2].tolist()
+        elif cmd in "Zz":
+            if points and points[-1] != (x0, y0):
+                points.append((x0, y0))
+            finish(True)
+            points = [(x0, y0)]
+            x, y = x0, y0
+        cmd, args = c, []
+    finish(False)
+    return result
+
+
 PACK_ALGO_CHOICES = (
     "MaxRectsBl",
     "MaxRectsBssf",
@@ -48,6 +138,7 @@ class SvgMerge:
         self.args = None
         self.non_default_args = {}
         self.output = None
+        self.cuts: list[str] = []  # set by parseArgs()
         self.argparser = argparse.ArgumentParser()
         self.argparser.add_argument("cuts", nargs="+", help="Input cut files")
         self.argparser.add_argument("--rotation", default=False, action="store_true")
@@ -59,6 +150,11 @@ class SvgMerge:
         self.argparser.add_argument("--dpi", type=int, default=96, help="SVG resolution in dots-per-inch")
         self.argparser.add_argument("--margin", type=int, default=1, help="margin around outside of element in mm")
         self.argparser.add_argument("--output", type=str, default="merged.svg", help="name of resulting file")
+        self.argparser.add_argument("--nesting", default="rect", choices=("rect", "shape"), help="rect packs the bounding boxes of the parts with --margin converted from mm to px (96 dpi), shape packs their outlines with --margin in mm")
+        self.argparser.add_argument("--rotation_steps", type=int, default=4, help="angles tried per part with --nesting=shape and --rotation")
+        self.argparser.add_argument("--resolution", type=float, default=1.0, help="size of the raster used with --nesting=shape in mm")
+        self.argparser.add_argument("--time_budget", type=float, default=10.0, help="seconds spent on improving the packing with --nesting=shape")
+        self.utilization = []
 
     @staticmethod
     def parse_svg_groups(svg_file):
@@ -70,6 +166,21 @@ class SvgMerge:
         groups = [g for g in root if g.tag.endswith('g')]
         return groups, tree
 
+    @staticmethod
+    def get_bbox_attribute(group):
+        """
+        Get the bounding box stored in the data-bbox attribute of SVG groups
+        written by Boxes.py. Returns None if there is none.
+        """
+        bbox = group.attrib.get("data-bbox")
+        if bbox is None:
+            return None
+        try:
+            bbox = [float(v) for v in bbox.split()]
+        except ValueError:
+            return None
+        return bbox if len(bbox) == 4 else None
+
     @staticmethod
     def get_bbox_of_group(group):
         """
@@ -134,6 +245,57 @@ class SvgMerge:
             raise ValueError
         return [min_x, min_y, max_x, max_y]
 
+    @staticmethod
+    def get_outline_of_group(group):
+        """
+        Get the outline of the SVG group as shapely geometry with the areas
+        enclosed by its lines filled. Returns None for groups with
+        transformed or referenced content.
+        """
+        closed = []
+        lines = []
+        for elem in group.iter():
+            tag = elem.tag.split("}")[-1]  # Remove namespace
+            if tag in ("text", "title", "desc", "tspan"):
+                continue
+            if elem is not group and (tag in ("use", "image") or "transform" in elem.attrib):
+                return None
+            if tag == "path":
+                for points, is_closed in path_polylines(elem.attrib.get("d", "")):
+                    (closed if is_closed and len(points) > 3 else lines).append(points)
+            elif tag == "rect":
+                x = float(elem.attrib.get("x", 0))
+                y = float(elem.attrib.get("y", 0))
+                w = float(elem.attrib.get("width", 0))
+                h = float(elem.attrib.get("height", 0))
+                closed.append([(x, y), (x + w, y), (x + w, y + h), (x, y + h)])
+            elif tag in ("circle", "ellipse"):
+                cx = float(elem.attrib.get("cx", 0))
+                cy = float(elem.attrib.get("cy", 0))
+                rx = float(elem.attrib.get("rx", elem.attrib.get("r", 0)))
+                ry = float(elem.attrib.get("ry", elem.attrib.get("r", 0)))
+                a = np.linspace(0, 2 * np.pi, 4 * CURVE_STEPS + 1)
+                closed.append(list(zip(cx + rx * np.cos(a), cy + ry * np.sin(a))))
+            elif tag == "line":
+                lines.append([(float(elem.attrib.get("x1", 0)), float(elem.attrib.get("y1", 0))),
+                              (float(elem.attrib.get("x2", 0)), float(elem.attrib.get("y2", 0)))])
+            elif tag in ("polyline", "polygon"):
+                coords = list(map(float, re.findall(r"[-+]?[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?",
+                                                    elem.attrib.get("points", ""))))
+                points = list(zip(coords[::2], coords[1::2]))
+                (closed if tag == "polygon" and len(points) > 2 else lines).append(points)
+
+        shapes = [shapely.make_valid(shapely.Polygon(points)) for points in closed]
+        if lines:
+            strokes = shapely.MultiLineString(lines)
+            # open pathes may enclose areas together
+            shapes.append(shapely.polygonize(shapely.get_parts(shapely.node(strokes))))
+            shapes.append(shapely.buffer(strokes, 0.05))
+        if not shapes:
+            return None
+        outline = filled(shapely.union_all(shapes))
+        return None if outline.is_empty else outline
+
     @staticmethod
     def extract_elements(svg_files):
         """
@@ -143,7 +305,8 @@ class SvgMerge:
         for file in svg_files:
             groups, tree = SvgMerge.parse_svg_groups(file)
             for g in groups:
-                bbox = SvgMerge.get_bbox_of_group(g)
+                # only parse the pathes of SVGs not created by Boxes.py
+                bbox = SvgMerge.get_bbox_attribute(g) or SvgMerge.get_bbox_of_group(g)
                 width = bbox[2] - bbox[0]
                 height = bbox[3] - bbox[1]
                 style = g.attrib.get("style", '')
@@ -205,6 +368,38 @@ class SvgMerge:
                 })
         return packed
 
+    @staticmethod
+    def nest_elements(elements, box_width, box_height, margin, rotations, resolution, time_budget):
+        """
+        Pack the outlines of the group elements into the minimum number of panels.
+        Returns the packed elements and the utilization of each panel.
+        """
+        shapes = []
+        for elem in elements:
+            outline = SvgMerge.get_outline_of_group(elem['group'])
+            if outline is None:
+                outline = shapely.box(*elem['bbox'])
+            shapes.append(outline)
+
+        nester = ShapeNester(box_width, box_height, margin, rotations, resolution, time_budget)
+        packed = []
+        for elem, placement in zip(elements, nester.nest(shapes)):
+            if placement is None:
+                logging.warning("Element in %s does not fit on a panel and will not be included in merged output", elem['source_file'])
+                continue
+            bid, angle, dx, dy = placement
+            packed.append({
+                'element': elem,
+                'x': dx,
+                'y': dy,
+                'bin': bid,
+                'style': elem['style'],
+                'rotated': angle != 0,
+                'transform': f"translate({dx:.3f},{dy:.3f}) rotate({angle:g})",
+            })
+        packed.sort(key=lambda item: item['bin'])
+        return packed, nester.utilization
+
     @staticmethod
     def create_output_svg(packed_elements, box_width, box_height, margin, include_debug_bbox=False):
         """
@@ -269,6 +464,9 @@ class SvgMerge:
                 transform_parts.append(f"translate({dx},{dy})")
 
             full_transform = " ".join(transform_parts)
+            if 'transform' in item:
+                # placed with the outline by nest_elements()
+                full_transform = item['transform']
 
             # Clone the group with transformation
             new_g = ET.Element("g", attrib={"transform": full_transform, "style": style})
@@ -318,18 +516,31 @@ class SvgMerge:
 
             logging.info("Merging %s files", len(files))
             elements = SvgMerge.extract_elements(list(files))
-            for element in elements:
-                if element['width'] > self.panel_width or element['height'] > self.panel_height:
-                    logging.warning("Element in %s is larger than panel width and will not be included in merged output", element['source_file'])
-            packed = SvgMerge.pack_elements(
-                elements,
-                self.panel_width,
-                self.panel_height,
-                margin_px,
-                self.rotation,
-                self.bin_algo,
-                self.pack_algo
-            )
+            if self.nesting == "shape":
+                packed, self.utilization = SvgMerge.nest_elements(
+                    elements,
+                    self.panel_width,
+                    self.panel_height,
+                    self.margin,
+                    self.rotation_steps if self.rotation else 1,
+                    self.resolution,
+                    self.time_budget
+                )
+                for bid, used in enumerate(self.utilization):
+                    logging.info("Panel %s: %.1f%% used", bid, used * 100)
+            else:
+                for element in elements:
+                    if element['width'] > self.panel_width or element['height'] > self.panel_height:
+                        logging.warning("Element in %s is larger than panel width and will not be included in merged output", element['source_file'])
+                packed = SvgMerge.pack_elements(
+                    elements,
+                    self.panel_width,
+                    self.panel_height,
+                    margin_px,
+                    self.rotation,
+                    self.bin_algo,
+                    self.pack_algo
+                )
             self.result_svg = SvgMerge.create_output_svg(
                 packed,
                 self.panel_width,
@@ -30,6 +30,13 @@ class CustomBuildExtCommand(build_py):
             print("Could not process translation because of error: ", e)
             print("Output: ", e.stdout, e.stderr)
 
+    def updateGeneratorIndex(self) -> None:
+        try:
+            subprocess.run([sys.executable, "-c", "import boxes.generators; boxes.generators.writeGeneratorIndex()"], check=True, capture_output=True, text=True)
+        except CalledProcessError as e:
+            print("Could not update generator index because of error: ", e)
+            print("Output: ", e.stdout, e.stderr)
+
     def generate_mo_files(self):
         pos = glob.glob("po/*.po")
 
@@ -47,6 +54,7 @@ class CustomBuildExtCommand(build_py):
     def run(self):
         if self.distribution.data_files is None:
             self.distribution.data_files = []
+        self.execute(self.updateGeneratorIndex, ())
         self.execute(self.updatePOT, ())
         self.execute(self.generate_mo_files, ())
         self.execute(self.buildInkscapeExt, ())
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+try:
+    import boxes
+except ImportError:
+    sys.path.append(Path(__file__).resolve().parent.parent.__str__())
+    import boxes
+
+from boxes.benchmark import benchmark, benchmark_cases
+
+
+class TestBenchmark:
+
+    def test_cases_from_examples(self) -> None:
+        cases = benchmark_cases()
+        names = [name for name, generator, args in cases]
+        assert "ABox" in names
+        assert "RoundedTrapezoidBox" not in names  # broken generator
+        assert any(args for name, generator, args in cases)
+
+    def test_benchmark(self) -> None:
+        cases = {name: (generator, args) for name, generator, args in benchmark_cases()}
+        result = benchmark(*cases["ABox"], format="ps", repeat=1)
+        for key in ("parseArgs", "open", "render", "close",
+                    "geometry", "serialization", "total", "peak_memory"):
+            assert result[key] > 0
+        assert result["output_size"] > 100
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+try:
+    import boxes
+except ImportError:
+    sys.path.append(Path(__file__).resolve().parent.parent.__str__())
+    import boxes
+
+import datetime
+import math
+
+import pytest
+
+from boxes.drawing import (EPS, Context, DXFSurface, Part, Path as DrawingPath, Surface, SVGSurface,
+                           _compact_path_data, bezier_arc, flatten_bezier,
+                           outline_extents)
+
+
+def stroke(part, points, **params):
+    part.append("M", *points[0])
+    for xy in points[1:]:
+        part.append("L", *xy)
+    return part.stroke(**params)
+
+
+class TestPartStroke:
+
+    def test_join_most_recent(self) -> None:
+        part = Part("test")
+        first = stroke(part, [(0, 0), (10, 0)], lw=1)
+        second = stroke(part, [(0, 5), (10, 0)], lw=1)
+        assert stroke(part, [(10, 0), (10, 10)], lw=1) is second
+        assert len(first) == 2
+        assert len(second) == 3
+        # the end point moved, the old one is free again
+        assert stroke(part, [(10, 0), (20, 0)], lw=1) is first
+
+    def test_join_within_eps(self) -> None:
+        part = Part("test")
+        path = stroke(part, [(0, 0), (1 - EPS / 4, 1 + EPS / 4)], lw=1)
+        assert stroke(part, [(1 + EPS / 4, 1 - EPS / 4), (2, 2)], lw=1) is path
+        assert stroke(part, [(2 + 2 * EPS, 2), (3, 3)], lw=1) is not path
+
+    def test_params_must_match(self) -> None:
+        part = Part("test")
+        path = stroke(part, [(0, 0), (1, 1)], lw=1)
+        assert stroke(part, [(1, 1), (2, 2)], lw=2) is not path
+        assert len(part.pathes) == 2
+
+
+class TestOptimizeOrder:
+
+    def test_reverse(self) -> None:
+        path = DrawingPath([("M", 0, 0), ("L", 1, 0), ("C", 2, 1, 1, 0.5, 2, 0.5),
+                            ("M", 5, 5), ("L", 6, 5)])
+        path.reverse()
+        assert [list(c) for c in path] == [
+            ["M", 6, 5], ["L", 5, 5], ["M", 2, 1], ["C", 1, 0, 2, 0.5, 1, 0.5], ["L", 0, 0]]
+
+    def test_optimize_order(self) -> None:
+        surface = Surface()
+        ctx = Context(surface)
+        ctx.set_line_width(0.1)
+        for x in (200, 0, 100):
+            ctx.move_to(x + 10, 0)
+            ctx.line_to(x, 0)
+            ctx.stroke()
+        ctx.set_source_rgb(1.0, 0.0, 0.0)  # annotations are cut last
+        ctx.move_to(50, 200)
+        ctx.show_text("Test")
+        ctx.stroke()
+        ctx.set_source_rgb(0.0, 0.0, 0.0)
+        ctx.rectangle(0, 10, 100, 100)
+        ctx.rectangle(40, 40, 20, 20)
+        ctx.stroke()
+        ctx.flush()
+        before, after = surface.optimize_order()
+        pathes = surface._all_pathes()
+        # inner rectangle first, the lines cut backwards
+        assert [p.start_point() for p in pathes] == [
+            (40, 40), (0, 10), (0, 0), (100, 0), (200, 0), (50, 200)]
+        assert [p.end_point() for p in pathes][2:5] == [(10, 0), (110, 0), (210, 0)]
+        assert pathes[-1].texts
+        assert after < before
+
+
+class TestSVGSymbols:
+
+    @staticmethod
+    def surface():
+        surface = SVGSurface()
+        surface.use_symbols = True
+        surface.set_metadata({"name": "Test", "group": "", "short_description": "",
+                              "description": "", "reproducible": True, "cli_short": "",
+                              "cli": "", "url": "", "creation_date": datetime.datetime.now()})
+        return surface, Context(surface)
+
+    def test_symbols(self) -> None:
+        surface, ctx = self.surface()
+        ctx.set_line_width(0.1)
+        ctx.rectangle(0, 0, 100, 100)
+        ctx.stroke()
+        for x, angle in ((10, 0), (40, 0), (70, 90)):
+            ctx.save()
+            ctx.translate(x, 10)
+            ctx.rotate(math.radians(angle))
+            ctx.rectangle(0, 0, 20, 10)
+            ctx.restore()
+            ctx.stroke()
+        data = surface.finish().getvalue().decode()
+        assert data.count("<path") == 2
+        assert data.count('xlink:href="#s-0"') == 3
+        assert 'rotate(-90.000000)' in data
+
+    def test_precision(self) -> None:
+        for precision, count in ((3, 1), (6, 2)):
+            surface, ctx = self.surface()
+            surface.precision = precision
+            ctx.set_line_width(0.1)
+            for x, w in ((0, 20), (30, 20), (60, 20.0004), (90, 20.0004)):
+                ctx.rectangle(x, 0, w, 10)
+                ctx.stroke()
+            data = surface.finish().getvalue().decode()
+            assert data.count(' id="s-') == count
+
+
+class TestOutlineExtents:
+
+    def test_curves(self) -> None:
+        surface = SVGSurface()
+        ctx = Context(surface)
+        ctx.move_to(5 + 2 ** 0.5, 5 + 2 ** 0.5)
+        ctx.arc(5, 5, 2, math.pi / 4, 3 * math.pi / 4)
+        ctx.stroke()
+        ctx.move_to(20, 20)
+        ctx.stroke()
+        e = outline_extents(surface._all_pathes())
+        assert abs(e.ymax - 7) < 1e-3  # top of the arc between its end points
+        assert abs(e.xmin - (5 - 2 ** 0.5)) < 1e-9
+        assert abs(e.xmax - (5 + 2 ** 0.5)) < 1e-9
+        assert abs(e.ymin - (5 + 2 ** 0.5)) < 1e-9
+
+
+class TestSVGCompact:
+
+    @staticmethod
+    def pathes():
+        surface = SVGSurface()
+        ctx = Context(surface)
+        ctx.set_line_width(0.1)
+        ctx.move_to(0.5, 0)
+        ctx.line_to(10.25, 0)
+        ctx.line_to(10.25, -5.5)
+        ctx.line_to(0.5, 0)
+        ctx.move_to(20, 20)
+        ctx.line_to(19.5, 20.125)
+        ctx.stroke()
+        ctx.move_to(1, 1)
+        ctx.curve_to(2, 1, 3, 2, 3, 3)
+        ctx.stroke()
+        return surface, surface._all_pathes()
+
+    def test_relative(self) -> None:
+        surface, pathes = self.pathes()
+        assert surface._path_data(pathes[0]) == \
+            "M 0.500 0.000 H 10.250 V -5.500 L 0.500 0.000 Z M 20.000 20.000 L 19.500 20.125"
+        assert _compact_path_data(pathes, 3) == ["m.5 0h9.75v-5.5l-9.75 5.5zm19.5 20l-.5.125",
+                                                 "m1 1c1 0 2 1 2 2"]
+        # rounding errors don't add up
+        assert _compact_path_data(pathes, 1)[0] == "m.5 0h9.7v-5.5l-9.7 5.5zm19.5 20l-.5.1"
+
+    def test_precision(self) -> None:
+        surface, pathes = self.pathes()
+        surface.precision = 1
+        assert surface._path_data(pathes[0]).startswith("M 0.5 0.0 H 10.2 V -5.5")
+        surface.compact_paths = True
+        assert surface._elements(pathes[1])[0].startswith('<path d="m1 1c1 0 2 1 2 2"')
+
+    def test_precision_range(self) -> None:
+        for precision in ("-1", "9", "17"):
+            box = boxes.Boxes()
+            # the server replaces the ArgumentParser by one raising exceptions
+            with pytest.raises((SystemExit, Exception)):
+                box.parseArgs([f"--svg_precision={precision}"])
+
+
+class TestDXF:
+
+    def test_bezier_arc(self) -> None:
+        for angle1, angle2 in ((0, math.pi / 2), (0.3, -1.2), (1, 1 + 0.75 * math.pi)):
+            surface = DXFSurface()
+            ctx = Context(surface)
+            ctx.translate(5, 7)
+            ctx._arc(1, 2, 3, angle1, angle2, 1)
+            x0, y0 = ctx._m * (1 + 3 * math.cos(angle1), 2 + 3 * math.sin(angle1))
+            (_, x, y, x1, y1, x2, y2), = list(surface._p.path)[1:]
+            xc, yc, r, sweep = bezier_arc(x0, y0, x1, y1, x2, y2, x, y)
+            assert abs(xc - 6) < EPS and abs(yc - 9) < EPS and abs(r - 3) < EPS
+            assert abs(sweep - (angle2 - angle1)) < EPS
+        # not an arc
+        assert bezier_arc(0, 0, 1, 2, 3, 2, 4, 0) is None
+        points = flatten_bezier(0, 0, 1, 2, 3, 2, 4, 0, 0.01)
+        assert len(points) > 5 and points[-1] == (4, 0)
+
+    def test_render(self) -> None:
+        from boxes.generators.abox import ABox
+        box = ABox()
+        box.parseArgs(["--format=dxf", "--reference=0"])
+        box.open()
+        box.render()
+        box.hole(0, 0, 5)
+        data = box.close().getvalue().decode("ascii")
+        assert data.startswith("999\nABox - ")
+        assert "$ACADVER\n1\nAC1009\n" in data
+        assert "0\nLAYER\n2\nBLACK\n" in data
+        assert data.count("0\nCIRCLE\n") == 1
+        assert data.count("0\nPOLYLINE\n") == data.count("0\nSEQEND\n") > 0
+        assert data.endswith("0\nENDSEC\n0\nEOF\n")
+
+
+class TestGCode:
+
+    def test_inner_before_outer(self) -> None:
+        from boxes.drawing import GCodeSurface
+        surface = GCodeSurface()
+        surface.set_metadata({"name": "Test", "short_description": "", "reproducible": True,
+                              "cli": "", "url": ""})
+        ctx = Context(surface)
+        ctx.set_line_width(0.1)
+        ctx.rectangle(0, 0, 100, 100)
+        ctx.rectangle(40, 40, 20, 20)
+        ctx.move_to(15, 10)
+        ctx._arc(10, 10, 5, 0, 0.5 * math.pi, 1)
+        ctx.stroke()
+        data = surface.finish().getvalue().decode()
+        # everything is moved by the padding of 10mm
+        moves = [l for l in data.split("\n") if l.startswith("G0")]
+        assert moves == ["G0 X25.000 Y20.000", "G0 X50.000 Y50.000",
+                         "G0 X10.000 Y10.000", "G0 X0 Y0"]
+        assert "G3 X20.000 Y25.000 I-5.000 J0.000 F1000" in data
+        assert abs(surface.cut_length - (400 + 80 + 2.5 * math.pi)) < EPS
+        assert "; cut length: 487.9mm" in data
+
+
+class TestQrCode:
+
+    def test_merged_modules(self) -> None:
+        import qrcode
+        from shapely.geometry import Polygon, box
+        from shapely.ops import unary_union
+        from boxes.qrcode_factory import BoxesQrCodeFactory
+
+        b = boxes.Boxes()
+        b.parseArgs(["--reference=0"])
+        b.open()
+        q = qrcode.QRCode(image_factory=BoxesQrCodeFactory, box_size=15)
+        q.add_data("https://boxes.hackerspace-bamberg.de/")
+        img = q.make_image(ctx=b.ctx)
+        img.process()  # only draws once
+        b.ctx.stroke()
+        modules = unary_union([box(x, y, x + w, y + h) for x, y, w, h in img._img])
+        pathes = b.surface._all_pathes()
+        assert len(pathes) < len(img._img) / 5
+        # sub pathes are holes (even-odd)
+        drawn = []
+        for path in pathes:
+            rings: list[list[tuple[float, float]]] = []
+            for c in path:
+                if c[0] == "M":
+                    rings.append([])
+                rings[-1].append(tuple(c[1:3]))
+            area = Polygon(rings[0])
+            for ring in rings[1:]:
+                area = area.symmetric_difference(Polygon(ring))
+            drawn.append(area)
+        assert unary_union(drawn).symmetric_difference(modules).area == 0
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import math
+import random
+import sys
+from pathlib import Path
+
+try:
+    import boxes
+except ImportError:
+    sys.path.append(Path(__file__).resolve().parent.parent.__str__())
+    import boxes
+
+from shapely.geometry import Point, Polygon
+
+BORDER = [(0, 0), (200, 0), (200, 150), (120, 150), (120, 60), (80, 60), (80, 150), (0, 150)]
+
+
+def fill(pattern, **kw):
+    box = boxes.Boxes()
+    box.parseArgs([])
+    box.open()
+    holes = []
+    box.regularPolygonHole = lambda x, y, r, n, a: holes.append((x, y, r))
+    box.holesAt = lambda points, shape, r, n, a: holes.extend((x, y, r) for x, y in points)
+    box.fillHoles(pattern, BORDER, **kw)
+    return holes
+
+
+class TestFillHoles:
+
+    def test_random(self) -> None:
+        random.seed(1)
+        holes = fill("random", max_radius=6, hspace=2, bspace=3, min_radius=1, max_random=5000)
+        assert len(holes) > 100
+        border = Polygon(BORDER)
+        for i, (x, y, r) in enumerate(holes):
+            assert 1 <= r <= 6
+            assert border.contains(Point(x, y))
+            assert border.exterior.distance(Point(x, y)) >= r + 3 - 1e-9
+            for x2, y2, r2 in holes[:i]:
+                assert math.hypot(x - x2, y - y2) >= r + r2 + 2 - 1e-9
+
+    def test_grid(self) -> None:
+        for pattern in ("hex", "square"):
+            holes = fill(pattern, max_radius=5, hspace=2, bspace=3, min_radius=1)
+            border = Polygon(BORDER)
+            assert len(holes) > 100
+            assert len({(round(x, 6), round(y, 6)) for x, y, r in holes}) == len(holes)
+            # rows are filled from left to right
+            assert holes == sorted(holes, key=lambda h: (round(h[1], 6), h[0]))
+            for x, y, r in holes:
+                assert 1 <= r <= 5
+                assert border.exterior.distance(Point(x, y)) >= r + 3 - 1e-3
+
+
+class TestHolesAt:
+
+    @staticmethod
+    def drawn(draw):
+        box = boxes.Boxes()
+        box.parseArgs(["--reference=0"])
+        box.open()
+        box.moveTo(10, 20, 30)
+        draw(box)
+        box.ctx.stroke()
+        return [[list(c) for c in p] for p in box.surface._all_pathes()], box.ctx.get_current_point()
+
+    def test_same_as_single_holes(self) -> None:
+        points = [(0, 0), (10, 5), (-3.5, 7)]
+        for shape, method, kw in (
+                ("round", "hole", {"r": 2}),
+                ("polygon", "regularPolygonHole", {"r": 3, "n": 6, "a": 10}),
+                ("rectangle", "rectangularHole", {"dx": 4, "dy": 2, "r": 0.5}),
+                ("d", "dHole", {"r": 2})):
+            batch, pos = self.drawn(lambda box: box.holesAt(points, shape=shape, **kw))
+            single, pos2 = self.drawn(lambda box: [getattr(box, method)(x, y, **kw) for x, y in points])
+            assert len(batch) == len(single) == len(points)
+            assert pos == pos2
+            # same floating point operations, not just close
+            assert batch == single
+
+    def test_drawing_before_moving(self) -> None:
+        # holes that draw before moving to their position can't be repeated
+        def line(box, x, y, r, color):
+            box.ctx.move_to(x, y)
+            box.ctx.line_to(x + r, y)
+            box.ctx.stroke()
+
+        points = [(0, 0), (10, 5)]
+        batch, _ = self.drawn(lambda box: (setattr(box, "hole", lambda *a, **kw: line(box, *a, **kw)),
+                                           box.holesAt(points, r=2)))
+        single, _ = self.drawn(lambda box: [line(box, x, y, 2, None) for x, y in points])
+        assert len(batch) == len(points)
+        assert batch == single
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import math
+import sys
+from pathlib import Path
+
+try:
+    import boxes
+except ImportError:
+    sys.path.append(Path(__file__).resolve().parent.parent.__str__())
+    import boxes
+
+from boxes import gears
+
+
+class TestSpurPoints:
+
+    def test_teeth_are_rotated(self) -> None:
+        teeth = 13
+        (pitch_radius, base_radius, addendum, dedendum,
+         outer_radius, root_radius, tooth) = gears.gear_calculations(teeth, 3 * math.pi, 20)
+        points = gears.generate_spur_points(teeth, base_radius, pitch_radius, outer_radius, root_radius, 12, 5)
+        n = len(points) // teeth
+        assert len(points) == n * teeth
+        a = 2 * math.pi / teeth
+        for (x1, y1), (x2, y2) in zip(points, points[n:]):
+            assert abs(x1 * math.cos(a) - y1 * math.sin(a) - x2) < 1e-9
+            assert abs(x1 * math.sin(a) + y1 * math.cos(a) - y2) < 1e-9
+        for x, y in points:
+            assert root_radius - 1e-9 <= math.hypot(x, y) <= outer_radius + 1e-9
+
+    def test_cached(self) -> None:
+        gears.spur_gear_points.cache_clear()
+        p1 = gears.spur_gear_points(20, 3 * math.pi, 20, 0, False, 0.2, 12, 5, 0.1)
+        p2 = gears.spur_gear_points(20, 3 * math.pi, 20, 0, False, 0.2, 12, 5, 0.1)
+        assert p1 is p2
+        assert gears.spur_gear_points.cache_info().hits == 1
+        p3 = gears.spur_gear_points(20, 3 * math.pi, 20, 0, False, 0.2, 12, 5, 0.0)
+        assert len(p3) == len(p1)
+        # outset by burn
+        assert math.hypot(*p1[0]) > math.hypot(*p3[0])
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+try:
+    import boxes
+except ImportError:
+    sys.path.append(Path(__file__).resolve().parent.parent.__str__())
+    import boxes
+
+import boxes.generators
+
+
+class TestGeneratorIndex:
+
+    def test_index_up_to_date(self) -> None:
+        assert boxes.generators.getGeneratorIndex() == boxes.generators.buildGeneratorIndex(), \
+            "Run boxes.generators.writeGeneratorIndex() to update boxes/generators/_index.py"
+
+    def test_get_box_generator(self) -> None:
+        from boxes.generators.abox import ABox
+        assert boxes.generators.getBoxGenerator("abox") is ABox
+        assert boxes.generators.getBoxGenerator("ABox") is ABox
+        assert boxes.generators.getBoxGenerator("NoSuchBox") is None
+
+    def test_plugin_path_fallback(self, monkeypatch, tmp_path) -> None:
+        (tmp_path / "pluginbox.py").write_text(
+            "import boxes\n\n"
+            "class PluginBox(boxes.Boxes):\n"
+            "    \"\"\"Box from a plugin\"\"\"\n")
+        monkeypatch.setenv("BOXES_GENERATOR_PATH", str(tmp_path))
+        monkeypatch.setattr(boxes.generators, "__path__", list(boxes.generators.__path__))
+        generator = boxes.generators.getBoxGenerator("pluginbox")
+        assert generator is not None and generator.__name__ == "PluginBox"
+
+
+class TestArgParserSchema:
+
+    @staticmethod
+    def schema(box):
+        return [(group.title, [(a.dest, a.default, a.choices, a.help)
+                               for a in group._group_actions])
+                for group in box.argparser._action_groups]
+
+    def test_cached_schema_equal(self) -> None:
+        for generator in boxes.generators.getAllBoxGenerators().values():
+            first, second = generator(), generator()
+            assert self.schema(first) == self.schema(second), generator.__name__
+            assert first.edgesettings.keys() == second.edgesettings.keys()
+
+    def test_copies_independent(self) -> None:
+        from boxes.generators.abox import ABox
+        box1, box2 = ABox(), ABox()
+        box1.argparser.add_argument("--extra", type=int, default=1)
+        box1.argparser.set_defaults(x=50.0)
+        box2.parseArgs([])
+        assert not hasattr(box2, "extra")
+        assert box2.x == 100.0
+        box1.parseArgs(["--extra=2"])
+        assert box1.extra == 2 and box1.x == 50.0
+        assert "extra" not in {a.dest for a in ABox().argparser._actions}
+
+    def test_clone_keeps_groups(self) -> None:
+        from boxes.generators.abox import ABox
+        parser = ABox().argparser
+        clone = boxes.cloneArgParser(parser)
+        assert [g.title for g in clone._action_groups] == [g.title for g in parser._action_groups]
+        assert clone._optionals is clone._action_groups[1]
+        assert not set(clone._actions) & set(parser._actions)
+        assert clone.format_help() == parser.format_help()
+
+    def test_cached_per_ui(self, monkeypatch) -> None:
+        from boxes.generators.typetray import TypeTray
+
+        def dests():
+            return {a.dest for a in TypeTray().argparser._actions}
+
+        monkeypatch.setattr(TypeTray, "UI", "")
+        assert "label_file" in dests()
+        monkeypatch.setattr(TypeTray, "UI", "web")
+        assert "label_text" in dests() and "label_file" not in dests()
+        monkeypatch.setattr(TypeTray, "UI", "")
+        assert "label_file" in dests()
+
+    def test_traylayout_cached(self) -> None:
+        from boxes.generators.traylayout import TrayLayoutFile
+        first, second = TrayLayoutFile(), TrayLayoutFile()
+        assert self.schema(first) == self.schema(second)
+        assert "thickness" not in {a.dest for a in second.argparser._actions}
+        assert second.argparser._actions is not first.argparser._actions
+
+
+class TestMultiGenerate:
+
+    config = """
+Boxes:
+  - box_type: ABox
+    name: small
+    count: 2
+    args:
+      x: 50
+      reference: 0
+  - box_type: ABox
+    args:
+      x: abc
+  - box_type: ClosedBox
+    args:
+      reference: 0
+  - box_type: ABox
+    args:
+      thickness: 0
+"""
+
+    def test_jobs(self, tmp_path, capsys, monkeypatch) -> None:
+        import io
+        from boxes.scripts import boxes_main
+        from boxes.scripts.boxes_main import multi_generate
+
+        # boxesserver installs its own parser when imported by other tests
+        monkeypatch.setattr(boxes, "ArgumentParser", boxes_main.ThrowingArgumentParser)
+
+        results = {}
+        for jobs in (1, 2):
+            output_path = tmp_path / str(jobs)
+            output_path.mkdir()
+            errors: list = []
+            files = multi_generate(io.StringIO(self.config), output_path,
+                                   "{name}_{box_idx}", jobs=jobs, errors=errors)
+            assert [Path(f).name for f in files] == [
+                "small_0_0.svg", "small_0_1.svg", "ClosedBox_2.svg"]
+            # the broken box does not stop the batch
+            assert [(ii, name) for ii, name, _ in errors] == [(3, "ABox")]
+            # boxes with bad arguments are skipped, not failed
+            assert "Error parsing box args for box 1 : ABox" in capsys.readouterr().out
+            results[jobs] = [Path(f).read_bytes() for f in files]
+        assert results[1] == results[2]
+
+    def test_incremental(self, tmp_path, capsys, monkeypatch) -> None:
+        import io
+        from boxes.scripts.boxes_main import multi_generate
+
+        def run():
+            files = multi_generate(io.StringIO(self.config), tmp_path,
+                                   "{name}_{box_idx}", incremental=True)
+            assert [Path(f).name for f in files] == [
+                "small_0_0.svg", "small_0_1.svg", "ClosedBox_2.svg"]
+            return capsys.readouterr().out
+
+        assert "Unchanged" not in run()
+        out = run()
+        assert "Unchanged box 0 : ABox" in out
+        assert "Unchanged box 2 : ClosedBox" in out
+        # changed outputs are rendered again
+        (tmp_path / "small_0_1.svg").write_text("")
+        out = run()
+        assert "Rendered box 0 : ABox" in out
+        assert "Unchanged box 2 : ClosedBox" in out
+        # profiled output contains the timings
+        monkeypatch.setenv("BOXES_PROFILE", "1")
+        assert "Unchanged" not in run()
+
+    def test_manifest_translations(self, tmp_path, monkeypatch) -> None:
+        from boxes.manifest import BuildManifest
+
+        monkeypatch.chdir(Path(__file__).resolve().parent.parent)
+        hashes = set()
+        for language in ("de", "fr"):
+            monkeypatch.setenv("LANGUAGE", language)
+            hashes.add(BuildManifest(tmp_path).coreHash())
+        assert len(hashes) == 2
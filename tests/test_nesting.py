@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+try:
+    import boxes
+except ImportError:
+    sys.path.append(Path(__file__).resolve().parent.parent.__str__())
+    import boxes
+
+import shapely
+import shapely.affinity
+
+from boxes import nesting
+from boxes.generators.abox import ABox
+from boxes.generators.closedbox import ClosedBox
+
+
+def rendered_boxes():
+    result = []
+    for cls, args in ((ABox, ["--x=100", "--y=80"]), (ClosedBox, ["--x=60", "--y=50", "--h=40"])):
+        box = cls()
+        box.parseArgs(args + ["--reference=0"])
+        box.metadata["reproducible"] = True
+        box.open()
+        box.render()
+        result.append(box)
+    return result
+
+
+def sizes(parts):
+    result = []
+    for part in parts:
+        e = nesting.part_extents(part)
+        result.append(tuple(sorted((round(e.width, 6), round(e.height, 6)))))
+    return sorted(result)
+
+
+class TestNesting:
+
+    def test_pack_parts(self) -> None:
+        parts = [p for box in rendered_boxes() for p in nesting.box_parts(box)]
+        before = sizes(parts)
+        panels = nesting.pack_parts(parts, 150, 120, margin=1.0, rotation=True)
+        assert len(panels) > 1
+        assert sizes([p for panel in panels for p in panel]) == before
+        for panel in panels:
+            extents = [nesting.part_extents(p) for p in panel]
+            for i, e in enumerate(extents):
+                assert e.xmin >= 1 - 1e-6 and e.ymin >= 1 - 1e-6
+                assert e.xmax <= 149 + 1e-6 and e.ymax <= 119 + 1e-6
+                for o in extents[:i]:
+                    assert (e.xmax + 2 <= o.xmin + 1e-6 or o.xmax + 2 <= e.xmin + 1e-6 or
+                            e.ymax + 2 <= o.ymin + 1e-6 or o.ymax + 2 <= e.ymin + 1e-6)
+
+    def test_too_large(self) -> None:
+        parts = nesting.box_parts(rendered_boxes()[0])
+        panels = nesting.pack_parts(parts, 70, 70)
+        assert sum(len(panel) for panel in panels) < len(parts)
+
+    def test_box_still_closes(self) -> None:
+        box = rendered_boxes()[0]
+        expected = rendered_boxes()[0].close().getvalue()
+        parts = nesting.box_parts(box)
+        nesting.pack_parts(parts, 300, 300)
+        assert box.close().getvalue() == expected
+
+    def test_formats(self) -> None:
+        for fmt in ("svg", "ps", "dxf", "lbrn2", "gcode"):
+            data = nesting.nest(rendered_boxes(), 300, 200, fmt, rotation=True)
+            assert len(data.getvalue()) > 1000
+
+
+class TestShapeNester:
+
+    def test_outlines(self) -> None:
+        l_shape = shapely.Polygon([(0, 0), (100, 0), (100, 20), (20, 20), (20, 100), (0, 100)])
+        circle = shapely.Point(50, 50).buffer(30)
+        shapes = [l_shape] * 6 + [circle] * 4 + [shapely.box(0, 0, 400, 10)]
+        nester = nesting.ShapeNester(300, 300, margin=1.0, rotations=4, time_budget=0.5)
+        placements = nester.nest(shapes)
+        assert placements[-1] is None  # too long
+        # bounding boxes would need two panels
+        assert len(nester.utilization) == 1
+        assert abs(nester.utilization[0] - (6 * l_shape.area + 4 * circle.area) / 300**2) < 1e-9
+        placed = []
+        for shape, (panel, angle, dx, dy) in zip(shapes[:-1], placements):
+            shape = shapely.affinity.translate(
+                shapely.affinity.rotate(shape, angle, origin=(0, 0)), dx, dy)
+            xmin, ymin, xmax, ymax = shape.bounds
+            assert xmin >= -1e-9 and ymin >= -1e-9 and xmax <= 300 + 1e-9 and ymax <= 300 + 1e-9
+            for other in placed:
+                assert shape.distance(other) >= 2 - 1e-9
+            placed.append(shape)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import boxes
+except ImportError:
+    sys.path.append(Path(__file__).resolve().parent.parent.__str__())
+    import boxes
+
+from boxes import pathorder
+
+
+class TestPathOrder:
+
+    def test_order_strokes(self) -> None:
+        rng = np.random.default_rng(1)
+        starts = rng.uniform(0, 100, (200, 2))
+        ends = starts + rng.uniform(-5, 5, (200, 2))
+        identity = np.arange(200), np.zeros(200, dtype=bool)
+        before = pathorder.travel_length(starts, ends, *identity)
+        nn = pathorder.nearest_neighbour(starts, ends)
+        order, flipped = pathorder.order_strokes(starts, ends)
+        assert sorted(order) == list(range(200))
+        after = pathorder.travel_length(starts, ends, order, flipped)
+        assert after <= pathorder.travel_length(starts, ends, *nn) < before / 3
+
+    def test_reversed_strokes(self) -> None:
+        # cutting the second line backwards avoids all travel
+        order, flipped = pathorder.order_strokes([(0, 0), (20, 0)], [(10, 0), (10, 0)])
+        assert list(order) == [0, 1]
+        assert list(flipped) == [False, True]
+
+    def test_grid_index(self) -> None:
+        rng = np.random.default_rng(2)
+        starts = rng.uniform(0, 100, (300, 2))
+        ends = starts + rng.uniform(-5, 5, (300, 2))
+        reversible = rng.uniform(size=300) > 0.3
+        pos = (-20.0, 50.0)  # outside of the grid
+        assert pathorder.GRID_INDEX_MIN < 300
+        order, flipped = pathorder.nearest_neighbour(starts, ends, pos, reversible)
+        # same result as the brute force search
+        n = pathorder.GRID_INDEX_MIN
+        try:
+            pathorder.GRID_INDEX_MIN = 1000
+            expected = pathorder.nearest_neighbour(starts, ends, pos, reversible)
+        finally:
+            pathorder.GRID_INDEX_MIN = n
+        assert list(order) == list(expected[0])
+        assert list(flipped) == list(expected[1])
+        assert not (flipped & ~reversible[order]).any()
+
+    def test_fixed_direction(self) -> None:
+        assert list(pathorder.order_strokes([(10, 0)], [(0, 0)])[1]) == [True]
+        assert list(pathorder.order_strokes([(10, 0)], [(0, 0)], reversible=[False])[1]) == [False]
+        rng = np.random.default_rng(3)
+        starts = rng.uniform(0, 100, (100, 2))
+        ends = rng.uniform(0, 100, (100, 2))
+        reversible = rng.uniform(size=100) > 0.5
+        order, flipped = pathorder.order_strokes(starts, ends, reversible=reversible)
+        assert sorted(order) == list(range(100))
+        assert flipped.any()
+        assert not (flipped & ~reversible[order]).any()
+
+    def test_order_parts(self) -> None:
+        outline = ((0, 0), (0, 0), (0, 0, 10, 10), True, 1, True)
+        hole = ((5, 5), (5, 5), (4, 4, 6, 6), True, 1, True)
+        engraving = ((8, 8), (9, 9), (8, 8, 9, 9), False, 0, False)
+        far = ((100, 100), (110, 100), (100, 100, 110, 100), False, 1, True)
+        order = pathorder.order_parts([[far], [outline, hole, engraving]])
+        assert order == [(1, 2, False), (1, 1, False), (1, 0, False), (0, 0, False)]
+
+    def test_containment_depth(self) -> None:
+        bboxes = [(0, 0, 100, 100), (10, 10, 50, 50), (20, 20, 30, 30), (60, 60, 70, 70)]
+        depth = pathorder.containment_depth(bboxes, [True, True, False, True])
+        assert list(depth) == [0, 1, 2, 1]
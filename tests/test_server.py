@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import json
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+try:
+    import boxes
+except ImportError:
+    sys.path.append(Path(__file__).resolve().parent.parent.__str__())
+    import boxes
+
+from boxes.scripts.boxesserver import BServer, RenderCache, RenderPool
+
+
+def request(server, path, query="", host="localhost"):
+    environ = {
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SERVER_NAME": host,
+        "SERVER_PORT": "80",
+        "wsgi.url_scheme": "http",
+        "wsgi.file_wrapper": lambda f, size: [f.read()],
+    }
+    response = {}
+
+    def start_response(status, headers):
+        response["status"] = status
+        response["headers"] = dict(headers)
+
+    body = b"".join(server.serve(environ, start_response))
+    return response["status"], response["headers"], body
+
+
+def without_date(svg):
+    return re.sub(rb"\d{4}-\d\d-\d\d \d\d:\d\d:\d\d", b"", svg)
+
+
+class TestRenderCache:
+
+    def test_key_is_normalized(self) -> None:
+        k1 = RenderCache.key("ABox", {"x": 10.0, "y": 20.0}, "svg", "de")
+        k2 = RenderCache.key("ABox", {"y": 20.0, "x": 10.0}, "svg", "de")
+        assert k1 == k2
+        assert k1 != RenderCache.key("ABox", {"x": 10.0, "y": 20.0}, "ps", "de")
+        assert k1 != RenderCache.key("ABox", {"x": 10.0, "y": 20.0}, "svg", "en")
+        assert k1 != RenderCache.key("ABox", {"x": 10.0, "y": 20.0}, "svg", "de",
+                                     "http://localhost/ABox?x=10")
+
+    def test_size_eviction(self) -> None:
+        cache = RenderCache(max_bytes=10)
+        cache.put(("a",), b"12345")
+        cache.put(("b",), b"12345")
+        assert cache.get(("a",)) == b"12345"  # a is now most recently used
+        cache.put(("c",), b"12345")
+        assert cache.get(("b",)) is None
+        assert cache.get(("a",)) == b"12345"
+        assert cache.get(("c",)) == b"12345"
+        cache.put(("d",), b"x" * 11)  # too large, never cached
+        assert cache.get(("d",)) is None
+        stats = cache.stats()
+        assert stats["bytes"] == 10
+        assert stats["hits"] == 3
+        assert stats["misses"] == 2
+
+    def test_disk_tier(self, tmp_path) -> None:
+        cache = RenderCache(max_bytes=10, directory=str(tmp_path))
+        cache.put(("a",), b"12345")
+        # new instance with empty memory tier
+        cache = RenderCache(max_bytes=10, directory=str(tmp_path))
+        assert cache.get(("a",)) == b"12345"
+        assert cache.stats()["disk_hits"] == 1
+        assert cache.get(("a",)) == b"12345"
+        assert cache.stats()["hits"] == 1
+
+    def test_server_hit(self) -> None:
+        server = BServer(render_cache=RenderCache())
+        status, headers, body1 = request(server, "/ABox", "x=80&y=60&render=1&reference=0")
+        assert status == "200 OK"
+        assert headers["X-Boxes-Cache"] == "miss"
+        status, headers, body2 = request(server, "/ABox", "x=80&y=60&render=1&reference=0")
+        assert headers["X-Boxes-Cache"] == "hit"
+        assert body1.startswith(b"<?xml")
+        assert body1 == body2
+
+    def test_server_url_in_key(self) -> None:
+        # the url of the request is embedded in the output
+        server = BServer(render_cache=RenderCache())
+        status, headers, body1 = request(server, "/ABox", "x=80&y=60&render=1&reference=0")
+        status, headers, body2 = request(server, "/ABox", "y=60&reference=0&x=80&render=1")
+        assert headers["X-Boxes-Cache"] == "miss"
+        assert b"y=60&amp;reference=0&amp;x=80" in body2
+        assert b"y=60&amp;reference=0&amp;x=80" not in body1
+        status, headers, body3 = request(server, "/ABox", "x=80&y=60&render=1&reference=0",
+                                         host="example.org")
+        assert headers["X-Boxes-Cache"] == "miss"
+        assert b"http://example.org/ABox" in body3
+        assert b"http://localhost/ABox" not in body3
+
+
+class TestRenderPool:
+
+    def test_pool_render(self) -> None:
+        pool = RenderPool(1, max_queue=0)
+        try:
+            server = BServer()
+            query = "x=80&y=60&render=1&reference=0"
+            status, headers, local = request(server, "/ABox", query)
+            server.render_pool = pool
+            status, headers, pooled = request(server, "/ABox", query)
+            assert status == "200 OK"
+            assert without_date(pooled) == without_date(local)
+
+            pool.pending = 1  # pretend the only worker is busy
+            status, headers, body = request(server, "/ABox", query)
+            assert status == "503 Service Unavailable"
+            pool.pending = 0
+        finally:
+            pool.shutdown()
+
+    def test_unknown_generator(self) -> None:
+        pool = RenderPool(1)
+        try:
+            with pytest.raises(ValueError, match="Unknown generator"):
+                pool.render("NoSuchBox", [], None, "", "")
+        finally:
+            pool.shutdown()
+
+    def test_pool_timeout(self) -> None:
+        pool = RenderPool(1, cpu_limit=0.05)
+        try:
+            server = BServer(render_pool=pool)
+            # takes about half a second
+            status, headers, body = request(server, "/ABox", "x=3000&y=3000&h=3000&render=1")
+            assert status == "503 Service Unavailable"
+            assert b"Rendering took too long" in body
+        finally:
+            pool.shutdown()
+
+
+class TestStreaming:
+
+    @staticmethod
+    def rendered_box(server):
+        box = server.boxes["ABox"]()
+        box.parseArgs(["--x=80", "--y=60", "--reference=0"])
+        box.metadata["reproducible"] = True
+        box.open()
+        box.render()
+        return box
+
+    def test_close_stream(self) -> None:
+        server = BServer()
+        box = self.rendered_box(server)
+        box.surface.chunk_size = 1000
+        chunks = list(box.closeStream())
+        assert len(chunks) > 2
+        assert chunks[-1].endswith(b"</svg>")
+        assert self.rendered_box(server).close().getvalue() == b"".join(chunks)
+
+    def test_server_streams_svg(self) -> None:
+        server = BServer(render_cache=RenderCache())
+        status, headers, body = request(server, "/ABox", "x=80&y=60&render=1&reference=0")
+        assert status == "200 OK"
+        assert body.endswith(b"</svg>")
+        # cache is filled once the stream has been consumed
+        status, headers, cached = request(server, "/ABox", "x=80&y=60&render=1&reference=0")
+        assert headers["X-Boxes-Cache"] == "hit"
+        assert cached == body
+
+    def test_error_while_streaming(self, monkeypatch) -> None:
+        def stream(self):
+            yield b"<svg"
+            raise RuntimeError("broken")
+
+        monkeypatch.setattr(boxes.Boxes, "closeStream", stream)
+        server = BServer(render_cache=RenderCache())
+        environ = {
+            "PATH_INFO": "/ABox",
+            "QUERY_STRING": "x=80&y=60&render=1&reference=0",
+            "SERVER_NAME": "localhost",
+            "SERVER_PORT": "80",
+            "wsgi.url_scheme": "http",
+        }
+        calls = []
+
+        def start_response(status, headers, exc_info=None):
+            calls.append(status)
+            if exc_info is not None:  # headers are already sent
+                raise exc_info[1].with_traceback(exc_info[2])
+
+        body = server.serve(environ, start_response)
+        assert next(body) == b"<svg"
+        with pytest.raises(RuntimeError):
+            next(body)
+        assert calls == ["200 OK", "500 Internal Server Error"]
+        assert server.render_cache.stats()["entries"] == 0
+
+
+class TestProfile:
+
+    def test_profile_headers(self, monkeypatch) -> None:
+        monkeypatch.setenv("BOXES_PROFILE", "1")
+        server = BServer(render_cache=RenderCache())
+        request(server, "/ABox", "x=80&y=60&render=1&reference=0")
+        # not served from the cache
+        status, headers, body = request(server, "/ABox", "x=80&y=60&render=1&reference=0")
+        assert status == "200 OK"
+        assert "X-Boxes-Cache" not in headers
+        assert "render;dur=" in headers["Server-Timing"]
+        profile = json.loads(headers["X-Boxes-Profile"])
+        for phase in ("parseArgs", "open", "buildObjects", "render", "close",
+                      "finish", "faster_edges"):
+            assert phase in profile
+        assert profile["render"]["append"] > 0
+        assert profile["render"]["edge"] > 0
+        assert profile["render"]["saved_context"] > 0
+        assert b"Profile:\nparseArgs" in body
+
+    def test_disabled(self, monkeypatch) -> None:
+        monkeypatch.delenv("BOXES_PROFILE", raising=False)
+        server = BServer()
+        status, headers, body = request(server, "/ABox", "x=80&y=60&render=1&reference=0")
+        assert "X-Boxes-Profile" not in headers
+        assert b"Profile:" not in body
+        assert server.boxes["ABox"]().getProfile() is None
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+try:
+    import boxes
+except ImportError:
+    sys.path.append(Path(__file__).resolve().parent.parent.__str__())
+    import boxes
+
+import shapely
+import shapely.affinity
+
+from boxes.generators.abox import ABox
+from boxes.svgmerge import SvgMerge, path_polylines
+
+
+def render(path) -> None:
+    box = ABox()
+    box.parseArgs(["--reference=0", "--x=80", "--y=60", "--h=40"])
+    box.metadata["reproducible"] = True
+    box.open()
+    box.render()
+    path.write_bytes(box.close().getvalue())
+
+
+class TestBBox:
+
+    def test_attribute_matches_pathes(self, tmp_path) -> None:
+        render(tmp_path / "box.svg")
+        groups, tree = SvgMerge.parse_svg_groups(str(tmp_path / "box.svg"))
+        assert groups
+        for g in groups:
+            bbox = SvgMerge.get_bbox_attribute(g)
+            parsed = SvgMerge.get_bbox_of_group(g)
+            assert max(abs(a - b) for a, b in zip(bbox, parsed)) < 1e-3
+
+    def test_fallback(self, tmp_path) -> None:
+        render(tmp_path / "box.svg")
+        data = (tmp_path / "box.svg").read_text()
+        (tmp_path / "foreign.svg").write_text(data.replace(" data-bbox=", " data-other="))
+        with_bbox = SvgMerge.extract_elements([str(tmp_path / "box.svg")])
+        foreign = SvgMerge.extract_elements([str(tmp_path / "foreign.svg")])
+        assert len(with_bbox) == len(foreign) > 0
+        for e1, e2 in zip(with_bbox, foreign):
+            assert SvgMerge.get_bbox_attribute(e2["group"]) is None
+            assert abs(e1["width"] - e2["width"]) < 1e-3
+            assert abs(e1["height"] - e2["height"]) < 1e-3
+
+
+class TestOutline:
+
+    def test_path_polylines(self) -> None:
+        absolute = path_polylines("M 0 0 H 10 V 10 C 10 15 0 15 0 10 Z M 20 0 L 30 0")
+        relative = path_polylines("m0 0h10v10c0 5-10 5-10 0zm20 0 10 0")
+        arc = path_polylines("M 0 0 H 10 V 10 A 5 5 0 0 1 0 10 Z")
+        assert [closed for points, closed in absolute] == [True, False]
+        for (p1, c1), (p2, c2) in zip(absolute, relative):
+            assert c1 == c2 and len(p1) == len(p2)
+            assert max(abs(a - b) for q1, q2 in zip(p1, p2) for a, b in zip(q1, q2)) < 1e-9
+        assert max(y for x, y in absolute[0][0]) == 13.75
+        assert abs(max(y for x, y in arc[0][0]) - 15) < 1e-9
+
+    def test_outline_fills_holes(self, tmp_path) -> None:
+        render(tmp_path / "box.svg")
+        for e in SvgMerge.extract_elements([str(tmp_path / "box.svg")]):
+            outline = SvgMerge.get_outline_of_group(e["group"])
+            assert all(len(p.interiors) == 0 for p in shapely.get_parts(outline))
+            assert max(abs(a - b) for a, b in zip(outline.bounds, e["bbox"])) < 0.1
+            assert 0.5 * e["width"] * e["height"] < outline.area <= e["width"] * e["height"] + 1e-6
+
+    def test_nest_elements(self, tmp_path) -> None:
+        render(tmp_path / "box.svg")
+        elements = SvgMerge.extract_elements([str(tmp_path / "box.svg")] * 2)
+        packed, utilization = SvgMerge.nest_elements(elements, 200, 150, 1.0, 4, 1.0, 0.5)
+        assert len(packed) == len(elements)
+        assert len(utilization) == len({item["bin"] for item in packed})
+        assert all(0 < u < 1 for u in utilization)
+        placed = []
+        for item in packed:
+            outline = SvgMerge.get_outline_of_group(item["element"]["group"])
+            angle = float(item["transform"].split("rotate(")[1][:-1])
+            outline = shapely.affinity.translate(
+                shapely.affinity.rotate(outline, angle, origin=(0, 0)), item["x"], item["y"])
+            xmin, ymin, xmax, ymax = outline.bounds
+            assert xmin >= -1e-6 and ymin >= -1e-6 and xmax <= 200 and ymax <= 150
+            for b, other in placed:
+                if b == item["bin"]:
+                    assert outline.distance(other) >= 2 - 1e-3
+            placed.append((item["bin"], outline))
+
+    def test_nest_elements_too_large(self, tmp_path, caplog) -> None:
+        render(tmp_path / "box.svg")
+        elements = SvgMerge.extract_elements([str(tmp_path / "box.svg")])
+        # only the sides of 60mm x 40mm fit
+        packed, _ = SvgMerge.nest_elements(elements, 70, 50, 1.0, 1, 1.0, 0.1)
+        too_large = [e for e in elements if e["width"] > 68 or e["height"] > 48]
+        assert too_large and len(packed) == len(elements) - len(too_large)
+        warnings = [r for r in caplog.records if str(tmp_path / "box.svg") in r.getMessage()]
+        assert len(warnings) == len(too_large)